@@ -0,0 +1,121 @@
+"""Distributed worker benchmark: several local `worker` processes over a temp folder.
+
+    python benchmarks/bench_distributed.py --files 24 --size-kb 512 --workers 1,2,4
+    python benchmarks/bench_distributed.py --kill
+
+For each worker count, starts that many `data_extractor.py worker` processes on a fresh
+queue, times them until the queue is empty, merges, and checks that every file was
+extracted exactly once and that the merged result is identical to the one-worker run.
+With --kill, one worker is killed while it holds leases and the run must still complete,
+with the dead worker's files taken over once their (short) leases expire.
+"""
+import os
+import sys
+import json
+import glob
+import time
+import hashlib
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import corpus  # noqa: E402  (benchmarks/ is on sys.path when run as a script)
+
+def start_workers(count, input_folder, out_folder, args, lease_seconds):
+    command = [sys.executable, os.path.join(ROOT, "data_extractor.py"), "worker", input_folder,
+               "--out", out_folder, "--type", args.type, "--workers", "1", "--no-cache",
+               "--lease-seconds", str(lease_seconds)]
+    return [subprocess.Popen(command + ["--worker-id", f"w{number}"], cwd=ROOT,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            for number in range(count)]
+
+def merge(input_folder, out_folder):
+    result = subprocess.run([sys.executable, os.path.join(ROOT, "data_extractor.py"), "merge", input_folder,
+                             "--out", out_folder], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode:
+        raise SystemExit(f"❌ merge failed:\n{result.stdout}{result.stderr}")
+    merged = glob.glob(os.path.join(out_folder, "*_results_*.csv"))[0]
+    with open(merged, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    done = glob.glob(os.path.join(out_folder, ".extractor_queue_default", "done", "*.json"))
+    workers = {}
+    for path in done:
+        with open(path, encoding="utf-8") as f:
+            record = json.load(f)
+        workers[record["worker"]] = workers.get(record["worker"], 0) + 1
+    return digest, len(done), workers
+
+def held_leases(out_folder, worker_id):
+    held = 0
+    for path in glob.glob(os.path.join(out_folder, ".extractor_queue_default", "leases", "*.json")):
+        try:
+            with open(path, encoding="utf-8") as f:
+                held += json.load(f)["worker"] == worker_id
+        except (OSError, ValueError):
+            pass
+    return held
+
+def run(args):
+    results = {"files": args.files, "size_kb": args.size_kb, "type": args.type, "runs": []}
+    with tempfile.TemporaryDirectory() as folder:
+        input_folder = os.path.join(folder, "input")
+        os.makedirs(input_folder)
+        for number in range(args.files):
+            corpus.write_txt(os.path.join(input_folder, f"doc{number:03d}.txt"), args.size_kb / 1024, seed=number)
+        reference = None
+        counts = [int(count) for count in args.workers.split(",")]
+        for count in counts:
+            out_folder = os.path.join(folder, f"out_{count}")
+            started = time.perf_counter()
+            processes = start_workers(count, input_folder, out_folder, args, args.lease_seconds)
+            for process in processes:
+                process.wait()
+            elapsed = time.perf_counter() - started
+            digest, done, workers = merge(input_folder, out_folder)
+            reference = reference or (digest, elapsed)
+            run = {"workers": count, "seconds": round(elapsed, 2), "files_per_s": round(args.files / elapsed, 2),
+                   "speedup": round(reference[1] / elapsed, 2), "files_done": done, "per_worker": workers,
+                   "identical": digest == reference[0]}
+            results["runs"].append(run)
+            print(f"{count} worker(s): {run['seconds']}s, {run['files_per_s']} files/s, speedup {run['speedup']}x, "
+                  f"files per worker {sorted(workers.values())}, identical={run['identical']}")
+            if done != args.files or not run["identical"]:
+                raise SystemExit("❌ Files missing or the merged result differs")
+
+        if args.kill:
+            out_folder = os.path.join(folder, "out_kill")
+            lease = 2
+            processes = start_workers(2, input_folder, out_folder, args, lease)
+            deadline = time.monotonic() + 60
+            while held_leases(out_folder, "w0") == 0 and time.monotonic() < deadline:
+                time.sleep(0.05)
+            processes[0].kill()     # dies holding a lease, without cleaning up
+            started = time.perf_counter()
+            processes[1].wait()
+            digest, done, workers = merge(input_folder, out_folder)
+            print(f"Killed w0 while it held a lease: w1 finished in {time.perf_counter() - started:.1f}s, "
+                  f"files per worker {workers}, identical={digest == reference[0]}")
+            results["kill"] = {"files_done": done, "per_worker": workers, "identical": digest == reference[0]}
+            if done != args.files or digest != reference[0]:
+                raise SystemExit("❌ The killed worker's files were not taken over correctly")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results saved to {args.output}")
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=24, help="Input files to generate (default: 24)")
+    parser.add_argument("--size-kb", type=float, default=512, help="Size of each file in KB (default: 512)")
+    parser.add_argument("--type", default="sentence", help="Extraction type (default: sentence)")
+    parser.add_argument("--workers", default="1,2,4", help="Worker counts to compare (default: 1,2,4)")
+    parser.add_argument("--lease-seconds", type=float, default=60, help="Lease length (default: 60)")
+    parser.add_argument("--kill", action="store_true", help="Also kill a worker mid-run and check the takeover")
+    parser.add_argument("--output", default=None, help="Save the results as JSON")
+    return run(parser.parse_args(argv))
+
+if __name__ == "__main__":
+    sys.exit(main())
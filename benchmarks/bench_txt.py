@@ -0,0 +1,155 @@
+"""TXT reader benchmark: memory-mapped reader vs. open().read() on multi-GB files.
+
+    python benchmarks/bench_txt.py --size-gb 2
+    python benchmarks/bench_txt.py --size-gb 1 --encodings utf-8,cp1252 --output txt.json
+
+Generates one file per encoding (ASCII, UTF-8, windows-1252 with Windows line endings,
+UTF-16 with a BOM, big-endian UTF-16 without one) and, each in a fresh process, times
+reading the whole file with
+read_txt (encoding sniffed), streaming it with iter_txt_chunks, and open().read() told
+the right encoding (the previous reader only ever used UTF-8, which fails on the
+windows-1252 and UTF-16 files). Peak RSS is that process's maximum resident set, so
+it includes the mapped file pages. The texts of all readers must be identical. Before
+that, small samples check that every encoding, BOM-less UTF-16 included, is sniffed
+right.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import corpus  # noqa: E402  (benchmarks/ is on sys.path when run as a script)
+
+BLOCK_MB = 8
+ACCENTED = {"supplier": "fournisseur à Köln", "goods": "Güter", "fee": "frais d’entrée", "notice": "préavis"}
+# encoding -> (Python codec, line ending, BOM written first)
+ENCODINGS = {
+    "ascii": ("ascii", "\n", False),
+    "utf-8": ("utf-8", "\n", False),
+    "cp1252": ("cp1252", "\r\n", False),
+    "utf-16": ("utf-16-le", "\n", True),
+    "utf-16-be": ("utf-16-be", "\n", False),
+}
+# Small texts and the encoding sniff_text_encoding must find for each; UTF-16 of Latin
+# text is all ASCII bytes (NULs included), so it must not be taken for ASCII
+SNIFF_CASES = (
+    ("Hello world. Second line.\n" * 50, ("utf-8", "utf-16-le", "utf-16-be")),
+    ("Güter für den fournisseur à Köln.\n" * 50, ("utf-8", "cp1252", "utf-16-le", "utf-16-be")),
+)
+MODES = ("read_txt", "iter_txt_chunks", "open().read()")
+
+def write_file(path, encoding, size_gb):
+    codec, newline, bom = ENCODINGS[encoding]
+    text = corpus.make_text(BLOCK_MB)
+    if encoding != "ascii":
+        text = " ".join(ACCENTED.get(word, word) for word in text.split(" "))
+    block = (text.replace("\n", newline) + newline * 2).encode(codec)
+    target = int(size_gb * 1024 ** 3)
+    with open(path, "wb") as f:
+        if bom:
+            f.write("\ufeff".encode(codec))
+        written = 0
+        while written < target:
+            f.write(block)
+            written += len(block)
+
+def measure(mode, path, codec):
+    # Runs in a fresh process; prints seconds, peak RSS and a digest of the text
+    import hashlib
+    import resource
+    from extractor_core.text_extractor import iter_txt_chunks, read_txt
+    digest = hashlib.blake2b(digest_size=16)
+    started = time.perf_counter()
+    if mode == "read_txt":
+        texts = [read_txt(path)[0]]
+    elif mode == "iter_txt_chunks":
+        texts = iter_txt_chunks(path)
+    else:
+        with open(path, encoding=codec) as f:
+            texts = [f.read()]
+    chars = 0
+    hashing = 0.0       # time spent on the digest of streamed chunks, not reading
+    for text in texts:
+        chars += len(text)
+        if mode == "iter_txt_chunks":
+            hashed = time.perf_counter()
+            digest.update(text.encode("utf-8"))
+            hashing += time.perf_counter() - hashed
+    seconds = time.perf_counter() - started - hashing
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    if mode != "iter_txt_chunks":
+        for start in range(0, chars, 1 << 26):
+            digest.update(texts[0][start:start + (1 << 26)].encode("utf-8"))
+    print(json.dumps({"seconds": seconds, "peak_rss": peak, "chars": chars, "digest": digest.hexdigest()}))
+
+def run_mode(mode, path, codec):
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--measure", mode, path, codec],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode:
+        return {"error": (result.stderr.strip().splitlines() or ["failed"])[-1]}
+    return json.loads(result.stdout)
+
+def check_sniffing():
+    from extractor_core.text_extractor import read_txt, sniff_text_encoding
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "sample.txt")
+        for text, encodings in SNIFF_CASES:
+            for encoding in encodings:
+                with open(path, "wb") as f:
+                    f.write(text.encode(encoding))
+                sniffed = sniff_text_encoding(text.encode(encoding))[0]
+                read, _ = read_txt(path)
+                if sniffed != encoding or read != text:
+                    raise SystemExit(f"❌ {encoding} text without a BOM was read as {sniffed}")
+    print("✅ Encodings sniffed correctly")
+
+def run(args):
+    check_sniffing()
+    encodings = args.encodings.split(",")
+    results = {"size_gb": args.size_gb, "files": {}}
+    with tempfile.TemporaryDirectory(dir=args.tmp) as folder:
+        for encoding in encodings:
+            path = os.path.join(folder, f"{encoding}.txt")
+            write_file(path, encoding, args.size_gb)
+            size = os.path.getsize(path)
+            codec = ENCODINGS[encoding][0].replace("utf-16-le", "utf-16")
+            runs = {mode: run_mode(mode, path, codec) for mode in MODES}
+            results["files"][encoding] = {"bytes": size, "runs": runs}
+            print(f"{encoding} ({size / 1024 ** 3:.2f} GB):")
+            for mode, entry in runs.items():
+                if "error" in entry:
+                    print(f"  {mode:16} ❌ {entry['error']}")
+                    continue
+                print(f"  {mode:16} {entry['seconds']:7.2f} s  {size / 1024 ** 2 / entry['seconds']:7.0f} MB/s  "
+                      f"peak RSS {entry['peak_rss'] / 1024 ** 3:5.2f} GB")
+            digests = {entry["digest"] for entry in runs.values() if "digest" in entry}
+            if len(digests) != 1:
+                raise SystemExit(f"❌ The readers disagree on {encoding}.txt")
+            os.remove(path)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results saved to {args.output}")
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-gb", type=float, default=2, help="Size of each generated file in GB (default: 2)")
+    parser.add_argument("--encodings", default=",".join(ENCODINGS),
+                        help=f"Comma-separated files to generate: {', '.join(ENCODINGS)} (default: all)")
+    parser.add_argument("--tmp", default=None, help="Folder for the generated files (default: system temp)")
+    parser.add_argument("--output", default=None, help="Save the results as JSON")
+    parser.add_argument("--measure", nargs=3, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.measure:
+        measure(*args.measure)
+        return 0
+    return run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
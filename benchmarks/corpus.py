@@ -0,0 +1,165 @@
+"""Synthetic benchmark corpora.
+
+Every generator is deterministic for a given seed, so two benchmark runs see exactly
+the same input. Sizes are approximate amounts of extracted text, in megabytes.
+"""
+import os
+import random
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+VOCABULARY = ("the supplier shall deliver goods to premises on delivery date and bear all risk "
+              "until completed agreement party notice term fee invoice payment within days of "
+              "receipt schedule annex clause section liability warranty confidential").split()
+
+def make_paragraphs(size_mb, seed=0):
+    # Paragraphs of 3-8 sentences of 6-20 words, until about size_mb of text
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    paragraphs = []
+    total = 0
+    while total < target:
+        sentences = []
+        for _ in range(rng.randint(3, 8)):
+            words = rng.choices(VOCABULARY, k=rng.randint(6, 20))
+            sentences.append(" ".join(words).capitalize() + rng.choice(".!?"))
+        paragraph = " ".join(sentences)
+        paragraphs.append(paragraph)
+        total += len(paragraph) + 2
+    return paragraphs
+
+def make_text(size_mb, seed=0):
+    return "\n\n".join(make_paragraphs(size_mb, seed))
+
+def write_txt(path, size_mb, seed=0):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(make_text(size_mb, seed))
+
+def write_docx(path, size_mb, seed=0):
+    from docx import Document
+    doc = Document()
+    for i, paragraph in enumerate(make_paragraphs(size_mb, seed)):
+        doc.add_paragraph(paragraph)
+        if i % 50 == 49:
+            table = doc.add_table(rows=3, cols=3)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = "Fee 100 EUR per day"
+    doc.save(path)
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def write_pdf(path, size_mb, seed=0, lines_per_page=45, chars_per_line=90):
+    # A minimal uncompressed PDF with Helvetica text; no PDF library required
+    words = make_text(size_mb, seed).split()
+    lines, line = [], ""
+    for word in words:
+        if len(line) + len(word) + 1 > chars_per_line:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    if line:
+        lines.append(line)
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in pages:
+        ops = ["BT /F1 10 Tf 14 TL 50 760 Td"] + [f"({_pdf_escape(text)}) '" for text in page] + ["ET"]
+        content = "\n".join(ops).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        objects.append((f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {len(objects)} 0 R "
+                        f"/Resources << /Font << /F1 3 0 R >> >> >>").encode())
+        kids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = (f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] "
+                  f"/Count {len(kids)} >>").encode()
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+def _table_rows(size_mb, seed=0, columns=6):
+    # Rows of short free-text cells, a number and a date, like an export from a tracker
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    total = 0
+    row_number = 0
+    while total < target:
+        row_number += 1
+        row = [" ".join(rng.choices(VOCABULARY, k=rng.randint(2, 12))) + "." for _ in range(columns - 2)]
+        row += [str(rng.randint(1, 100000)), f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"]
+        total += sum(map(len, row)) + columns
+        yield row
+
+def write_csv(path, size_mb, seed=0):
+    import csv
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([f"Column {i + 1}" for i in range(6)])
+        writer.writerows(_table_rows(size_mb, seed))
+
+def write_xlsx(path, size_mb, seed=0):
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Data")
+    sheet.append([f"Column {i + 1}" for i in range(6)])
+    for row in _table_rows(size_mb, seed):
+        sheet.append(row)
+    workbook.save(path)
+
+# Markup the HTML extractor must get right: boilerplate to drop, and content after a void
+# element (libxml2 leaves <embed> open until its parent closes)
+HTML_FIXTURE = ("<p>Watch the clip <embed src='clip.swf'>before signing.</p>"
+                "<div class='cookie-banner'>Accept all cookies</div>")
+HTML_EXPECTED = ("Watch the clip before signing.",)
+HTML_BOILERPLATE = ("Home", "tracking", "Accept all cookies")
+
+def write_html(path, size_mb, seed=0):
+    body = "\n".join(f"<p>{paragraph}</p>" for paragraph in make_paragraphs(size_mb, seed))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<html><head><title>Benchmark page</title><script>var tracking = 1;</script></head>"
+                f"<body><nav><a href='/'>Home</a></nav><article>{HTML_FIXTURE}{body}</article></body></html>")
+
+GENERATORS = {
+    ".txt": write_txt,
+    ".docx": write_docx,
+    ".pdf": write_pdf,
+    ".csv": write_csv,
+    ".xlsx": write_xlsx,
+    ".html": write_html,
+}
+
+def build_corpus(folder, size_mb, seed=0, extensions=None, sizes=None):
+    # Writes corpus.<ext> for each format into folder; returns {extension: path}.
+    # sizes overrides size_mb per extension, e.g. {".pdf": 0.1}
+    os.makedirs(folder, exist_ok=True)
+    paths = {}
+    for extension, generate in GENERATORS.items():
+        if extensions and extension not in extensions:
+            continue
+        path = os.path.join(folder, "corpus" + extension)
+        generate(path, (sizes or {}).get(extension, size_mb), seed)
+        paths[extension] = path
+    return paths
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+def serve_folder(folder):
+    # Local stand-in web server on a free port; returns (base_url, server). Call
+    # server.shutdown() when done.
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(_QuietHandler, directory=folder))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}", server
@@ -0,0 +1,191 @@
+"""Load generator for the extraction server (`data_extractor.py serve`).
+
+    python benchmarks/load_server.py --spawn --workers 4 --concurrency 16 --duration 20
+    python benchmarks/load_server.py --url http://127.0.0.1:8750 --file input/report.pdf
+
+Each client thread keeps one connection open and loops: submit a job, wait for it,
+download the result, delete the job. A 503 (queue full) is counted and retried after
+the server's Retry-After. Reports completed jobs per second, latency percentiles and
+the rejection count; --output saves them as JSON.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import subprocess
+import http.client
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import corpus  # noqa: E402  (benchmarks/ is on sys.path when run as a script)
+
+SPAWN_PORT = 8751
+STARTUP_TIMEOUT = 120
+
+def connect(args):
+    if args.socket:
+        from extractor_core.server import unix_connection
+        return unix_connection(args.socket, timeout=300)
+    url = urlsplit(args.url)
+    return http.client.HTTPConnection(url.hostname, url.port or 80, timeout=300)
+
+def request(conn, method, path, body=None, headers=None):
+    conn.request(method, path, body=body, headers=headers or {})
+    response = conn.getresponse()
+    return response.status, response.getheaders(), response.read()
+
+def wait_for_server(args, process=None):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise SystemExit("❌ The server exited during startup")
+        try:
+            conn = connect(args)
+            status, _, body = request(conn, "GET", "/health")
+            conn.close()
+            if status == 200:
+                return json.loads(body)
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit("❌ The server did not start in time")
+
+def make_payload(args):
+    # (path, body, headers) of one job submission
+    query = f"type={args.type}&format={args.format}"
+    if args.file:
+        with open(args.file, "rb") as f:
+            data = f.read()
+        name = os.path.basename(args.file)
+        return f"/jobs?name={name}&{query}", data, {"Content-Type": "application/octet-stream"}
+    text = corpus.make_text(args.text_kb / 1024, seed=args.seed)
+    body = json.dumps({"text": text}).encode("utf-8")
+    return f"/jobs?{query}", body, {"Content-Type": "application/json"}
+
+def client(args, payload, stop, stats, lock):
+    path, body, headers = payload
+    conn = connect(args)
+    while not stop.is_set():
+        started = time.perf_counter()
+        status, response_headers, data = request(conn, "POST", path, body, headers)
+        if status == 503:
+            with lock:
+                stats["rejected"] += 1
+            conn.close()    # the server closes a connection whose body it refused
+            conn = connect(args)
+            time.sleep(min(float(dict(response_headers).get("Retry-After", 1)), 1.0) * 0.1)
+            continue
+        if status != 202:
+            with lock:
+                stats["errors"] += 1
+            conn.close()
+            conn = connect(args)
+            continue
+        job = json.loads(data)
+        status, _, data = request(conn, "GET", f"/jobs/{job['id']}?wait=300")
+        job = json.loads(data)
+        downloaded = 0
+        if job["status"] == "done":
+            status, _, data = request(conn, "GET", f"/jobs/{job['id']}/result")
+            downloaded = len(data)
+        request(conn, "DELETE", f"/jobs/{job['id']}")
+        elapsed = time.perf_counter() - started
+        with lock:
+            if job["status"] == "done" and status == 200:
+                stats["latencies"].append(elapsed)
+                stats["bytes"] += downloaded
+            else:
+                stats["errors"] += 1
+    conn.close()
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+def run(args):
+    process = None
+    if args.spawn:
+        command = [sys.executable, os.path.join(ROOT, "data_extractor.py"), "serve",
+                   "--queue-size", str(args.queue_size), "--no-cache"]
+        command += ["--socket", args.socket] if args.socket else ["--port", str(SPAWN_PORT)]
+        if args.workers:
+            command += ["--workers", str(args.workers)]
+        args.url = args.url or f"http://127.0.0.1:{SPAWN_PORT}"
+        started = time.perf_counter()
+        process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL)
+        health = wait_for_server(args, process)
+        print(f"==== Server up with {health['workers']} warm worker(s) in {time.perf_counter() - started:.1f}s ====")
+    else:
+        args.url = args.url or "http://127.0.0.1:8750"
+        health = wait_for_server(args)
+    try:
+        payload = make_payload(args)
+        stats = {"latencies": [], "bytes": 0, "rejected": 0, "errors": 0}
+        lock = threading.Lock()
+        stop = threading.Event()
+        threads = [threading.Thread(target=client, args=(args, payload, stop, stats, lock), daemon=True)
+                   for _ in range(args.concurrency)]
+        print(f"==== {args.concurrency} client(s) for {args.duration:g}s, type={args.type}, "
+              f"payload {len(payload[1]) / 1024:.0f} KB ====")
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    latencies = stats["latencies"]
+    result = {
+        "concurrency": args.concurrency,
+        "workers": health["workers"],
+        "type": args.type,
+        "payload_kb": round(len(payload[1]) / 1024, 1),
+        "seconds": round(elapsed, 2),
+        "jobs": len(latencies),
+        "jobs_per_s": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+        "downloaded_mb": round(stats["bytes"] / (1024 * 1024), 2),
+        "rejected": stats["rejected"],
+        "errors": stats["errors"],
+    }
+    print(f"{result['jobs']} job(s) in {result['seconds']}s: {result['jobs_per_s']} jobs/s, "
+          f"p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, p99 {result['p99_ms']} ms")
+    print(f"{result['downloaded_mb']} MB downloaded, {result['rejected']} rejected (503), {result['errors']} error(s)")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"✅ Results saved to {args.output}")
+    return 1 if stats["errors"] else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator for the extraction server")
+    parser.add_argument("--url", default=None, help="Server address (default: http://127.0.0.1:8750)")
+    parser.add_argument("--socket", default=None, help="Connect to a Unix socket server instead")
+    parser.add_argument("--spawn", action="store_true", help="Start a server for the run and stop it afterwards")
+    parser.add_argument("--workers", type=int, default=None, help="Workers of a spawned server (default: CPUs)")
+    parser.add_argument("--queue-size", type=int, default=64, help="Queue size of a spawned server (default: 64)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Client threads (default: 8)")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds to run (default: 10)")
+    parser.add_argument("--type", default="sentence", help="Extraction type (default: sentence)")
+    parser.add_argument("--format", default="csv", help="Result format (default: csv)")
+    parser.add_argument("--file", default=None, help="Upload this file in every job (default: generated text)")
+    parser.add_argument("--text-kb", type=float, default=64, help="Size of the generated text in KB (default: 64)")
+    parser.add_argument("--seed", type=int, default=0, help="Text generator seed (default: 0)")
+    parser.add_argument("--output", default=None, help="Save the results as JSON")
+    return run(parser.parse_args(argv))
+
+if __name__ == "__main__":
+    sys.exit(main())
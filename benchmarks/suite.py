@@ -0,0 +1,309 @@
+"""Benchmark suite for extractors, segmentation, result tables and writers.
+
+    python benchmarks/suite.py run --size 2 --output results.json
+    python benchmarks/suite.py compare baseline.json results.json
+
+`run` generates a synthetic corpus (TXT, DOCX, PDF, CSV, XLSX, and HTML served from
+a local web server), times every stage and saves the timings, throughput and peak
+memory as JSON. `compare` flags benchmarks that got slower (or hungrier) than a
+stored baseline and exits non-zero if any did.
+"""
+import gc
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from datetime import datetime
+from importlib import metadata
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import corpus  # noqa: E402  (benchmarks/ is on sys.path when run as a script)
+
+RESULTS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+TIME_THRESHOLD = 0.15       # flag runs more than 15% slower than the baseline
+MEMORY_THRESHOLD = 0.25     # flag peak memory more than 25% above the baseline
+MIN_DELTA_SECONDS = 0.02    # ...but never for a slowdown smaller than this (timer noise)
+PACKAGES = ("pandas", "numpy", "pdfplumber", "openpyxl", "lxml", "requests",
+            "pyarrow", "python-docx")
+URL_BATCH_PAGES = 8
+
+def measure(func, repeat):
+    # Best wall time of `repeat` runs, then one extra run under tracemalloc for the peak
+    # Python heap (NumPy buffers included; memory of worker processes is not).
+    # As in timeit, the garbage collector is paused while a run is timed.
+    best = None
+    for _ in range(repeat):
+        result = None
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak, result
+
+def record(name, seconds, peak, size_bytes=None, rows=None, size_key="input_mb"):
+    # MB/s is measured on the input for extractors and segmentation, on the file
+    # written for writers (size_key="output_mb")
+    entry = {"seconds": round(seconds, 6), "peak_mb": round(peak / (1024 * 1024), 3)}
+    if size_bytes is not None:
+        entry[size_key] = round(size_bytes / (1024 * 1024), 3)
+        entry["mb_per_s"] = round(size_bytes / (1024 * 1024) / seconds, 3) if seconds else None
+    if rows is not None:
+        entry["rows"] = rows
+        entry["rows_per_s"] = round(rows / seconds, 1) if seconds else None
+    return name, entry
+
+def bench_extractors(paths, repeat):
+    from extractor_core.docx_extractor import extract_from_docx
+    from extractor_core.html_extractor import extract_from_html
+    from extractor_core.pdf_extractor import extract_from_pdf
+    from extractor_core.spreadsheet_extractor import extract_from_csv, extract_from_excel
+    from extractor_core.text_extractor import extract_from_txt
+    extractors = {
+        ".txt": extract_from_txt,
+        ".docx": extract_from_docx,
+        ".pdf": extract_from_pdf,
+        ".csv": extract_from_csv,
+        ".xlsx": extract_from_excel,
+        ".html": extract_from_html,
+    }
+    for extension, extract in extractors.items():
+        path = paths[extension]
+        seconds, peak, text = measure(lambda: extract(path), repeat)
+        if extension == ".html":
+            check_html_text(text)
+        yield record(f"extract{extension}", seconds, peak, os.path.getsize(path))
+
+def check_html_text(text):
+    paragraphs = text.split("\n\n")
+    missing = [expected for expected in corpus.HTML_EXPECTED if expected not in paragraphs]
+    leaked = [junk for junk in corpus.HTML_BOILERPLATE if junk in text]
+    if missing or leaked:
+        raise SystemExit(f"❌ HTML extraction: missing {missing}, boilerplate kept {leaked}")
+
+def bench_urls(paths, repeat):
+    from extractor_core.url_extractor import extract_from_url, fetch_pages
+    html = paths[".html"]
+    base, server = corpus.serve_folder(os.path.dirname(html))
+    try:
+        url = f"{base}/{os.path.basename(html)}"
+        seconds, peak, _ = measure(lambda: extract_from_url(url), repeat)
+        yield record("extract.url", seconds, peak, os.path.getsize(html))
+        # Distinct URLs (the query string is ignored by the server) fetched concurrently
+        urls = [f"{url}?page={i}" for i in range(URL_BATCH_PAGES)]
+        seconds, peak, _ = measure(lambda: list(fetch_pages(urls)), repeat)
+        yield record("extract.url_batch", seconds, peak, os.path.getsize(html) * len(urls), len(urls))
+    finally:
+        server.shutdown()
+
+def bench_segmentation(text, repeat):
+    from extractor_core.segment import process_text
+    size = len(text.encode("utf-8"))
+    for mode in ("word", "sentence", "paragraph"):
+        seconds, peak, (items, _) = measure(lambda: process_text(text, mode), repeat)
+        yield record(f"segment.{mode}", seconds, peak, size, len(items))
+
+    from extractor_core.wordfreq import TermCounter
+
+    def count_terms():
+        counter = TermCounter([1, 2])
+        counter.add_text(text)
+        return counter
+    seconds, peak, counter = measure(count_terms, repeat)
+    yield record("segment.wordfreq", seconds, peak, size, len(counter.counts))
+
+def bench_frames(text, repeat):
+    from extractor_core.results import build_segment_frame
+    from extractor_core.segment import segment_text
+    segments = segment_text(text)
+    size = len(text.encode("utf-8"))
+    for mode in ("word", "sentence", "paragraph"):
+        seconds, peak, df = measure(lambda: build_segment_frame(segments, mode, "corpus.txt"), repeat)
+        yield record(f"frame.{mode}", seconds, peak, size, len(df))
+
+def bench_writers(text, folder, repeat):
+    from extractor_core.results import iter_segment_frames
+    from extractor_core.segment import segment_text
+    from extractor_core.writers import WRITERS, format_extension, write_frames
+    segments = segment_text(text)
+    for fmt in WRITERS:
+        if fmt == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                print("   (skipping write.parquet: pyarrow is not installed)")
+                continue
+        path = os.path.join(folder, "out" + format_extension(fmt))
+        frames = lambda: iter_segment_frames(segments, "sentence", "corpus.txt")
+        seconds, peak, rows = measure(lambda: write_frames(frames(), [path]), repeat)
+        yield record(f"write.{fmt}", seconds, peak, os.path.getsize(path), rows, "output_mb")
+
+def bench_startup(repeat):
+    # Import time of each front end in a fresh interpreter (best of `repeat`). Fails the
+    # run when one is over STARTUP_BUDGET_MS or imports a heavy module eagerly.
+    from extractor_core.startup import FRONT_ENDS, STARTUP_BUDGET_MS, check_startup, measure_imports
+    for module in FRONT_ENDS:
+        best_ms, problems = None, []
+        for _ in range(repeat):
+            total_ms, problems = check_startup(measure_imports(module), module, STARTUP_BUDGET_MS)
+            best_ms = total_ms if best_ms is None else min(best_ms, total_ms)
+            if not problems:
+                break
+        if problems:
+            raise SystemExit(f"❌ Startup check failed for {module}: " + "; ".join(problems))
+        yield record(f"startup {module}", best_ms / 1000, 0)
+
+GROUPS = ("startup", "extract", "url", "segment", "frame", "write")
+
+def run(args):
+    groups = args.only.split(",") if args.only else list(GROUPS)
+    unknown = [group for group in groups if group not in GROUPS]
+    if unknown:
+        print(f"❌ Unknown group(s): {', '.join(unknown)} (choose from {', '.join(GROUPS)})")
+        return 1
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        print(f"==== Generating a {args.size:g} MB corpus ====")
+        # pdfplumber is two orders of magnitude slower than the other parsers
+        pdf_size = args.pdf_size if args.pdf_size is not None else args.size / 10
+        paths = corpus.build_corpus(folder, args.size, args.seed, sizes={".pdf": pdf_size})
+        with open(paths[".txt"], "r", encoding="utf-8") as f:
+            text = f.read()
+        benches = {
+            "startup": lambda: bench_startup(args.repeat),
+            "extract": lambda: bench_extractors(paths, args.repeat),
+            "url": lambda: bench_urls(paths, args.repeat),
+            "segment": lambda: bench_segmentation(text, args.repeat),
+            "frame": lambda: bench_frames(text, args.repeat),
+            "write": lambda: bench_writers(text, folder, args.repeat),
+        }
+        for group in groups:
+            for name, entry in benches[group]():
+                results[name] = entry
+                rate = f"{entry['mb_per_s']:9.2f} MB/s" if entry.get("mb_per_s") else " " * 14
+                rows = f"{entry['rows_per_s']:12,.0f} rows/s" if entry.get("rows_per_s") else ""
+                print(f"{name:20} {entry['seconds']:9.3f} s {rate} {entry['peak_mb']:9.1f} MB peak {rows}")
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "size_mb": args.size,
+            "pdf_size_mb": pdf_size,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "packages": {name: _version(name) for name in PACKAGES},
+        },
+        "results": results,
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_FOLDER, exist_ok=True)
+        output = os.path.join(RESULTS_FOLDER, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results saved to {output}")
+    return 0
+
+def _version(package):
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+def compare_reports(baseline, current, time_threshold=TIME_THRESHOLD, memory_threshold=MEMORY_THRESHOLD,
+                    min_delta=MIN_DELTA_SECONDS):
+    # Returns [(name, baseline seconds, current seconds, time change, memory change, flags)]
+    rows = []
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        time_change = new["seconds"] / old["seconds"] - 1 if old["seconds"] else 0.0
+        memory_change = new["peak_mb"] / old["peak_mb"] - 1 if old["peak_mb"] else 0.0
+        flags = []
+        if time_change > time_threshold and new["seconds"] - old["seconds"] > min_delta:
+            flags.append("slower")
+        if memory_change > memory_threshold:
+            flags.append("more memory")
+        rows.append((name, old["seconds"], new["seconds"], time_change, memory_change, flags))
+    return rows
+
+def compare(args):
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)
+    if baseline["meta"].get("size_mb") != current["meta"].get("size_mb"):
+        print(f"⚠️  Corpus sizes differ ({baseline['meta'].get('size_mb')} MB vs "
+              f"{current['meta'].get('size_mb')} MB); timings are not comparable")
+    changed = {name: (old, new) for name, old, new in
+               ((name, baseline["meta"]["packages"].get(name), version)
+                for name, version in current["meta"].get("packages", {}).items()) if old != new}
+    for name, (old, new) in changed.items():
+        print(f"   {name}: {old} → {new}")
+
+    rows = compare_reports(baseline, current, args.threshold, args.memory_threshold, args.min_delta)
+    print(f"{'benchmark':20} {'baseline':>10} {'current':>10} {'time':>8} {'memory':>8}")
+    for name, old, new, time_change, memory_change, flags in rows:
+        mark = "❌ " + ", ".join(flags) if flags else "✅"
+        print(f"{name:20} {old:9.3f}s {new:9.3f}s {time_change:+7.0%} {memory_change:+7.0%}  {mark}")
+    missing = sorted(set(baseline["results"]) - set(current["results"]))
+    if missing:
+        print(f"   Not in current run: {', '.join(missing)}")
+    regressions = [row[0] for row in rows if row[5]]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\n✅ No regressions")
+    return 0
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Data Extraction Tool benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Generate a corpus and time every stage")
+    run_parser.add_argument("--size", type=float, default=1.0,
+                            help="Approximate text per corpus file, in MB (default: 1)")
+    run_parser.add_argument("--pdf-size", type=float, default=None,
+                            help="Approximate text in the PDF, in MB (default: a tenth of --size)")
+    run_parser.add_argument("--repeat", type=int, default=5,
+                            help="Runs per benchmark; the fastest is kept (default: 5)")
+    run_parser.add_argument("--seed", type=int, default=0, help="Corpus random seed (default: 0)")
+    run_parser.add_argument("--only", default=None,
+                            help=f"Comma-separated groups to run: {', '.join(GROUPS)} (default: all)")
+    run_parser.add_argument("--output", default=None,
+                            help="JSON file for the results (default: benchmarks/results/benchmark_<timestamp>.json)")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = subparsers.add_parser("compare", help="Flag regressions against a baseline run")
+    compare_parser.add_argument("baseline", help="JSON results of the baseline run")
+    compare_parser.add_argument("current", help="JSON results of the run to check")
+    compare_parser.add_argument("--threshold", type=float, default=TIME_THRESHOLD,
+                                help=f"Allowed slowdown as a fraction (default: {TIME_THRESHOLD})")
+    compare_parser.add_argument("--memory-threshold", type=float, default=MEMORY_THRESHOLD,
+                                help=f"Allowed peak memory growth as a fraction (default: {MEMORY_THRESHOLD})")
+    compare_parser.add_argument("--min-delta", type=float, default=MIN_DELTA_SECONDS,
+                                help=f"Ignore slowdowns smaller than this many seconds (default: {MIN_DELTA_SECONDS})")
+    compare_parser.set_defaults(func=compare)
+    return parser
+
+if __name__ == "__main__":
+    args = build_arg_parser().parse_args()
+    sys.exit(args.func(args))
@@ -1,79 +1,23 @@
 import os
-import requests
-import pandas as pd
-from bs4 import BeautifulSoup
-from docx import Document
-import pdfplumber
-from tabulate import tabulate
-from datetime import datetime
-import re
+import sys
+import argparse
+from extractor_core import ExtractionCache, extract_file, is_supported
+from extractor_core.cache import CACHE_FOLDER, CACHE_MAX_BYTES
+from extractor_core.metrics import NO_METRICS, add_metrics_arguments, file_size, finish_metrics, metrics_from_args
+from extractor_core.paths import INDEX_FILE, INPUT_FOLDER, OUTPUT_FOLDER, ensure_folders, timestamped_filename
+from extractor_core.text_extractor import DEFAULT_ENCODING_ERRORS, ENCODING_ERRORS, STREAM_BUFFER_CHARS
+
+# Parsers, pandas and NumPy are imported by extractor_core on first use, so the
+# first prompt appears without paying for them.
 
 # --- Setup input/output folders ---
-INPUT_FOLDER = "input"
-OUTPUT_FOLDER = "output"
-os.makedirs(INPUT_FOLDER, exist_ok=True)
-os.makedirs(OUTPUT_FOLDER, exist_ok=True)
-
-# --- File extraction functions ---
-def extract_from_pdf(file_path):
-    text = ""
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-    return text
-
-def extract_from_docx(file_path):
-    doc = Document(file_path)
-    return "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
-
-def extract_from_csv(file_path):
-    df = pd.read_csv(file_path)
-    return df.to_string()
-
-def extract_from_excel(file_path):
-    df = pd.read_excel(file_path)
-    return df.to_string()
-
-def extract_from_txt(file_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        return f.read()
-
-def extract_from_url(url):
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, "html.parser")
-    return soup.get_text()
-
-# --- Process text based on extraction type ---
-def process_text(text, extract_type):
-    if extract_type == "word":
-        sentences = re.split(r'(?<=[.!?]) +', text)
-        words = []
-        word_sentence_idx = []
-        for idx, sentence in enumerate(sentences, 1):
-            sentence_words = sentence.split()
-            words.extend(sentence_words)
-            word_sentence_idx.extend([idx]*len(sentence_words))
-        return words, word_sentence_idx
-    elif extract_type == "sentence":
-        sentences = re.split(r'(?<=[.!?]) +', text)
-        return sentences, None
-    elif extract_type == "paragraph":
-        paragraphs = text.split("\n\n")
-        paragraphs = [p for p in paragraphs if p.strip()]
-        return paragraphs, None
-    return [text], None
-
-# --- Helper: generate timestamped filename ---
-def timestamped_filename(input_file_name, extension):
-    base_name = os.path.splitext(os.path.basename(input_file_name))[0]
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return f"{base_name}_results_{timestamp}{extension}"
+ensure_folders()
 
 # --- Main program ---
-def main():
+def main(metrics=NO_METRICS):
     print("==== Data Extraction Tool ====")
+    cache = ExtractionCache()
+    segments = None
 
     while True:  # Outer loop for source selection
         # --- Source selection stage ---
@@ -159,21 +103,16 @@ def main():
                                 continue
 
                         if os.path.exists(file_path):
-                            ext = os.path.splitext(file_path)[-1].lower()
                             try:
-                                if ext == ".pdf":
-                                    text = extract_from_pdf(file_path)
-                                elif ext == ".docx":
-                                    text = extract_from_docx(file_path)
-                                elif ext == ".csv":
-                                    text = extract_from_csv(file_path)
-                                elif ext in [".xls", ".xlsx"]:
-                                    text = extract_from_excel(file_path)
-                                elif ext == ".txt":
-                                    text = extract_from_txt(file_path)
-                                else:
+                                if not is_supported(file_path):
                                     print("❌ Unsupported file type.")
                                     continue
+                                with metrics.stage("extract", os.path.basename(file_path),
+                                                   file_size(file_path)) as stage:
+                                    hits = cache.hits
+                                    text = extract_file(file_path, cache=cache)
+                                    stage.chars = len(text)
+                                    stage.info["cache"] = "hit" if cache.hits > hits else "miss"
                                 break  # valid file and extracted text
                             except Exception as e:
                                 print(f"❌ Error reading file: {e}")
@@ -194,14 +133,20 @@ def main():
                         continue
                     elif url.lower() == "restart":
                         break
+                    import requests
+                    from extractor_core.url_extractor import get_page
                     try:
-                        response = requests.get(url)
-                        if response.status_code == 200:
-                            text = extract_from_url(url)
+                        # One request: the status check and the extraction share the response
+                        with metrics.stage("fetch", url) as stage:
+                            page = get_page(url, cache)
+                            stage.chars = len(page["text"] or "")
+                            stage.info.update(http=page["status"], cache=page["cache"])
+                        if page["status"] == 200:
+                            text = page["text"]
                             file_path = "webpage"
                             break
                         else:
-                            print(f"❌ Unable to reach URL (status {response.status_code}). Try again.")
+                            print(f"❌ Unable to reach URL (status {page['status']}). Try again.")
                     except requests.exceptions.RequestException:
                         print("❌ Invalid URL. Please enter a correct URL.")
                 if url.lower() == "restart":
@@ -218,9 +163,9 @@ def main():
 
         # --- Extraction Type Stage ---
         while True:
-            valid_types = ["word", "sentence", "paragraph"]
+            valid_types = ["word", "sentence", "paragraph", "wordfreq"]
             while True:
-                extract_type = input("Extract (word/sentence/paragraph) or 'exit'/'return'/'redo'/'restart': ").strip().lower()
+                extract_type = input("Extract (word/sentence/paragraph/wordfreq) or 'exit'/'return'/'redo'/'restart': ").strip().lower()
                 if extract_type == "exit":
                     print("👋 Exiting program. Goodbye!")
                     return
@@ -240,6 +185,16 @@ def main():
             elif extract_type not in valid_types:
                 continue
 
+            ngrams = [1]
+            if extract_type == "wordfreq":
+                from extractor_core.wordfreq import parse_ngram_sizes
+                spec = input("N-gram sizes, e.g. 1, 1-2 or 1,3 (Enter for 1): ").strip() or "1"
+                try:
+                    ngrams = parse_ngram_sizes(spec)
+                except ValueError as e:
+                    print(f"❌ {e}")
+                    continue
+
             # --- Confirmation Stage Before Output ---
             print("\n✅ Current selections:")
             print(f"Source Type: {source_type}")
@@ -248,6 +203,8 @@ def main():
             else:
                 print(f"URL: {url}")
             print(f"Extraction Type: {extract_type}")
+            if extract_type == "wordfreq":
+                print(f"N-gram sizes: {', '.join(map(str, ngrams))}")
             confirm = input("\nConfirm selections? (yes/no/exit/restart): ").strip().lower()
             if confirm == "exit":
                 print("👋 Exiting program. Goodbye!")
@@ -260,36 +217,41 @@ def main():
                 print("❌ Invalid input. Please type yes, no, restart, or exit.")
                 continue
 
-            # --- Process Text ---
-            results, word_sentence_idx = process_text(text, extract_type)
-
-            # --- Build structured DataFrame ---
-            data = []
-            for i, content in enumerate(results, 1):
-                preview = " ".join(content.split()[:10])
-                row = {
-                    "Source": os.path.basename(file_path),
-                    "Type": extract_type,
-                    "Index": i,
-                    "Content": content,
-                    "Word Count": len(content.split()),
-                    "Character Length": len(content),
-                    "Preview": preview
-                }
-                if extract_type == "word":
-                    row["Position"] = i
-                    row["Sentence Index"] = word_sentence_idx[i-1]
-                data.append(row)
-
-            df = pd.DataFrame(data)
+            from extractor_core.results import iter_segment_frames
+            from extractor_core.segment import segment_text
+            from extractor_core.writers import format_extension, iter_frame_batches, write_frames
+
+            # --- Segment text (once per source; reused for every extraction type) ---
+            source = os.path.basename(file_path)
+            label = source if source_type == "file" else url  # name in the metrics records
+            counter = None
+            if extract_type == "wordfreq":
+                # Counted in chunks; the one-row-per-word segmentation is not needed
+                from extractor_core.wordfreq import TermCounter
+                with metrics.stage("count", label) as stage:
+                    counter = TermCounter(ngrams)
+                    counter.add_text(text)
+                    stage.chars = len(text)
+                    stage.items = len(counter.counts)
+            elif segments is None or segments.text is not text:
+                with metrics.stage("segment", label) as stage:
+                    segments = segment_text(text)
+                    stage.chars = len(text)
+                    stage.info.update(words=len(segments.words), sentences=len(segments.sentences),
+                                      paragraphs=len(segments.paragraphs))
 
             # --- Output Stage ---
+            save_formats = {"2": "csv", "3": "xlsx", "4": "jsonl", "5": "parquet", "6": "csv.gz"}
             while True:
                 print("\nOutput Options:")
-                print("1. Display in terminal")
+                print("1. Display in terminal (a page at a time)")
                 print("2. Save to CSV")
                 print("3. Save to Excel")
-                choice = input("Choose (1/2/3) or 'exit'/'return'/'redo'/'restart': ").strip().lower()
+                print("4. Save to JSON Lines")
+                print("5. Save to Parquet")
+                print("6. Save to compressed CSV (.csv.gz)")
+                print("7. Summary (counts and length distribution)")
+                choice = input("Choose (1-7) or 'exit'/'return'/'redo'/'restart': ").strip().lower()
                 if choice == "exit":
                     print("👋 Exiting program. Goodbye!")
                     return
@@ -299,23 +261,41 @@ def main():
                     break  # back to extraction type
                 elif choice == "restart":
                     break  # back to choose source
-                elif choice == "1":
-                    print(tabulate(df, headers="keys", tablefmt="grid"))
-                    break
-                elif choice == "2":
-                    out_name = timestamped_filename(file_path, ".csv")
-                    out_path = os.path.join(OUTPUT_FOLDER, out_name)
-                    df.to_csv(out_path, index=False)
-                    print(f"✅ Results saved to {out_path}")
+                elif choice in ("1", "7"):
+                    # Only the rows on screen are built and formatted
+                    from extractor_core.pager import FramePages, SegmentPages, print_summary, run_pager
+                    if counter is not None:
+                        pages = FramePages(counter.frame(), "Term", ["Count"], "N")
+                    else:
+                        pages = SegmentPages(segments, extract_type, source)
+                    with metrics.stage("display", label) as stage:
+                        if choice == "1":
+                            stage.items = run_pager(pages)
+                        else:
+                            print_summary(pages)
+                        stage.info.update(type=extract_type, rows=len(pages))
                     break
-                elif choice == "3":
-                    out_name = timestamped_filename(file_path, ".xlsx")
+                elif choice in save_formats:
+                    # Rows are built and written in batches; the full table is never held in memory
+                    # (so the "save" stage includes building the rows)
+                    out_name = timestamped_filename(file_path, format_extension(save_formats[choice]))
                     out_path = os.path.join(OUTPUT_FOLDER, out_name)
-                    df.to_excel(out_path, index=False)
+                    try:
+                        with metrics.stage("save", label) as stage:
+                            if counter is not None:
+                                frames = iter_frame_batches(counter.frame())
+                            else:
+                                frames = iter_segment_frames(segments, extract_type, source)
+                            stage.items = write_frames(frames, [out_path])
+                            stage.bytes_out = file_size(out_path)
+                            stage.info.update(type=extract_type, format=save_formats[choice])
+                    except Exception as e:
+                        print(f"❌ Could not save results: {e}")
+                        continue
                     print(f"✅ Results saved to {out_path}")
                     break
                 else:
-                    print("❌ Invalid choice. Please select 1, 2, 3 or navigation commands.")
+                    print("❌ Invalid choice. Please select 1-7 or navigation commands.")
 
             # --- Next Action ---
             print("\nNext Actions:")
@@ -335,5 +315,308 @@ def main():
             else:
                 print("❌ Invalid choice. Returning to next action menu.")
 
+
+def output_formats(spec):
+    from extractor_core.writers import parse_formats
+    try:
+        return parse_formats(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def ngram_sizes(spec):
+    from extractor_core.wordfreq import parse_ngram_sizes
+    try:
+        return parse_ngram_sizes(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def add_wordfreq_arguments(parser):
+    # Options of --type wordfreq (one merged term frequency table for the whole run)
+    parser.add_argument("--ngrams", type=ngram_sizes, default=[1],
+                        help="wordfreq: n-gram sizes to count, e.g. '1', '1-3' or '1,3' (default: 1)")
+    parser.add_argument("--top", type=int, default=None,
+                        help="wordfreq: keep only the most frequent terms of each n-gram size (default: all)")
+    parser.add_argument("--casefold", action="store_true", help="wordfreq: count 'The' and 'the' as one term")
+    parser.add_argument("--stopwords", nargs="?", const="english", default=None, metavar="FILE",
+                        help="wordfreq: skip stopwords, from a file with one word per line "
+                             "(default list: English)")
+    parser.add_argument("--max-terms", type=int, default=2_000_000,
+                        help="wordfreq: distinct terms held before the rarest are dropped (default: 2000000)")
+
+def add_dedup_arguments(parser):
+    # Options of --dedup (repeated sentences/paragraphs across the whole run)
+    parser.add_argument("--dedup", nargs="?", const="drop", choices=["drop", "mark"], default=None,
+                        help="Drop sentences/paragraphs seen earlier in the run, or 'mark' them with a "
+                             "Duplicate Of column (default: drop)")
+    parser.add_argument("--near-dup", nargs="?", type=float, const=0.8, default=None, metavar="THRESHOLD",
+                        help="--dedup: also catch near-duplicates, by MinHash similarity of their word "
+                             "3-shingles (default threshold: 0.8)")
+    parser.add_argument("--dedup-memory", type=float, default=256,
+                        help="--dedup: memory for fingerprints in MB; when full, later rows are no longer "
+                             "remembered (default: 256)")
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Data Extraction Tool")
+    add_metrics_arguments(parser)
+    # Without a subcommand the interactive tool starts
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch = subparsers.add_parser("batch", help="Extract every supported file in a folder without prompts")
+    batch.add_argument("input", nargs="?", default=INPUT_FOLDER, help="Folder to process (default: input/)")
+    batch.add_argument("--type", choices=["word", "sentence", "paragraph", "wordfreq"], default="sentence",
+                       help="Extraction type (default: sentence)")
+    batch.add_argument("--out", default=OUTPUT_FOLDER, help="Folder for result files (default: output/)")
+    batch.add_argument("--workers", type=int, default=None,
+                       help="Number of worker processes (default: number of CPUs)")
+    batch.add_argument("--pages", default=None,
+                       help="PDF pages to extract, e.g. '1-50' or '1-10,20,30-' (default: all pages)")
+    batch.add_argument("--docx-extras", action="store_true",
+                       help="Also extract DOCX headers, footers, footnotes and endnotes")
+    batch.add_argument("--encoding-errors", choices=ENCODING_ERRORS, default=DEFAULT_ENCODING_ERRORS,
+                       help="What to do with bytes of a .txt file that cannot be decoded: fail the file (strict), "
+                            "replace them with U+FFFD or drop them (default: replace)")
+    batch.add_argument("--format", dest="formats", type=output_formats, default=["csv"],
+                       help="Comma-separated output formats: csv, csv.gz, jsonl, parquet, xlsx (default: csv)")
+    batch.add_argument("--offsets", action="store_true",
+                       help="Add Start Offset / End Offset columns (character positions in the extracted text)")
+    batch.add_argument("--stream", action="store_true",
+                       help="Stream .txt files in chunks and spreadsheets row by row, writing rows as they are produced")
+    batch.add_argument("--buffer-size", type=float, default=STREAM_BUFFER_CHARS / (1024 * 1024),
+                       help="Streaming buffer in millions of characters (default: 8)")
+    batch.add_argument("--provenance", action="store_true",
+                       help="Add Sheet / Row / Column columns for CSV and Excel sources (streams them row by row)")
+    batch.add_argument("--cache-dir", default=CACHE_FOLDER,
+                       help=f"Folder for cached extractions (default: {CACHE_FOLDER}/)")
+    batch.add_argument("--cache-size", type=float, default=CACHE_MAX_BYTES / (1024 * 1024),
+                       help="Cache size budget in MB; least recently used entries are evicted (default: 512)")
+    batch.add_argument("--no-cache", action="store_true", help="Always parse files from scratch")
+    batch.add_argument("--incremental", action="store_true",
+                       help="Only extract new or changed files (tracked in a manifest in the output folder), "
+                            "overwrite their results and delete results of removed files")
+    batch.add_argument("--watch", action="store_true",
+                       help="Like --incremental, then keep running and extract files as they change")
+    batch.add_argument("--index", nargs="?", const=INDEX_FILE, default=None, metavar="FILE",
+                       help=f"Add every extracted file's words to a word index for the query command "
+                            f"(default file: {INDEX_FILE})")
+    batch.add_argument("--job", nargs="?", const="default", default=None, metavar="NAME",
+                       help="Run as a resumable job: each file in its own process, progress in a journal in the "
+                            "output folder; rerun the same command to resume (default name: default)")
+    batch.add_argument("--file-timeout", type=float, default=None, metavar="SECONDS",
+                       help="--job: stop a file's worker after this many seconds and quarantine the file")
+    batch.add_argument("--max-memory", type=float, default=None, metavar="MB",
+                       help="--job: stop a file's worker when it uses more memory than this and quarantine the file")
+    batch.add_argument("--retry-quarantined", action="store_true",
+                       help="--job: extract files that were quarantined by an earlier run again")
+    batch.add_argument("--restart", action="store_true", help="--job: forget the journal and start from scratch")
+    add_wordfreq_arguments(batch)
+    add_dedup_arguments(batch)
+    add_metrics_arguments(batch, subcommand=True)
+    batch.set_defaults(func=run_batch)
+
+    urls = subparsers.add_parser("urls", help="Fetch and extract a list of URLs concurrently")
+    urls.add_argument("url_file", help="Text file with one URL per line (# starts a comment)")
+    urls.add_argument("--type", choices=["word", "sentence", "paragraph", "wordfreq"], default="sentence",
+                      help="Extraction type (default: sentence)")
+    urls.add_argument("--out", default=OUTPUT_FOLDER, help="Folder for result files (default: output/)")
+    urls.add_argument("--workers", type=int, default=None,
+                      help="Pages fetched at the same time (default: 16)")
+    urls.add_argument("--per-host", type=int, default=None,
+                      help="Maximum simultaneous requests to one host (default: 4)")
+    urls.add_argument("--timeout", type=float, default=None,
+                      help="Seconds to wait for a server to respond (default: 30)")
+    urls.add_argument("--format", dest="formats", type=output_formats, default=["csv"],
+                      help="Comma-separated output formats: csv, csv.gz, jsonl, parquet, xlsx (default: csv)")
+    urls.add_argument("--offsets", action="store_true",
+                      help="Add Start Offset / End Offset columns (character positions in the extracted text)")
+    urls.add_argument("--cache-dir", default=CACHE_FOLDER,
+                      help=f"Folder for cached pages (default: {CACHE_FOLDER}/)")
+    urls.add_argument("--cache-size", type=float, default=CACHE_MAX_BYTES / (1024 * 1024),
+                      help="Cache size budget in MB (default: 512)")
+    urls.add_argument("--no-cache", action="store_true", help="Always download pages in full")
+    urls.add_argument("--index", nargs="?", const=INDEX_FILE, default=None, metavar="FILE",
+                      help=f"Add every page's words to a word index for the query command (default file: {INDEX_FILE})")
+    add_wordfreq_arguments(urls)
+    add_dedup_arguments(urls)
+    add_metrics_arguments(urls, subcommand=True)
+    urls.set_defaults(func=run_url_batch)
+
+    worker = subparsers.add_parser("worker", help="Extract files from a folder shared with other workers "
+                                                  "(on this or other machines); see merge")
+    worker.add_argument("input", nargs="?", default=INPUT_FOLDER, help="Shared folder to process (default: input/)")
+    worker.add_argument("--type", choices=["word", "sentence", "paragraph"], default="sentence",
+                        help="Extraction type (default: sentence)")
+    worker.add_argument("--out", default=OUTPUT_FOLDER,
+                        help="Shared folder for the queue and the results (default: output/)")
+    worker.add_argument("--queue", default="default", help="Name of the queue to join (default: default)")
+    worker.add_argument("--worker-id", default=None, help="Name of this worker (default: <host>-<pid>)")
+    worker.add_argument("--workers", type=int, default=None,
+                        help="Files this worker extracts at the same time (default: number of CPUs)")
+    worker.add_argument("--lease-seconds", type=float, default=60,
+                        help="Seconds without a heartbeat after which a worker's files are taken over (default: 60)")
+    worker.add_argument("--file-timeout", type=float, default=None, metavar="SECONDS",
+                        help="Stop extracting a file after this many seconds and mark it failed")
+    worker.add_argument("--max-memory", type=float, default=None, metavar="MB",
+                        help="Stop extracting a file that uses more memory than this and mark it failed")
+    worker.add_argument("--pages", default=None,
+                        help="PDF pages to extract, e.g. '1-50' or '1-10,20,30-' (default: all pages)")
+    worker.add_argument("--docx-extras", action="store_true",
+                        help="Also extract DOCX headers, footers, footnotes and endnotes")
+    worker.add_argument("--encoding-errors", choices=ENCODING_ERRORS, default=DEFAULT_ENCODING_ERRORS,
+                        help="Decode error policy for .txt files: strict, replace or ignore (default: replace)")
+    worker.add_argument("--format", dest="formats", type=output_formats, default=["csv"],
+                        help="Comma-separated output formats: csv, csv.gz, jsonl, parquet, xlsx (default: csv)")
+    worker.add_argument("--offsets", action="store_true",
+                        help="Add Start Offset / End Offset columns (character positions in the extracted text)")
+    worker.add_argument("--stream", action="store_true",
+                        help="Stream .txt files in chunks and spreadsheets row by row")
+    worker.add_argument("--buffer-size", type=float, default=STREAM_BUFFER_CHARS / (1024 * 1024),
+                        help="Streaming buffer in millions of characters (default: 8)")
+    worker.add_argument("--provenance", action="store_true",
+                        help="Add Sheet / Row / Column columns for CSV and Excel sources")
+    worker.add_argument("--cache-dir", default=CACHE_FOLDER,
+                        help=f"Folder for cached extractions (default: {CACHE_FOLDER}/)")
+    worker.add_argument("--cache-size", type=float, default=CACHE_MAX_BYTES / (1024 * 1024),
+                        help="Cache size budget in MB (default: 512)")
+    worker.add_argument("--no-cache", action="store_true", help="Always parse files from scratch")
+    add_metrics_arguments(worker, subcommand=True)
+    worker.set_defaults(func=run_worker, index=None)
+
+    merge = subparsers.add_parser("merge", help="Combine the results of the workers of a queue")
+    merge.add_argument("input", nargs="?", default=INPUT_FOLDER, help="The folder the workers processed "
+                                                                      "(default: input/)")
+    merge.add_argument("--out", default=OUTPUT_FOLDER, help="Folder of the queue (default: output/)")
+    merge.add_argument("--queue", default="default", help="Name of the queue (default: default)")
+    merge.add_argument("--partial", action="store_true", help="Merge even if some files are not finished yet")
+    merge.add_argument("--clean", action="store_true",
+                       help="Delete the queue folder (leases and per-worker results) after merging")
+    add_metrics_arguments(merge, subcommand=True)
+    merge.set_defaults(func=run_merge)
+
+    query = subparsers.add_parser("query", help="Look up a word or phrase in the word index")
+    query.add_argument("query", help="A word, or several words to find as a phrase")
+    query.add_argument("--index", default=INDEX_FILE, help=f"Index file (default: {INDEX_FILE})")
+    query.add_argument("--limit", type=int, default=20, help="Sources to list (default: 20)")
+    query.add_argument("--max-sentences", type=int, default=10,
+                       help="Sentence indices to list per source (default: 10)")
+    query.add_argument("--positions", action="store_true", help="Also list the word positions of every match")
+    query.set_defaults(func=run_query)
+
+    serve = subparsers.add_parser("serve", help="Run a local extraction server with a pool of warm worker processes")
+    serve.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8750, help="Port to listen on (default: 8750)")
+    serve.add_argument("--socket", default=None, metavar="PATH", help="Listen on a Unix socket instead of a port")
+    serve.add_argument("--workers", type=int, default=None,
+                       help="Worker processes (default: number of CPUs)")
+    serve.add_argument("--queue-size", type=int, default=64,
+                       help="Jobs that may wait for a worker; further submissions get 503 (default: 64)")
+    serve.add_argument("--jobs-dir", default=os.path.join(OUTPUT_FOLDER, "server_jobs"),
+                       help="Folder for uploads and results (default: output/server_jobs/)")
+    serve.add_argument("--job-ttl", type=float, default=3600,
+                       help="Seconds a finished job and its files are kept (default: 3600)")
+    serve.add_argument("--max-upload", type=float, default=512, help="Largest request body in MB (default: 512)")
+    serve.add_argument("--allow-paths", action="store_true",
+                       help="Let clients submit paths of files on this machine ({\"path\": ...} jobs)")
+    serve.add_argument("--cache-dir", default=CACHE_FOLDER,
+                       help=f"Folder for cached extractions (default: {CACHE_FOLDER}/)")
+    serve.add_argument("--cache-size", type=float, default=CACHE_MAX_BYTES / (1024 * 1024),
+                       help="Cache size budget in MB (default: 512)")
+    serve.add_argument("--no-cache", action="store_true", help="Always parse files from scratch")
+    serve.add_argument("--verbose", action="store_true", help="Log every request")
+    add_metrics_arguments(serve, subcommand=True)
+    serve.set_defaults(func=run_server)
+    return parser
+
+def check_wordfreq_args(args):
+    # Returns an error message, or None
+    if args.type != "wordfreq":
+        return None
+    if args.index:
+        return "--type wordfreq writes no per-word rows, so it can't be combined with --index"
+    if getattr(args, "incremental", False) or getattr(args, "watch", False) or getattr(args, "job", None):
+        return ("--type wordfreq merges every file into one table, so it can't be combined with --incremental, "
+                "--watch or --job")
+    if args.stopwords not in (None, "english") and not os.path.isfile(args.stopwords):
+        return f"Stopword file not found: {args.stopwords}"
+    return None
+
+def check_dedup_args(args):
+    # Returns an error message, or None
+    if not args.dedup:
+        return "--near-dup only applies together with --dedup" if args.near_dup is not None else None
+    if args.type not in ("sentence", "paragraph"):
+        return "--dedup works on sentences and paragraphs"
+    if args.near_dup is not None and not 0 < args.near_dup <= 1:
+        return "--near-dup must be a similarity between 0 and 1"
+    if getattr(args, "stream", False) or getattr(args, "provenance", False):
+        return "--dedup needs each file's rows at once, so it can't be combined with --stream or --provenance"
+    if getattr(args, "incremental", False) or getattr(args, "watch", False) or getattr(args, "job", None):
+        return "--dedup remembers rows for one run only, so it can't be combined with --incremental, --watch or --job"
+    return None
+
+def run_batch(args, metrics=NO_METRICS):
+    if args.index and (args.stream or args.provenance):
+        print("❌ --index needs each file's full text, so it can't be combined with --stream or --provenance")
+        return 1
+    error = check_wordfreq_args(args) or check_dedup_args(args)
+    if error:
+        print(f"❌ {error}")
+        return 1
+    if args.job is None and (args.file_timeout or args.max_memory or args.retry_quarantined or args.restart):
+        print("❌ --file-timeout, --max-memory, --retry-quarantined and --restart only apply to --job runs")
+        return 1
+    if args.job is not None:
+        if args.incremental or args.watch:
+            print("❌ --job keeps its own journal, so it can't be combined with --incremental or --watch")
+            return 1
+        from extractor_core.jobs import run_job
+        return run_job(args, metrics)
+    if args.incremental or args.watch:
+        # Doesn't import the batch machinery (or pandas) unless something changed
+        from extractor_core.incremental import run_incremental
+        return run_incremental(args, metrics)
+    from extractor_core.batch import run_batch
+    return run_batch(args, metrics)
+
+def run_url_batch(args, metrics=NO_METRICS):
+    error = check_wordfreq_args(args) or check_dedup_args(args)
+    if error:
+        print(f"❌ {error}")
+        return 1
+    from extractor_core.batch import run_url_batch
+    return run_url_batch(args, metrics)
+
+def run_worker(args, metrics=NO_METRICS):
+    from extractor_core.distributed import run_worker
+    return run_worker(args, metrics)
+
+def run_merge(args, metrics=NO_METRICS):
+    from extractor_core.distributed import run_merge
+    return run_merge(args, metrics)
+
+def run_query(args, metrics=NO_METRICS):
+    from extractor_core.index import run_query
+    return run_query(args)
+
+def run_server(args, metrics=NO_METRICS):
+    from extractor_core.server import run_server
+    return run_server(args, metrics)
+
+def run_cli(argv):
+    args = build_arg_parser().parse_args(argv)
+    metrics = metrics_from_args(args, args.command or "cli")
+    try:
+        if args.command is None:
+            main(metrics)
+            return 0
+        return args.func(args, metrics)
+    finally:
+        profile_path = finish_metrics(metrics)
+        if metrics.enabled:
+            print(f"✅ Stage metrics appended to {metrics.path}")
+        if profile_path:
+            print(f"✅ Profile of the slowest stage saved to {profile_path}")
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
     main()
@@ -1,80 +1,228 @@
 import os
-import requests
-import pandas as pd
-from bs4 import BeautifulSoup
-from docx import Document
-import pdfplumber
-from tabulate import tabulate
+import sys
+import argparse
+import threading
 from datetime import datetime
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog, ttk
-
-# --------------------- Extractor Functions --------------------- #
-def extract_from_pdf(file_path):
-    text = ""
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-    return text
-
-def extract_from_docx(file_path):
-    doc = Document(file_path)
-    return "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
-
-def extract_from_csv(file_path):
-    df = pd.read_csv(file_path)
-    return df.to_string()
-
-def extract_from_excel(file_path):
-    df = pd.read_excel(file_path)
-    return df.to_string()
-
-def extract_from_txt(file_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        return f.read()
-
-def extract_from_url(url):
-    try:
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, "html.parser")
-        return soup.get_text()
-    except:
-        return ""
+from extractor_core import ExtractionCache, extract_file, extract_url, is_supported
+from extractor_core.metrics import NO_METRICS, add_metrics_arguments, file_size, finish_metrics, metrics_from_args
+from extractor_core.paths import INPUT_FOLDER, OUTPUT_FOLDER
 
 # --------------------- Text Processing --------------------- #
-def process_text(text, extract_type):
-    if extract_type == "word":
-        items = text.split()
-    elif extract_type == "sentence":
-        items = text.split(". ")
-    elif extract_type == "paragraph":
-        items = text.split("\n\n")
-    else:
-        items = [text]
-
-    structured = []
-    for idx, item in enumerate(items, start=1):
-        structured.append({
-            "ID": idx,
-            "Extracted Data": item.strip(),
-            "Type": extract_type,
-            "Length": len(item),
-            "Preview": item[:50] + ("..." if len(item) > 50 else "")
-        })
-    return structured
+def process_text(text, extract_type, task=None, metrics=NO_METRICS, source=None):
+    from extractor_core.results import build_preview_frame
+    from extractor_core.segment import segment_text
+
+    if extract_type == "wordfreq":
+        # One row per distinct word, counted in chunks (see extractor_core.wordfreq)
+        from extractor_core.wordfreq import TermCounter
+        if task:
+            task.report(message="Counting words...")
+        with metrics.stage("count", source) as stage:
+            counter = TermCounter()
+            counter.add_text(text)
+            stage.chars = len(text)
+            stage.items = len(counter.counts)
+        if task:
+            task.check()
+        return counter.frame()
+
+    # Same segmentation rules as the terminal version
+    if task:
+        task.report(message="Splitting text...")
+    with metrics.stage("segment", source) as stage:
+        if extract_type in ["word", "sentence", "paragraph"]:
+            items = segment_text(text).texts(extract_type)
+        else:
+            items = [text]
+        stage.chars = len(text)
+        stage.items = len(items)
+    if task:
+        task.check()
+        task.report(message=f"Building table of {len(items):,} rows...")
+    with metrics.stage("rows", source) as stage:
+        df = build_preview_frame(items, extract_type)
+        stage.items = len(df)
+        stage.info["type"] = extract_type
+    return df
+
+# --------------------- Background Tasks --------------------- #
+class TaskCancelled(Exception):
+    pass
+
+class BackgroundTask:
+    """Runs ``func(task)`` on a worker thread behind a modal progress window.
+
+    The worker never touches Tk: it calls ``report``/``progress`` and ``check``, and
+    the window polls that state with ``after``. ``run`` blocks the calling dialog flow
+    (via ``wait_window``) while the Tk event loop keeps the application responsive.
+    Cancelling takes effect at the worker's next ``check``/``progress`` call.
+    """
+    POLL_MS = 50
+
+    def __init__(self, master, title, func):
+        self.master = master
+        self.title = title
+        self.func = func
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._state = (None, None, "Working...")
+        self._done = False
+        self._result = None
+        self._error = None
+
+    # --- Called from the worker thread ---
+    def report(self, done=None, total=None, message=None):
+        with self._lock:
+            self._state = (done, total, message or self._state[2])
+
+    def progress(self, done, total):
+        self.check()
+        self.report(done, total, f"{self.title}... {done:,} / {total:,}")
+
+    def check(self):
+        if self._cancel.is_set():
+            raise TaskCancelled()
+
+    def _work(self):
+        try:
+            self._result = self.func(self)
+        except BaseException as e:
+            self._error = e
+        self._done = True
+
+    # --- Called from the Tk thread ---
+    def run(self):
+        window = tk.Toplevel(self.master)
+        window.title(self.title)
+        window.resizable(False, False)
+        window.transient(self.master)
+        window.protocol("WM_DELETE_WINDOW", self.cancel)
+        label = tk.Label(window, text="Working...", width=50, anchor=tk.W)
+        label.pack(padx=15, pady=(15, 5))
+        bar = ttk.Progressbar(window, length=350, mode="indeterminate")
+        bar.pack(padx=15, pady=5)
+        bar.start(15)
+        self._cancel_button = tk.Button(window, text="Cancel", width=12, command=self.cancel)
+        self._cancel_button.pack(pady=(5, 15))
+        window.grab_set()
+
+        def poll():
+            if self._done:
+                window.destroy()
+                return
+            with self._lock:
+                done, total, message = self._state
+            label.config(text=message)
+            if total:
+                if str(bar["mode"]) != "determinate":
+                    bar.stop()
+                    bar.config(mode="determinate", maximum=total)
+                bar["value"] = done
+            window.after(self.POLL_MS, poll)
+
+        threading.Thread(target=self._work, daemon=True).start()
+        window.after(self.POLL_MS, poll)
+        self.master.wait_window(window)
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def cancel(self):
+        self._cancel.set()
+        self.report(message="Cancelling...")
+        self._cancel_button.config(state=tk.DISABLED)
+
+# --------------------- Virtualized Table --------------------- #
+class VirtualTable(tk.Frame):
+    """Treeview that only holds the rows in view.
+
+    The Treeview keeps exactly one screenful of items; scrolling moves a window over
+    the DataFrame's column arrays and refills those items, so a million-row result
+    costs the same Tk memory as a twenty-row one.
+    """
+    def __init__(self, master, df, **kwargs):
+        super().__init__(master, **kwargs)
+        self.df = df
+        self.columns = [df[col].to_numpy() for col in df.columns]
+        self.total = len(df)
+        self.top = 0
+        self.visible = 1
+
+        self.tree = ttk.Treeview(self, columns=list(df.columns), show="headings", height=1)
+        for col in df.columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=150, anchor=tk.W)
+        self.scroll_y = tk.Scrollbar(self, command=self.yview)
+        self.scroll_x = tk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.tree.xview)
+        self.tree.config(xscrollcommand=self.scroll_x.set)
+        self.status = tk.Label(self, anchor=tk.W)
+
+        self.status.pack(side=tk.BOTTOM, fill=tk.X)
+        self.scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+        self.scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(1, "units"))
+        for key, amount, what in (("<Up>", -1, "units"), ("<Down>", 1, "units"),
+                                  ("<Prior>", -1, "pages"), ("<Next>", 1, "pages")):
+            self.tree.bind(key, lambda e, a=amount, w=what: self.scroll(a, w) or "break")
+        self.tree.bind("<Home>", lambda e: self.show(0) or "break")
+        self.tree.bind("<End>", lambda e: self.show(self.total) or "break")
+
+    def _row_height(self):
+        height = ttk.Style().lookup("Treeview", "rowheight")
+        try:
+            return max(1, int(height))
+        except (TypeError, ValueError):
+            return 20
+
+    def _on_resize(self, event):
+        # The first row of pixels is the heading; the rest fits this many rows
+        visible = max(1, event.height // self._row_height() - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self.tree.config(height=visible)
+            self.show(self.top)
+
+    def yview(self, *args):
+        # Scrollbar protocol: ("moveto", fraction) or ("scroll", n, "units"/"pages")
+        if args[0] == "moveto":
+            self.show(int(float(args[1]) * self.total))
+        elif args[0] == "scroll":
+            self.scroll(int(args[1]), args[2])
+
+    def scroll(self, amount, what):
+        self.show(self.top + amount * (self.visible if what == "pages" else 1))
+
+    def show(self, top):
+        self.top = max(0, min(top, self.total - self.visible))
+        end = min(self.top + self.visible, self.total)
+        self.tree.delete(*self.tree.get_children())
+        for row in zip(*(column[self.top:end] for column in self.columns)):
+            self.tree.insert("", tk.END, values=row)
+        if self.total:
+            self.scroll_y.set(self.top / self.total, end / self.total)
+            self.status.config(text=f"Rows {self.top + 1:,}-{end:,} of {self.total:,}")
+        else:
+            self.scroll_y.set(0, 1)
+            self.status.config(text="No rows")
 
 # --------------------- GUI --------------------- #
 class DataExtractorGUI:
-    def __init__(self, master):
+    def __init__(self, master, metrics=NO_METRICS):
         self.master = master
+        self.metrics = metrics
         self.master.title("Data Extraction Tool GUI")
         self.master.geometry("800x600")
 
         # Ensure input and output folders exist
-        self.input_folder = "input"
-        self.output_folder = "output"
+        self.input_folder = INPUT_FOLDER
+        self.output_folder = OUTPUT_FOLDER
         os.makedirs(self.input_folder, exist_ok=True)
         os.makedirs(self.output_folder, exist_ok=True)
 
@@ -83,7 +231,9 @@ class DataExtractorGUI:
         self.source_type = ""
         self.extract_type = ""
         self.text = ""
+        self.url = ""
         self.results = []
+        self.cache = ExtractionCache()
 
         # GUI Elements
         tk.Label(master, text="Data Extraction Tool GUI", font=("Arial", 16)).pack(pady=10)
@@ -116,8 +266,13 @@ class DataExtractorGUI:
                 continue  # allow redoing stages
 
             # --------- Processing & Full Table View --------- #
-            self.results = process_text(self.text, self.extract_type)
-            df = pd.DataFrame(self.results)
+            text, extract_type, source = self.text, self.extract_type, self.source_label()
+            try:
+                self.results = self.run_task("Extracting", lambda task: process_text(
+                    text, extract_type, task, self.metrics, source))
+            except TaskCancelled:
+                continue
+            df = self.results
             self.show_full_table(df)
 
             # --------- Save Stage --------- #
@@ -129,6 +284,13 @@ class DataExtractorGUI:
                 messagebox.showinfo("Exit", "Exiting program. Goodbye!")
                 return
 
+    def run_task(self, title, func):
+        return BackgroundTask(self.master, title, func).run()
+
+    def source_label(self):
+        # Name of the current source in the metrics records
+        return os.path.basename(self.file_path) if self.source_type == "file" else self.url
+
     # --------------------- File/URL Selection --------------------- #
     def select_file(self):
         while True:
@@ -153,7 +315,10 @@ class DataExtractorGUI:
 
             self.file_path = file_path
             self.source_type = "file"
-            self.load_text()
+            try:
+                self.load_text()
+            except TaskCancelled:
+                continue
             if not self.text.strip():
                 messagebox.showerror("Error", "Failed to load file. Try again.")
                 continue
@@ -165,7 +330,19 @@ class DataExtractorGUI:
             url = simpledialog.askstring("Enter URL", "Enter the URL:")
             if url is None:
                 return False
-            self.text = extract_from_url(url)
+
+            def fetch(task):
+                with self.metrics.stage("fetch", url) as stage:
+                    text = extract_url(url, cache=self.cache)
+                    stage.chars = len(text)
+                return text
+
+            try:
+                self.text = self.run_task("Fetching", fetch)
+            except TaskCancelled:
+                continue
+            except Exception:
+                self.text = ""
             if not self.text.strip():
                 retry = messagebox.askretrycancel("Error", "Failed to fetch data from URL. Retry?")
                 if retry:
@@ -173,17 +350,18 @@ class DataExtractorGUI:
                 else:
                     return False
             self.source_type = "url"
+            self.url = url
             messagebox.showinfo("Loaded", "Text extracted from URL successfully.")
             return True
 
     # --------------------- Extraction Type --------------------- #
     def choose_extract_type(self):
         while True:
-            extract_type = simpledialog.askstring("Extraction Type", "Choose extraction type (word/sentence/paragraph):")
+            extract_type = simpledialog.askstring("Extraction Type", "Choose extraction type (word/sentence/paragraph/wordfreq):")
             if extract_type is None:
                 return False
             extract_type = extract_type.lower()
-            if extract_type in ["word", "sentence", "paragraph"]:
+            if extract_type in ["word", "sentence", "paragraph", "wordfreq"]:
                 self.extract_type = extract_type
                 return True
             else:
@@ -208,63 +386,93 @@ class DataExtractorGUI:
 
     # --------------------- Load Text --------------------- #
     def load_text(self):
-        ext = os.path.splitext(self.file_path)[-1].lower()
-        if ext == ".pdf":
-            self.text = extract_from_pdf(self.file_path)
-        elif ext == ".docx":
-            self.text = extract_from_docx(self.file_path)
-        elif ext == ".csv":
-            self.text = extract_from_csv(self.file_path)
-        elif ext in [".xls", ".xlsx"]:
-            self.text = extract_from_excel(self.file_path)
-        elif ext == ".txt":
-            self.text = extract_from_txt(self.file_path)
-        else:
+        if not is_supported(self.file_path):
             messagebox.showerror("Unsupported File", "Unsupported file type.")
             self.text = ""
+            return
+        file_path = self.file_path
+
+        def load(task):
+            with self.metrics.stage("extract", os.path.basename(file_path), file_size(file_path)) as stage:
+                hits = self.cache.hits
+                text = extract_file(file_path, cache=self.cache, progress=task.progress)
+                stage.chars = len(text)
+                stage.info["cache"] = "hit" if self.cache.hits > hits else "miss"
+            return text
+
+        try:
+            self.text = self.run_task("Loading file", load)
+        except TaskCancelled:
+            self.text = ""
+            raise
+        except Exception:
+            self.text = ""
 
     # --------------------- Full Table View --------------------- #
     def show_full_table(self, df):
         table_window = tk.Toplevel(self.master)
         table_window.title("Full Extracted Data")
-
-        # Create Treeview
-        tree_frame = tk.Frame(table_window)
-        tree_frame.pack(fill=tk.BOTH, expand=True)
-
-        tree_scroll_y = tk.Scrollbar(tree_frame)
-        tree_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
-        tree_scroll_x = tk.Scrollbar(tree_frame, orient=tk.HORIZONTAL)
-        tree_scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
-
-        tree = ttk.Treeview(tree_frame, columns=list(df.columns), show="headings",
-                            yscrollcommand=tree_scroll_y.set, xscrollcommand=tree_scroll_x.set)
-        for col in df.columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=150, anchor=tk.W)
-
-        # Insert data
-        for _, row in df.iterrows():
-            tree.insert("", tk.END, values=list(row))
-
-        tree.pack(fill=tk.BOTH, expand=True)
-        tree_scroll_y.config(command=tree.yview)
-        tree_scroll_x.config(command=tree.xview)
+        table_window.geometry("900x500")
+        with self.metrics.stage("display", self.source_label()) as stage:
+            table = VirtualTable(table_window, df)
+            table.pack(fill=tk.BOTH, expand=True)
+            table.tree.focus_set()
+            stage.items = len(df)
 
     # --------------------- Save --------------------- #
     def save_results(self, df):
+        from extractor_core.writers import RESULT_BATCH_ROWS, format_extension, iter_frame_batches, parse_formats, write_frames
+
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         save_name = simpledialog.askstring("Save File", "Enter filename (without extension):")
         if not save_name:
             save_name = "results"
-        csv_path = os.path.join(self.output_folder, f"{save_name}_{timestamp}.csv")
-        excel_path = os.path.join(self.output_folder, f"{save_name}_{timestamp}.xlsx")
-        df.to_csv(csv_path, index=False)
-        df.to_excel(excel_path, index=False)
-        messagebox.showinfo("Saved", f"Results saved successfully:\nCSV: {csv_path}\nExcel: {excel_path}")
+        while True:
+            spec = simpledialog.askstring("Save Formats", "Formats to save (csv, xlsx, jsonl, parquet, csv.gz):",
+                                          initialvalue="csv, xlsx")
+            if spec is None:
+                return
+            try:
+                formats = parse_formats(spec)
+                break
+            except ValueError as e:
+                messagebox.showerror("Invalid Format", str(e))
+        paths = [os.path.join(self.output_folder, f"{save_name}_{timestamp}{format_extension(fmt)}") for fmt in formats]
+
+        def save(task):
+            # Every format is written in one pass over the table, a batch at a time
+            def batches():
+                for start, batch in zip(range(0, len(df) or 1, RESULT_BATCH_ROWS), iter_frame_batches(df)):
+                    task.progress(start + len(batch), len(df))
+                    yield batch
+            with self.metrics.stage("save", self.source_label()) as stage:
+                stage.items = write_frames(batches(), paths)
+                stage.bytes_out = sum(map(file_size, paths))
+                stage.info["format"] = ",".join(formats)
+
+        try:
+            self.run_task("Saving", save)
+        except Exception as e:
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+            if isinstance(e, TaskCancelled):
+                messagebox.showinfo("Cancelled", "Saving was cancelled.")
+            else:
+                messagebox.showerror("Error", f"Could not save results: {e}")
+            return
+        messagebox.showinfo("Saved", "Results saved successfully:\n" + "\n".join(paths))
 
 # --------------------- Run GUI --------------------- #
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Data Extraction Tool GUI")
+    add_metrics_arguments(parser)
+    metrics = metrics_from_args(parser.parse_args(), "gui")
     root = tk.Tk()
-    app = DataExtractorGUI(root)
-    root.mainloop()
+    app = DataExtractorGUI(root, metrics)
+    try:
+        root.mainloop()
+    finally:
+        profile_path = finish_metrics(metrics)
+        if profile_path:
+            print(f"Profile of the slowest stage saved to {profile_path}", file=sys.stderr)
@@ -0,0 +1,6 @@
+# Shared extraction core used by the terminal (data_extractor.py) and GUI
+# (data_extractor_gui.py) front ends. Only lightweight modules are imported here;
+# parsers, pandas and NumPy load on first use.
+from .cache import ExtractionCache
+from .registry import (EXTRACTORS, extract_file, extract_url, get_extractor, is_supported,
+                       register_extractor, supported_extensions)
@@ -0,0 +1,399 @@
+import os
+import re
+import time
+import hashlib
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from .cache import ExtractionCache
+from .dedup import FingerprintStore, apply_dedup, check_rows, dedup_options, print_dedup_stats, start_shared_store
+from .index import WordIndex, segment_postings
+from .metrics import NO_METRICS, RunMetrics, file_size
+from .paths import timestamped_filename
+from .registry import extract_file, is_supported
+from .results import iter_segment_frames, stream_txt
+from .segment import segment_text
+from .spreadsheet_extractor import SPREADSHEET_EXTENSIONS, iter_spreadsheet_frames
+from .text_extractor import STREAM_BUFFER_CHARS
+from .wordfreq import WORDFREQ_TYPE, TermCounter, print_wordfreq_totals, wordfreq_options, write_wordfreq
+from .writers import format_extension, write_frames
+
+# --- Batch mode (non-interactive) ---
+def batch_output_name(file_path, extension):
+    # Include the source extension so report.pdf and report.docx don't collide
+    stem, ext = os.path.splitext(os.path.basename(file_path))
+    return timestamped_filename(f"{stem}_{ext.lstrip('.').lower()}", extension)
+
+def stable_output_name(file_path, extract_type, extension):
+    # Incremental runs overwrite one output per source instead of adding a timestamped copy
+    stem, ext = os.path.splitext(os.path.basename(file_path))
+    return f"{stem}_{ext.lstrip('.').lower()}_{extract_type}_results{extension}"
+
+def batch_process_file(file_path, extract_type, out_folder, options, metrics=NO_METRICS, postings=None,
+                       counters=None):
+    # options: pdf_pages, pdf_workers, docx_extras, encoding_errors, cache (ExtractionCache kwargs or None), offsets,
+    # stream_chars (stream .txt files through a buffer of this many characters, or None),
+    # provenance (add Sheet / Row / Column for spreadsheets, which are then streamed too),
+    # formats (output format names, see writers.WRITERS), metrics / profile (see batch_worker),
+    # stable_names (use stable_output_name instead of timestamped names), index (build word
+    # index postings, which are appended to `postings` as (postings, word count)), wordfreq
+    # (TermCounter arguments; the wordfreq type appends the file's counts to `counters` and
+    # writes no file of its own, see run_batch), dedup (mode, near, max_bytes and the shared
+    # FingerprintStore: repeated rows are dropped or marked, see dedup.py)
+    started = time.perf_counter()
+    source = os.path.basename(file_path)
+    summary = {
+        "Source": source,
+        "Status": "ok",
+        "Items": 0,
+        "Output": "",
+        "Seconds": 0.0,
+        "Cache": "",
+        "Error": "",
+    }
+    try:
+        if extract_type == WORDFREQ_TYPE:
+            counters.append(count_terms(file_path, options, metrics, summary))
+            summary["Items"] = len(counters[-1].counts)
+            return summary
+        if options["stable_names"]:
+            names = [stable_output_name(file_path, extract_type, format_extension(fmt)) for fmt in options["formats"]]
+        else:
+            names = [batch_output_name(file_path, format_extension(fmt)) for fmt in options["formats"]]
+        out_paths = [os.path.join(out_folder, name) for name in names]
+        ext = os.path.splitext(file_path)[-1].lower()
+        if options["stream_chars"] and ext == ".txt":
+            # Reading, segmenting and writing are interleaved, so they are one stage
+            with metrics.stage("stream", source, file_size(file_path)) as stage:
+                summary["Items"] = stream_txt(file_path, extract_type, out_paths, options["stream_chars"],
+                                              options["offsets"], options["encoding_errors"])
+                stage.items = summary["Items"]
+                stage.bytes_out = sum(map(file_size, out_paths))
+        elif (options["stream_chars"] or options["provenance"]) and ext in SPREADSHEET_EXTENSIONS:
+            with metrics.stage("stream", source, file_size(file_path)) as stage:
+                frames = iter_spreadsheet_frames(file_path, extract_type, options["provenance"], options["offsets"])
+                summary["Items"] = write_frames(frames, out_paths)
+                stage.items = summary["Items"]
+                stage.bytes_out = sum(map(file_size, out_paths))
+        else:
+            cache = ExtractionCache(**options["cache"]) if options["cache"] is not None else None
+            with metrics.stage("extract", source, file_size(file_path)) as stage:
+                text = extract_file(file_path, options["pdf_pages"], options["pdf_workers"], cache,
+                                    options["docx_extras"], encoding_errors=options["encoding_errors"])
+                if cache is not None:
+                    summary["Cache"] = "hit" if cache.hits else "miss"
+                stage.chars = len(text)
+                stage.info["cache"] = summary["Cache"] or None
+            with metrics.stage("segment", source) as stage:
+                segments = segment_text(text)
+                stage.chars = len(text)
+                stage.items = len(segments.spans(extract_type))
+            verdict = None
+            if options["dedup"]:
+                with metrics.stage("dedup", source) as stage:
+                    verdict = check_rows(options["dedup"], source, segments.texts(extract_type))
+                    stage.items = summary["Duplicates"] = len(verdict[0])
+            # Rows are built batch by batch inside the write loop
+            with metrics.stage("save", source) as stage:
+                frames = iter_segment_frames(segments, extract_type, source, options["offsets"])
+                if verdict is not None:
+                    frames = apply_dedup(frames, verdict, options["dedup"]["mode"])
+                summary["Items"] = write_frames(frames, out_paths)
+                stage.items = summary["Items"]
+                stage.bytes_out = sum(map(file_size, out_paths))
+            if options["index"]:
+                with metrics.stage("index", source) as stage:
+                    postings.append((segment_postings(segments), len(segments.words)))
+                    stage.items = len(postings[-1][0])
+        summary["Output"] = "; ".join(out_paths)
+    except Exception as e:
+        summary["Status"] = "error"
+        summary["Error"] = str(e)
+    finally:
+        summary["Seconds"] = round(time.perf_counter() - started, 3)
+    return summary
+
+def count_terms(file_path, options, metrics=NO_METRICS, summary=None):
+    # Word statistics for one file. .txt files are counted chunk by chunk straight from
+    # disk; other files are extracted (through the cache) and their text is counted in chunks.
+    source = os.path.basename(file_path)
+    counter = TermCounter(**options["wordfreq"])
+    chunk_chars = options["stream_chars"] or STREAM_BUFFER_CHARS
+    if os.path.splitext(file_path)[-1].lower() == ".txt":
+        with metrics.stage("count", source, file_size(file_path)) as stage:
+            counter.add_file(file_path, chunk_chars, options["encoding_errors"])
+            stage.items = len(counter.counts)
+        return counter
+    cache = ExtractionCache(**options["cache"]) if options["cache"] is not None else None
+    with metrics.stage("extract", source, file_size(file_path)) as stage:
+        text = extract_file(file_path, options["pdf_pages"], options["pdf_workers"], cache, options["docx_extras"],
+                            encoding_errors=options["encoding_errors"])
+        if cache is not None and summary is not None:
+            summary["Cache"] = "hit" if cache.hits else "miss"
+        stage.chars = len(text)
+    with metrics.stage("count", source) as stage:
+        counter.add_text(text, chunk_chars)
+        stage.chars = len(text)
+        stage.items = len(counter.counts)
+    return counter
+
+def batch_worker(file_path, extract_type, out_folder, options):
+    # Runs in a worker process. Stage records (and the slowest stage's profile), index
+    # postings and word counts are collected here and returned; the parent writes them to
+    # its metrics file and index and merges the counts, so only one process ever writes either.
+    postings, counters = [], []
+    if not options["metrics"]:
+        summary = batch_process_file(file_path, extract_type, out_folder, options, postings=postings,
+                                     counters=counters)
+        return summary, [], None, postings, counters
+    metrics = RunMetrics(profile=options["profile"], front_end="batch")
+    summary = batch_process_file(file_path, extract_type, out_folder, options, metrics, postings, counters)
+    return summary, metrics.records, metrics.slowest, postings, counters
+
+def collect_batch_files(input_folder):
+    files = []
+    for fname in os.listdir(input_folder):
+        path = os.path.join(input_folder, fname)
+        if os.path.isfile(path) and is_supported(fname):
+            files.append(path)
+    # Largest files first so a big PDF doesn't end up as the long tail of the run
+    files.sort(key=lambda p: os.path.getsize(p), reverse=True)
+    return files
+
+def batch_options(args, file_count, metrics=NO_METRICS):
+    # Returns (workers, options) for batch_process_file
+    cpus = os.cpu_count() or 1
+    workers = max(1, min(args.workers or cpus, file_count))
+    # Spare cores go to page-parallel PDF parsing (e.g. a single large PDF gets all of them)
+    pdf_workers = max(1, (args.workers or cpus) // max(1, file_count))
+    cache_options = None
+    if not args.no_cache:
+        cache_options = {"folder": args.cache_dir, "max_bytes": int(args.cache_size * 1024 * 1024)}
+        ExtractionCache(**cache_options)  # create the folders once before workers race for them
+    options = {
+        "pdf_pages": args.pages,
+        "pdf_workers": pdf_workers,
+        "docx_extras": args.docx_extras,
+        "encoding_errors": args.encoding_errors,
+        "cache": cache_options,
+        "offsets": args.offsets,
+        "stream_chars": int(args.buffer_size * 1024 * 1024) if args.stream else None,
+        "provenance": args.provenance,
+        "formats": args.formats,
+        "metrics": metrics.enabled,
+        "profile": metrics.enabled and metrics.profile,
+        "stable_names": False,
+        "index": bool(args.index),
+        "wordfreq": wordfreq_options(args) if args.type == WORDFREQ_TYPE else None,
+        "dedup": dedup_options(args),
+    }
+    return workers, options
+
+def process_batch(files, extract_type, out_folder, options, workers, metrics=NO_METRICS, on_result=None,
+                  index=None, counts=None):
+    # Runs batch_process_file over `files` on a process pool, printing each result (and
+    # calling on_result(path, summary)) as it completes; returns [(path, summary)] in
+    # completion order. Files are added to `index` (a WordIndex) and their word counts
+    # merged into `counts` (a TermCounter) as they complete.
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(batch_worker, path, extract_type, out_folder, options): path for path in files}
+        for done, future in enumerate(as_completed(futures), 1):
+            summary, records, slowest, postings, counters = future.result()
+            results.append((futures[future], summary))
+            if index is not None and postings:
+                index.add(os.path.abspath(futures[future]), *postings[0])
+            if counts is not None and counters:
+                counts.merge(counters[0])
+            if on_result is not None:
+                on_result(futures[future], summary)
+            for record in records:
+                metrics.add(dict(record, run=metrics.run_id))
+            if slowest is not None:
+                metrics.add_profile(*slowest)
+            if summary["Status"] == "ok" and not summary["Output"]:
+                print(f"✅ [{done}/{len(files)}] {summary['Source']}: {summary['Items']} distinct term(s)")
+            elif summary["Status"] == "ok":
+                print(f"✅ [{done}/{len(files)}] {summary['Source']}: {summary['Items']} item(s) → {summary['Output']}")
+            else:
+                print(f"❌ [{done}/{len(files)}] {summary['Source']}: {summary['Error']}")
+    return results
+
+def save_batch_summary(summaries, out_folder, started, cached):
+    # Writes batch_summary_<timestamp>.csv and prints the totals; returns the number of failures
+    summary_df = pd.DataFrame(summaries).sort_values("Source", kind="stable")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    summary_path = os.path.join(out_folder, f"batch_summary_{timestamp}.csv")
+    summary_df.to_csv(summary_path, index=False)
+    failed = int((summary_df["Status"] != "ok").sum())
+    print(f"\n✅ Processed {len(summaries) - failed}/{len(summaries)} file(s) in {time.perf_counter() - started:.1f}s")
+    if cached:
+        hits = int((summary_df["Cache"] == "hit").sum())
+        print(f"✅ Cache: {hits} hit(s), {int((summary_df['Cache'] == 'miss').sum())} miss(es)")
+    print(f"✅ Summary saved to {summary_path}")
+    return failed
+
+def run_batch(args, metrics=NO_METRICS):
+    if not os.path.isdir(args.input):
+        print(f"❌ Input folder not found: {args.input}")
+        return 1
+    os.makedirs(args.out, exist_ok=True)
+    files = collect_batch_files(args.input)
+    if not files:
+        print(f"❌ No supported files found in {args.input}/")
+        return 1
+
+    workers, options = batch_options(args, len(files), metrics)
+    print(f"==== Batch extraction: {len(files)} file(s), type={args.type}, workers={workers} ====")
+    started = time.perf_counter()
+    index = WordIndex(args.index) if args.index else None
+    counts = TermCounter(**options["wordfreq"]) if options["wordfreq"] else None
+    manager = None
+    if options["dedup"]:
+        # One fingerprint store for all workers, in a manager process
+        manager, options["dedup"]["store"] = start_shared_store(options["dedup"]["max_bytes"], options["dedup"]["near"])
+    try:
+        results = process_batch(files, args.type, args.out, options, workers, metrics, index=index, counts=counts)
+        if manager is not None:
+            print_dedup_stats(options["dedup"]["store"].stats())
+    finally:
+        if index is not None:
+            index.close()
+        if manager is not None:
+            manager.shutdown()
+    if index is not None:
+        print(f"✅ Word index updated: {args.index}")
+    if counts is not None:
+        # One table for the whole folder; each file's summary row points at it
+        with metrics.stage("save", args.input) as stage:
+            rows, out_paths = write_wordfreq(counts, args.out, args.formats, args.top)
+            stage.items = rows
+            stage.bytes_out = sum(map(file_size, out_paths))
+        print_wordfreq_totals(counts, rows, out_paths)
+        for _, summary in results:
+            if summary["Status"] == "ok":
+                summary["Output"] = "; ".join(out_paths)
+    failed = save_batch_summary([summary for _, summary in results], args.out, started, options["cache"] is not None)
+    return 1 if failed else 0
+
+# --- URL batch mode ---
+def url_output_name(url, extension):
+    # Readable and unique: host and path, plus a short hash of the full URL
+    readable = re.sub(r"[^A-Za-z0-9]+", "_", url.split("://", 1)[-1]).strip("_")[:60]
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:8]
+    return timestamped_filename(f"{readable}_{digest}_url", extension)
+
+def write_url_result(url, page, extract_type, out_folder, offsets, formats, metrics=NO_METRICS, index=None,
+                     dedup=None, summary=None):
+    out_paths = [os.path.join(out_folder, url_output_name(url, format_extension(fmt))) for fmt in formats]
+    with metrics.stage("segment", url) as stage:
+        segments = segment_text(page["text"])
+        stage.chars = len(page["text"])
+        stage.items = len(segments.spans(extract_type))
+    verdict = None
+    if dedup is not None:
+        with metrics.stage("dedup", url) as stage:
+            verdict = check_rows(dedup, url, segments.texts(extract_type))
+            stage.items = len(verdict[0])
+        if summary is not None:
+            summary["Duplicates"] = len(verdict[0])
+    with metrics.stage("save", url) as stage:
+        frames = iter_segment_frames(segments, extract_type, url, offsets)
+        if verdict is not None:
+            frames = apply_dedup(frames, verdict, dedup["mode"])
+        rows = write_frames(frames, out_paths)
+        stage.items = rows
+        stage.bytes_out = sum(map(file_size, out_paths))
+    if index is not None:
+        with metrics.stage("index", url) as stage:
+            index.add_segments(url, segments)
+    return rows, "; ".join(out_paths)
+
+def run_url_batch(args, metrics=NO_METRICS):
+    from .url_extractor import URL_PER_HOST, URL_TIMEOUT, URL_WORKERS, fetch_pages, read_url_list
+
+    if not os.path.isfile(args.url_file):
+        print(f"❌ URL list not found: {args.url_file}")
+        return 1
+    urls = list(dict.fromkeys(read_url_list(args.url_file)))
+    if not urls:
+        print(f"❌ No URLs found in {args.url_file}")
+        return 1
+    os.makedirs(args.out, exist_ok=True)
+    cache = None
+    if not args.no_cache:
+        cache = ExtractionCache(args.cache_dir, int(args.cache_size * 1024 * 1024))
+    workers = args.workers or URL_WORKERS
+    per_host = args.per_host or URL_PER_HOST
+    timeout = (min(URL_TIMEOUT[0], args.timeout), args.timeout) if args.timeout else URL_TIMEOUT
+
+    print(f"==== URL extraction: {len(urls)} URL(s), type={args.type}, workers={workers}, per host={per_host} ====")
+    started = time.perf_counter()
+    summaries = []
+    index = WordIndex(args.index) if args.index else None
+    wordfreq = wordfreq_options(args) if args.type == WORDFREQ_TYPE else None
+    counts = TermCounter(**wordfreq) if wordfreq else None
+    dedup = dedup_options(args)
+    if dedup is not None:
+        dedup["store"] = FingerprintStore(dedup["max_bytes"], dedup["near"])  # pages are written in this process
+    pages = fetch_pages(urls, cache, workers, per_host, timeout)
+    for done, (url, page, error) in enumerate(pages, 1):
+        summary = {"Source": url, "Status": "ok", "HTTP": "", "Items": 0, "Output": "", "Cache": "", "Error": ""}
+        if page is not None:
+            summary["HTTP"] = page["status"]
+            if cache is not None:
+                summary["Cache"] = page["cache"]
+        try:
+            if error is not None:
+                raise error
+            if page["status"] != 200:
+                raise ValueError(f"HTTP {page['status']}")
+            # Pages are fetched concurrently, so fetching has no per-URL stage record
+            if counts is not None:
+                with metrics.stage("count", url) as stage:
+                    page_counts = TermCounter(**wordfreq)
+                    page_counts.add_text(page["text"])
+                    counts.merge(page_counts)
+                    summary["Items"] = stage.items = len(page_counts.counts)
+                    stage.chars = len(page["text"])
+            else:
+                summary["Items"], summary["Output"] = write_url_result(url, page, args.type, args.out, args.offsets,
+                                                                       args.formats, metrics, index, dedup, summary)
+        except Exception as e:
+            summary["Status"] = "error"
+            summary["Error"] = str(e)
+        summaries.append(summary)
+        if summary["Status"] == "ok" and counts is not None:
+            print(f"✅ [{done}/{len(urls)}] {url}: {summary['Items']} distinct term(s)")
+        elif summary["Status"] == "ok":
+            print(f"✅ [{done}/{len(urls)}] {url}: {summary['Items']} item(s) → {summary['Output']}")
+        else:
+            print(f"❌ [{done}/{len(urls)}] {url}: {summary['Error']}")
+
+    if index is not None:
+        index.close()
+        print(f"✅ Word index updated: {args.index}")
+    if dedup is not None:
+        print_dedup_stats(dedup["store"].stats())
+    if counts is not None:
+        with metrics.stage("save", args.url_file) as stage:
+            rows, out_paths = write_wordfreq(counts, args.out, args.formats, args.top)
+            stage.items = rows
+            stage.bytes_out = sum(map(file_size, out_paths))
+        print_wordfreq_totals(counts, rows, out_paths)
+        for summary in summaries:
+            if summary["Status"] == "ok":
+                summary["Output"] = "; ".join(out_paths)
+    order = {url: i for i, url in enumerate(urls)}
+    summary_df = pd.DataFrame(sorted(summaries, key=lambda row: order[row["Source"]]))
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    summary_path = os.path.join(args.out, f"url_summary_{timestamp}.csv")
+    summary_df.to_csv(summary_path, index=False)
+    failed = int((summary_df["Status"] != "ok").sum())
+    print(f"\n✅ Processed {len(urls) - failed}/{len(urls)} URL(s) in {time.perf_counter() - started:.1f}s")
+    if cache is not None:
+        counts = summary_df["Cache"].value_counts()
+        print(f"✅ Cache: {counts.get('hit', 0)} hit(s), {counts.get('revalidated', 0)} revalidated, "
+              f"{counts.get('miss', 0)} miss(es)")
+    print(f"✅ Summary saved to {summary_path}")
+    return 1 if failed else 0
@@ -0,0 +1,182 @@
+import os
+import hashlib
+import json
+import tempfile
+import zlib
+
+# --- Extraction cache (content-addressed, size-bounded LRU on disk) ---
+EXTRACTOR_VERSION = "7"           # bump when extractor output changes to invalidate old entries
+CACHE_FOLDER = ".extractor_cache"
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+EVICT_TO = 0.9                    # eviction frees space down to this share of max_bytes, so it is rare
+SIZE_FILE = "size"                # running total of the folder's bytes, so writes never walk the folder
+URL_CACHE_TTL = 3600              # seconds a fetched page is reused before it is revalidated
+
+def file_sha256(file_path):
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+class ExtractionCache:
+    # Layout:
+    #   refs/<sha1 of path|size|mtime>  -> sha256 of the file content (fast check, no re-hashing)
+    #   entries/<ab>/<key>.z            -> zlib-compressed extracted text
+    #   size                            -> bytes in the folder, kept up to date by put()
+    # An entry's mtime is its last use; eviction removes the least recently used files
+    # until the folder fits in max_bytes. All writes are atomic renames, so several
+    # batch workers can share one cache folder. Workers updating the size file at the
+    # same time can lose an update; the total is recounted whenever the cache evicts.
+    def __init__(self, folder=CACHE_FOLDER, max_bytes=CACHE_MAX_BYTES, url_ttl=URL_CACHE_TTL):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.url_ttl = url_ttl
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.join(folder, "refs"), exist_ok=True)
+        os.makedirs(os.path.join(folder, "entries"), exist_ok=True)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def content_hash(self, file_path):
+        st = os.stat(file_path)
+        fingerprint = f"{os.path.abspath(file_path)}|{st.st_size}|{st.st_mtime_ns}"
+        ref_path = os.path.join(self.folder, "refs", hashlib.sha1(fingerprint.encode()).hexdigest())
+        try:
+            with open(ref_path, "r", encoding="ascii") as f:
+                digest = f.read().strip()
+            if len(digest) == 64:
+                os.utime(ref_path)
+                return digest
+        except OSError:
+            pass
+        digest = file_sha256(file_path)
+        self._write_atomic(ref_path, digest.encode("ascii"))
+        return digest
+
+    def key_for(self, source, extractor_name, options=None):
+        if os.path.isfile(source):
+            identity = "file:" + self.content_hash(source)
+        else:
+            # URLs have no content to hash before fetching; the stored page carries its
+            # fetch time and validators (see url_extractor.get_page)
+            identity = f"url:{source}"
+        options = json.dumps(options or {}, sort_keys=True, default=str)
+        raw = f"{EXTRACTOR_VERSION}|{extractor_name}|{identity}|{options}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.folder, "entries", key[:2], key + ".z")
+
+    def get(self, key):
+        path = self._entry_path(key)
+        try:
+            with open(path, "rb") as f:
+                text = zlib.decompress(f.read()).decode("utf-8")
+            os.utime(path)
+        except (OSError, zlib.error, UnicodeDecodeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return text
+
+    def put(self, key, text):
+        data = zlib.compress(text.encode("utf-8"), 6)
+        if len(data) > self.max_bytes:
+            return
+        path = self._entry_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._write_atomic(path, data)
+        except OSError:
+            return  # a cache that can't be written must never fail the extraction
+        total = self._read_total()
+        if total is None:
+            total = self._scan()[1]     # no size file yet: count once (includes this entry)
+        else:
+            total += len(data)
+        if total > self.max_bytes:
+            self.evict()
+        else:
+            self._write_total(total)
+
+    def get_or_extract(self, source, extractor_name, extract, options=None):
+        key = self.key_for(source, extractor_name, options)
+        text = self.get(key)
+        if text is None:
+            text = extract()
+            self.put(key, text)
+        return text
+
+    def _size_path(self):
+        return os.path.join(self.folder, SIZE_FILE)
+
+    def _read_total(self):
+        try:
+            with open(self._size_path(), "r", encoding="ascii") as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def _write_total(self, total):
+        try:
+            self._write_atomic(self._size_path(), str(total).encode("ascii"))
+        except OSError:
+            pass
+
+    def _scan(self):
+        files = []
+        total = 0
+        size_path = self._size_path()
+        for root, _, names in os.walk(self.folder):
+            for name in names:
+                path = os.path.join(root, name)
+                if path == size_path:
+                    continue
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        return files, total
+
+    def evict(self):
+        files, total = self._scan()
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_bytes * EVICT_TO:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._write_total(total)
+
+    def clear(self):
+        for _, _, path in self._scan()[0]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._write_total(0)
+
+    def _write_atomic(self, path, data):
+        write_atomic(path, data)
+
+def write_atomic(path, data):
+    # Readers see either the old file or the complete new one, never a partial write
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
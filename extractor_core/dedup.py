@@ -0,0 +1,257 @@
+import re
+import zlib
+import itertools
+import hashlib
+import threading
+from multiprocessing.managers import BaseManager
+import numpy as np
+
+# --- Duplicate rows across a run (batch / urls --dedup) ---
+# Every sentence or paragraph is normalized (case folded, punctuation and spacing
+# dropped) and hashed to a 64-bit fingerprint. A FingerprintStore shared by the whole
+# run remembers the first occurrence of each fingerprint, so a disclaimer repeated in
+# every PDF or a cookie banner on every page is recognized after its first appearance
+# and then dropped or marked with a reference to that first row ("report.pdf#12").
+#
+# Fingerprints are kept in sorted NumPy runs (16 bytes each, merged like an LSM tree),
+# not in a dict. With a near-duplicate threshold, rows also get a MinHash signature of
+# their word 3-shingles; LSH bands find candidates, and a candidate counts when the
+# signatures agree on at least `threshold` of their values (estimated Jaccard
+# similarity). Memory is capped by max_bytes: once it is used up, new rows are still
+# checked against what is stored but no longer added, so rows are never dropped
+# wrongly, only some later repeats are missed.
+DEDUP_MODES = ("drop", "mark")
+DEDUP_MEMORY_MB = 256
+NEAR_THRESHOLD = 0.8
+PERMUTATIONS = 64
+SHINGLE_WORDS = 3
+EXACT_BYTES = 16                        # fingerprint + reference
+NEAR_BYTES = PERMUTATIONS * 4 + 100     # signature + a band table entry per band (estimate)
+SIGNATURE_BLOCK = 50_000                # shingles hashed at a time
+
+_WORD = re.compile(r"\w+")
+_rng = np.random.default_rng(20240607)  # fixed, so every process computes the same signatures
+_A = _rng.integers(1, 2 ** 63, PERMUTATIONS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_B = _rng.integers(0, 2 ** 63, PERMUTATIONS, dtype=np.uint64)
+_SHINGLE_MIX = np.uint64(0x100000001B3)
+_BAND_MIX = _rng.integers(1, 2 ** 63, PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+
+def lsh_bands(threshold):
+    # (bands, rows per band) whose S-curve threshold (1/bands)^(1/rows) is closest
+    options = [(PERMUTATIONS // rows, rows) for rows in range(1, PERMUTATIONS + 1) if PERMUTATIONS % rows == 0]
+    return min(options, key=lambda option: abs((1 / option[0]) ** (1 / option[1]) - threshold))
+
+def normalized_words(text):
+    return _WORD.findall(text.casefold())
+
+def fingerprints(texts):
+    # uint64 fingerprint per text; 0 for texts without a single word (never deduplicated)
+    digests = b"".join(hashlib.blake2b(" ".join(normalized_words(text)).encode("utf-8"), digest_size=8).digest()
+                       if _WORD.search(text) else bytes(8) for text in texts)
+    return np.frombuffer(digests, dtype="<u8").astype(np.uint64)
+
+def signatures(texts):
+    # (len(texts), PERMUTATIONS) MinHash signatures of word 3-shingles (of all the words
+    # if a text has fewer); rows without words are all 0xFFFFFFFF. Each distinct word is
+    # hashed once, shingles are combined from word hashes and hashed with multiply-shift
+    # (odd a, (a * x + b) >> 32 with 64-bit wraparound), all vectorized.
+    rows = [normalized_words(text) for text in texts]
+    lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+    result = np.full((len(texts), PERMUTATIONS), 0xFFFFFFFF, dtype=np.uint64)
+    total = int(lengths.sum())
+    if not total:
+        return result.astype(np.uint32)
+    distinct = {}
+    word_ids = np.fromiter(map(distinct.setdefault, itertools.chain.from_iterable(rows), itertools.count()),
+                           dtype=np.int64, count=total)
+    _, word_ids = np.unique(word_ids, return_inverse=True)
+    word_hashes = np.fromiter((zlib.crc32(word.encode("utf-8")) for word in distinct), dtype=np.uint64,
+                              count=len(distinct))
+    hashes = np.concatenate([word_hashes[word_ids], np.zeros(SHINGLE_WORDS - 1, dtype=np.uint64)])
+    owners = np.repeat(np.arange(len(texts)), lengths)
+    row_ends = np.cumsum(lengths)[owners]
+    positions = np.arange(total)
+    # A shingle starts at every word with SHINGLE_WORDS - 1 more words of its row after
+    # it, and a row shorter than that is one shingle of all its words
+    short = lengths[owners] < SHINGLE_WORDS
+    starts = np.flatnonzero((positions + SHINGLE_WORDS <= row_ends)
+                            | (short & (positions == row_ends - lengths[owners])))
+    shingles = np.zeros(len(starts), dtype=np.uint64)
+    for k in range(SHINGLE_WORDS):
+        inside = starts + k < row_ends[starts]
+        shingles = shingles * _SHINGLE_MIX + np.where(inside, hashes[starts + k], 0)
+    shingle_owners = owners[starts]
+    for first in range(0, len(shingles), SIGNATURE_BLOCK):
+        block = slice(first, first + SIGNATURE_BLOCK)
+        hashed = (_A[:, None] * shingles[None, block] + _B[:, None]) >> np.uint64(32)   # (PERMUTATIONS, block)
+        # A row's shingles are consecutive: take the minimum of each run of them
+        block_owners = shingle_owners[block]
+        run_starts = np.flatnonzero(np.concatenate(([True], block_owners[1:] != block_owners[:-1])))
+        owners_here = block_owners[run_starts]
+        result[owners_here] = np.minimum(result[owners_here], np.minimum.reduceat(hashed, run_starts, axis=1).T)
+    return result.astype(np.uint32)
+
+def band_keys(signature_rows, bands, rows_per_band):
+    # (n, bands) uint64 keys; the band number is mixed in, so all bands share one table
+    mixed = signature_rows.astype(np.uint64) * _BAND_MIX
+    keys = mixed.reshape(len(signature_rows), bands, rows_per_band).sum(axis=2, dtype=np.uint64)
+    return keys ^ np.arange(1, bands + 1, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+
+class FingerprintStore:
+    def __init__(self, max_bytes=DEDUP_MEMORY_MB * 2 ** 20, near=None):
+        self.max_bytes = max_bytes
+        self.near = near
+        self.bands, self.band_rows = lsh_bands(near) if near else (0, 0)
+        self.sources = []           # source number -> name
+        self.runs = []              # sorted (fingerprints, references) pairs, largest first
+        self.band_table = {}        # band key -> row in self.signatures
+        self.signatures = np.empty((0, PERMUTATIONS), dtype=np.uint32)   # grown by doubling
+        self.signature_refs = []    # row in self.signatures -> reference
+        self.near_count = 0         # rows of self.signatures in use
+        self.bytes = 0
+        self.full = False
+        self.rows = self.exact = self.similar = 0
+        self.lock = threading.Lock()  # the manager serves every worker on its own thread
+
+    # A reference packs (source number, 0-based row) into one int64
+    def label(self, ref):
+        return f"{self.sources[ref >> 32]}#{(ref & 0xFFFFFFFF) + 1}"
+
+    def check(self, source, values, signature_rows=None):
+        # Returns (duplicate rows, labels of their first occurrences, similarity) for one
+        # source's fingerprints (and signatures) and remembers its new rows
+        with self.lock:
+            return self._check(source, values, signature_rows)
+
+    def _check(self, source, values, signature_rows):
+        number = len(self.sources)
+        self.sources.append(source)
+        n = len(values)
+        rows = np.arange(n, dtype=np.int64)
+        valid = values != 0
+        first = np.full(n, -1, dtype=np.int64)
+        similarity = np.zeros(n)
+        for keys, refs in self.runs:
+            pos = np.minimum(np.searchsorted(keys, values), len(keys) - 1)
+            hit = valid & (first < 0) & (keys[pos] == values)
+            first[hit] = refs[pos[hit]]
+        # Repeats within this source point at its own first copy
+        _, first_index, inverse = np.unique(values, return_index=True, return_inverse=True)
+        own_first = first_index[inverse]
+        within = valid & (first < 0) & (own_first != rows)
+        first[within] = (number << 32) | own_first[within]
+        similarity[first >= 0] = 1.0
+        self.exact += int((first >= 0).sum())
+
+        new = valid & (first < 0)
+        if self.near and signature_rows is not None:
+            self._near(number, signature_rows, new, first, similarity)
+            new &= first < 0
+        self._add(values[new], (number << 32) | rows[new])
+        self.rows += n
+        dup_rows = np.flatnonzero(first >= 0)
+        return dup_rows, [self.label(int(ref)) for ref in first[dup_rows]], similarity[dup_rows]
+
+    def _near(self, number, signature_rows, candidates, first, similarity):
+        keys = band_keys(signature_rows, self.bands, self.band_rows)
+        for row in np.flatnonzero(candidates).tolist():
+            signature = signature_rows[row]
+            seen = {self.band_table[key] for key in keys[row].tolist() if key in self.band_table}
+            best, best_similarity = None, 0.0
+            for other in seen:
+                estimate = np.count_nonzero(self.signatures[other] == signature) / PERMUTATIONS
+                if estimate > best_similarity:
+                    best, best_similarity = other, estimate
+            if best is not None and best_similarity >= self.near:
+                first[row] = self.signature_refs[best]
+                similarity[row] = best_similarity
+                self.similar += 1
+                continue
+            if self.bytes + NEAR_BYTES > self.max_bytes:
+                self.full = True
+                continue
+            # Remember it (rows later in this source are compared with it too)
+            if self.near_count == len(self.signatures):
+                grown = np.empty((max(1024, 2 * len(self.signatures)), PERMUTATIONS), dtype=np.uint32)
+                grown[:self.near_count] = self.signatures
+                self.signatures = grown
+            self.signatures[self.near_count] = signature
+            self.signature_refs.append((number << 32) | row)
+            for key in keys[row].tolist():
+                self.band_table.setdefault(key, self.near_count)
+            self.near_count += 1
+            self.bytes += NEAR_BYTES
+
+    def _add(self, values, refs):
+        room = max(0, (self.max_bytes - self.bytes) // EXACT_BYTES)
+        if len(values) > room:
+            values, refs = values[:room], refs[:room]
+            self.full = True
+        if not len(values):
+            return
+        order = np.argsort(values, kind="stable")
+        self.runs.append((values[order], refs[order]))
+        self.bytes += len(values) * EXACT_BYTES
+        # Merge runs of similar size, so lookups search a handful of arrays
+        while len(self.runs) > 1 and len(self.runs[-2][0]) <= 2 * len(self.runs[-1][0]):
+            (keys_a, refs_a), (keys_b, refs_b) = self.runs.pop(), self.runs.pop()
+            keys, refs = np.concatenate([keys_b, keys_a]), np.concatenate([refs_b, refs_a])
+            order = np.argsort(keys, kind="stable")
+            self.runs.append((keys[order], refs[order]))
+
+    def stats(self):
+        return {"rows": self.rows, "exact": self.exact, "near": self.similar, "bytes": self.bytes,
+                "max_bytes": self.max_bytes, "full": self.full, "sources": len(self.sources)}
+
+class DedupManager(BaseManager):
+    pass
+
+DedupManager.register("FingerprintStore", FingerprintStore)
+
+def start_shared_store(max_bytes, near=None):
+    # A store in a manager process, for worker processes to share; returns (manager, proxy)
+    manager = DedupManager()
+    manager.start()
+    return manager, manager.FingerprintStore(max_bytes, near)
+
+def dedup_options(args):
+    # The `dedup` entry of batch_process_file options, without the store
+    if not getattr(args, "dedup", None):
+        return None
+    return {"mode": args.dedup, "near": args.near_dup, "max_bytes": int(args.dedup_memory * 2 ** 20)}
+
+def check_rows(dedup, source, texts):
+    # Fingerprints the rows here (in the worker) and asks the shared store about them
+    values = fingerprints(texts)
+    signature_rows = signatures(texts) if dedup["near"] else None
+    return dedup["store"].check(source, values, signature_rows)
+
+def apply_dedup(frames, verdict, mode):
+    # Drops the duplicate rows from result frames (in row order), or adds
+    # "Duplicate Of" / "Similarity" columns to them
+    dup_rows, labels, similarity = verdict
+    offset = 0
+    for df in frames:
+        start, stop = np.searchsorted(dup_rows, [offset, offset + len(df)])
+        local = dup_rows[start:stop] - offset
+        offset += len(df)
+        if mode == "drop":
+            keep = np.ones(len(df), dtype=bool)
+            keep[local] = False
+            yield df[keep]
+            continue
+        duplicate_of = np.full(len(df), "", dtype=object)
+        duplicate_of[local] = labels[start:stop]
+        scores = np.full(len(df), np.nan)
+        scores[local] = similarity[start:stop]
+        yield df.assign(**{"Duplicate Of": duplicate_of, "Similarity": scores.round(3)})
+
+def print_dedup_stats(stats):
+    duplicates = stats["exact"] + stats["near"]
+    share = duplicates / stats["rows"] if stats["rows"] else 0
+    near = f" ({stats['exact']} exact, {stats['near']} near)" if stats["near"] else ""
+    print(f"✅ Dedup: {duplicates} of {stats['rows']} row(s) were repeats{near}, {share:.0%}; "
+          f"fingerprints use {stats['bytes'] / 2 ** 20:.1f} of {stats['max_bytes'] / 2 ** 20:.0f} MB")
+    if stats["full"]:
+        print("⚠️ The fingerprint budget filled up: later rows were checked but not remembered, so some repeats "
+              "were kept (raise --dedup-memory)")
@@ -0,0 +1,357 @@
+import os
+import re
+import json
+import time
+import uuid
+import socket
+import hashlib
+import threading
+from datetime import datetime
+import pandas as pd
+from .batch import batch_options, collect_batch_files
+from .incremental import manifest_settings
+from .jobs import MEMORY_CAP_SUPPORTED, run_isolated, safe_name
+from .metrics import NO_METRICS
+from .paths import timestamped_filename
+from .writers import concat_results, format_extension
+
+# --- Distributed batch mode ---
+# Any number of `worker` processes, on one machine or on several that mount the same
+# input and output folders, share the files of one input folder through a queue folder
+# in the output folder, .extractor_queue_<name>/:
+#   queue.json          the extraction settings; every worker must use the same ones
+#   leases/<key>.json   a file being extracted: written once, atomically (link), by the
+#                       worker that claims it, and touched by that worker's heartbeat
+#   done/<key>.json     a finished file: status, items, worker and its result files
+#   workers/<id>.json   one per worker; touched on every heartbeat (and read back as the
+#                       file server's clock, so hosts with skewed clocks agree on lease age)
+#   shards/<id>/        the result files each worker wrote
+# A lease that hasn't been touched for lease_seconds belongs to a dead worker and is
+# taken over by the next worker that finds it. A file whose lease was taken over
+# MAX_ATTEMPTS times is given up on: it is marked failed rather than crashing workers
+# forever. `merge` then joins every finished file's results into one result per format.
+QUEUE_VERSION = 1
+LEASE_SECONDS = 60
+MAX_ATTEMPTS = 3
+IDLE_SECONDS = 2          # wait between passes while other workers hold the remaining files
+
+def queue_folder(out_folder, name):
+    return os.path.join(out_folder, f".extractor_queue_{safe_name(name)}")
+
+def file_key(name):
+    # One key per source file name: readable, and unique even after shortening
+    readable = re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_")[:60]
+    return f"{readable}_{hashlib.sha1(name.encode('utf-8')).hexdigest()[:10]}"
+
+def write_exclusive(path, data):
+    # Creates `path` with the JSON `data` unless it exists; returns whether it did. The
+    # content is written to a temporary file first and hard-linked into place, which is
+    # atomic on local and network file systems alike, so nobody ever reads half a file.
+    temp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    try:
+        os.link(temp, path)
+        return True
+    except FileExistsError:
+        return False
+    finally:
+        os.remove(temp)
+
+def read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+class SharedQueue:
+    def __init__(self, folder, worker_id=None, lease_seconds=LEASE_SECONDS):
+        self.folder = folder
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.leases = os.path.join(folder, "leases")
+        self.done = os.path.join(folder, "done")
+        self.workers = os.path.join(folder, "workers")
+        self.shards = os.path.join(folder, "shards")
+        self.held = {}      # key -> lease path of the files this worker is extracting
+        self.lock = threading.Lock()
+
+    @property
+    def shard_folder(self):
+        return os.path.join(self.shards, self.worker_id)
+
+    @property
+    def beat_path(self):
+        return os.path.join(self.workers, f"{self.worker_id}.json")
+
+    def open(self, settings):
+        # Joins the queue (creating it if needed); returns an error message, or None
+        for folder in (self.leases, self.done, self.workers, self.shard_folder):
+            os.makedirs(folder, exist_ok=True)
+        path = os.path.join(self.folder, "queue.json")
+        if not write_exclusive(path, {"version": QUEUE_VERSION, "settings": settings, "created": time.time()}):
+            existing = read_json(path) or {}
+            if existing.get("settings") != settings:
+                changed = sorted(key for key in settings if (existing.get("settings") or {}).get(key) != settings[key])
+                return (f"The queue in {self.folder} was started with different options ({', '.join(changed)}); "
+                        f"use the same options or another --queue name")
+        self.beat({"host": socket.gethostname(), "pid": os.getpid(), "started": time.time(), "status": "running"})
+        return None
+
+    def settings(self):
+        return (read_json(os.path.join(self.folder, "queue.json")) or {}).get("settings")
+
+    # --- Heartbeat ---
+    def beat(self, status=None):
+        if status is not None:
+            temp = f"{self.beat_path}.tmp"
+            with open(temp, "w", encoding="utf-8") as f:
+                json.dump(status, f)
+            os.replace(temp, self.beat_path)
+        else:
+            os.utime(self.beat_path)
+
+    def clock(self):
+        # "Now" according to the file system that holds the leases
+        self.beat()
+        return os.stat(self.beat_path).st_mtime
+
+    def renew(self):
+        self.beat()
+        with self.lock:
+            paths = list(self.held.values())
+        for path in paths:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass  # taken over after a stall; whoever finishes first records the file
+
+    # --- Leases ---
+    def claim(self, name, now):
+        # Returns the new lease, or None if the file is finished or someone else's
+        key = file_key(name)
+        path = os.path.join(self.leases, f"{key}.json")
+        lease = {"file": name, "worker": self.worker_id, "host": socket.gethostname(), "pid": os.getpid(),
+                 "attempts": 1, "claimed": time.time()}
+        if not write_exclusive(path, lease):
+            try:
+                if now - os.stat(path).st_mtime < self.lease_seconds:
+                    return None
+                # Expired: move it out of the way. Of several workers doing this at once
+                # only one rename succeeds.
+                stale = f"{path}.{self.worker_id}.stale"
+                os.rename(path, stale)
+            except FileNotFoundError:
+                return None
+            old = read_json(stale) or {}
+            if now - os.stat(stale).st_mtime < self.lease_seconds:
+                # Renewed between the check and the rename: give it back
+                try:
+                    os.link(stale, path)
+                except FileExistsError:
+                    pass
+                os.remove(stale)
+                return None
+            os.remove(stale)
+            lease.update(attempts=old.get("attempts", 1) + 1, taken_over_from=old.get("worker"))
+            if not write_exclusive(path, lease):
+                return None
+        if os.path.exists(os.path.join(self.done, f"{key}.json")):
+            os.remove(path)  # finished while we were looking
+            return None
+        with self.lock:
+            self.held[key] = path
+        if lease["attempts"] > MAX_ATTEMPTS:
+            self.finish(name, {"status": "error", "items": 0, "seconds": 0, "outputs": [],
+                               "attempts": lease["attempts"],
+                               "error": f"given up after {MAX_ATTEMPTS} workers died extracting it"})
+            return None
+        return lease
+
+    def finish(self, name, record):
+        # Records a file as finished (the first record wins) and drops its lease
+        key = file_key(name)
+        record = dict(record, file=name, worker=self.worker_id, host=socket.gethostname(), finished=time.time())
+        first = write_exclusive(os.path.join(self.done, f"{key}.json"), record)
+        with self.lock:
+            path = self.held.pop(key, None)
+        if path is not None:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        return first
+
+    # --- Progress ---
+    def finished(self):
+        # key -> done record
+        records = {}
+        for entry in os.listdir(self.done):
+            if entry.endswith(".json"):
+                record = read_json(os.path.join(self.done, entry))
+                if record is not None:
+                    records[entry[:-len(".json")]] = record
+        return records
+
+    def leased(self):
+        return sum(entry.endswith(".json") for entry in os.listdir(self.leases))
+
+def _heartbeat(queue, stop):
+    interval = max(0.5, queue.lease_seconds / 4)
+    while not stop.wait(interval):
+        try:
+            queue.renew()
+        except OSError as e:
+            print(f"⚠️ Heartbeat failed: {e}")
+
+def worker_settings(args):
+    # What every worker of a queue must agree on. The input folder is compared by its
+    # file names only, since each machine may mount it somewhere else.
+    return dict(manifest_settings(args), version=QUEUE_VERSION)
+
+def run_worker(args, metrics=NO_METRICS):
+    if not os.path.isdir(args.input):
+        print(f"❌ Input folder not found: {args.input}")
+        return 1
+    if args.max_memory and not MEMORY_CAP_SUPPORTED:
+        print("⚠️ --max-memory needs /proc (Linux); files will run without a memory cap")
+    worker_id = safe_name(args.worker_id or f"{socket.gethostname()}-{os.getpid()}")
+    queue = SharedQueue(queue_folder(args.out, args.queue), worker_id, args.lease_seconds)
+    error = queue.open(worker_settings(args))
+    if error:
+        print(f"❌ {error}")
+        return 1
+    files = collect_batch_files(args.input)
+    workers, options = batch_options(args, max(1, len(files)), metrics)
+    options["stable_names"] = True
+    print(f"==== Worker {worker_id}: queue '{args.queue}', {len(files)} file(s) in {args.input}, type={args.type}, "
+          f"processes={workers} ====")
+
+    started = time.perf_counter()
+    counts = {"ok": 0, "error": 0}
+    leases = {}     # file name -> attempt number of this worker's lease
+
+    def on_result(path, summary, records, slowest, postings):
+        name = os.path.basename(path)
+        outputs = [os.path.relpath(out, args.out) for out in summary["Output"].split("; ") if out]
+        recorded = queue.finish(name, {"status": summary["Status"], "items": summary["Items"],
+                                       "seconds": summary["Seconds"], "cache": summary["Cache"],
+                                       "error": summary["Error"], "outputs": outputs, "attempts": leases[name]})
+        if not recorded:
+            print(f"⚠️ {name}: already finished by another worker")
+        elif summary["Status"] == "ok":
+            counts["ok"] += 1
+            print(f"✅ [{worker_id}] {name}: {summary['Items']} item(s) in {summary['Seconds']:.2f}s")
+        else:
+            counts["error"] += 1
+            print(f"❌ [{worker_id}] {name}: {summary['Error']}")
+        for record in records:
+            metrics.add(dict(record, run=metrics.run_id, worker=worker_id))
+        if slowest is not None:
+            metrics.add_profile(*slowest)
+
+    def claims(todo, now):
+        for path in todo:
+            lease = queue.claim(os.path.basename(path), now)
+            if lease is not None:
+                leases[lease["file"]] = lease["attempts"]
+                if lease["attempts"] > 1:
+                    print(f"⚠️ [{worker_id}] {lease['file']}: taken over from {lease['taken_over_from']} "
+                          f"(attempt {lease['attempts']})")
+                yield path
+
+    stop = threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(queue, stop), daemon=True)
+    beat.start()
+    try:
+        while True:
+            # Rescanned on every pass, so files added meanwhile are picked up too
+            finished = queue.finished()
+            todo = [path for path in collect_batch_files(args.input)
+                    if file_key(os.path.basename(path)) not in finished]
+            if not todo:
+                break
+            before = len(leases)
+            run_isolated(claims(todo, queue.clock()), args.type, queue.shard_folder, options, workers,
+                         args.file_timeout, int(args.max_memory * 2 ** 20) if args.max_memory else None, on_result)
+            if len(leases) == before:
+                time.sleep(IDLE_SECONDS)  # the rest is leased by others: wait in case they die
+    except KeyboardInterrupt:
+        print(f"\n👋 Worker {worker_id} stopped; its files will be taken over once their leases expire.")
+        return 130
+    finally:
+        stop.set()
+        beat.join()
+    queue.beat({"host": socket.gethostname(), "pid": os.getpid(), "status": "finished",
+                "ok": counts["ok"], "errors": counts["error"], "finished": time.time()})
+    print(f"\n✅ Worker {worker_id}: {counts['ok']} file(s) extracted, {counts['error']} failed, "
+          f"in {time.perf_counter() - started:.1f}s; the queue is empty. Run `merge` to combine the results.")
+    return 0
+
+# --- Merging ---
+def run_merge(args, metrics=NO_METRICS):
+    folder = queue_folder(args.out, args.queue)
+    queue = SharedQueue(folder)
+    settings = queue.settings() if os.path.isdir(folder) else None
+    if settings is None:
+        print(f"❌ No queue '{args.queue}' in {args.out}/")
+        return 1
+    if not os.path.isdir(args.input):
+        print(f"❌ Input folder not found: {args.input}")
+        return 1
+    names = sorted(os.path.basename(path) for path in collect_batch_files(args.input))
+    finished = queue.finished()
+    records = [finished.get(file_key(name)) for name in names]
+    missing = [name for name, record in zip(names, records) if record is None]
+    if missing and not args.partial:
+        print(f"❌ {len(missing)} of {len(names)} file(s) are not finished yet ({queue.leased()} being extracted), "
+              f"e.g. {', '.join(missing[:3])}. Start more workers, or merge what is there with --partial.")
+        return 1
+    ok = [record for record in records if record is not None and record["status"] == "ok"]
+
+    started = time.perf_counter()
+    out_paths = []
+    if ok:
+        # One result per format, sources in file name order whichever worker did them
+        for number, fmt in enumerate(settings["formats"]):
+            out_path = os.path.join(args.out, timestamped_filename(settings["type"], format_extension(fmt)))
+            with metrics.stage("merge", out_path) as stage:
+                concat_results([os.path.join(args.out, record["outputs"][number]) for record in ok], out_path, fmt)
+                stage.items = sum(record["items"] for record in ok)
+                stage.bytes_out = os.path.getsize(out_path)
+            out_paths.append(out_path)
+
+    summary = pd.DataFrame([{
+        "Source": name,
+        "Status": record["status"] if record else "missing",
+        "Items": record["items"] if record else 0,
+        "Seconds": record["seconds"] if record else 0.0,
+        "Worker": record["worker"] if record else "",
+        "Host": record["host"] if record else "",
+        "Attempts": record["attempts"] if record else 0,
+        "Cache": record.get("cache", "") if record else "",
+        "Error": record["error"] if record else "",
+    } for name, record in zip(names, records)])
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    summary_path = os.path.join(args.out, f"distributed_summary_{timestamp}.csv")
+    summary.to_csv(summary_path, index=False)
+
+    if len(summary):
+        per_worker = summary[summary["Worker"] != ""].groupby("Worker").agg(
+            Files=("Source", "size"), Items=("Items", "sum"), Seconds=("Seconds", "sum"))
+        for worker, files, items, seconds in per_worker.itertuples(name=None):
+            print(f"  {worker}: {files} file(s), {items} item(s), {seconds:.1f}s extracting")
+    failed = int((summary["Status"] != "ok").sum()) if len(summary) else 0
+    print(f"✅ Merged {len(ok)}/{len(names)} file(s), {sum(record['items'] for record in ok)} item(s), "
+          f"in {time.perf_counter() - started:.1f}s")
+    for out_path in out_paths:
+        print(f"✅ Results saved to {out_path}")
+    print(f"✅ Summary saved to {summary_path}")
+    if args.clean and not missing:
+        import shutil
+        shutil.rmtree(folder)
+        print(f"✅ Removed the queue folder {folder}")
+    return 1 if failed else 0
@@ -0,0 +1,93 @@
+import re
+import zipfile
+from lxml import etree
+from .segment import CELL_SEPARATOR, ROW_SEPARATOR
+
+# --- DOCX extraction ---
+# word/document.xml is streamed straight out of the zip with an incremental parser;
+# python-docx's object model is never built. Paragraph text follows python-docx's
+# Paragraph.text (runs and hyperlink runs; w:tab/w:ptab -> tab, w:br/w:cr -> newline,
+# w:noBreakHyphen -> "-"), so body paragraphs come out exactly as before. Tables are
+# written like spreadsheet rows: cells joined by CELL_SEPARATOR, each row ended by
+# ROW_SEPARATOR, and one ROW_SEPARATOR in front so the table never merges with the
+# paragraph before it.
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_BODY, W_P, W_TBL, W_TR, W_TC = _W + "body", _W + "p", _W + "tbl", _W + "tr", _W + "tc"
+W_R, W_HYPERLINK, W_T, W_TYPE = _W + "r", _W + "hyperlink", _W + "t", _W + "type"
+_RUN_CHARS = {_W + "tab": "\t", _W + "ptab": "\t", _W + "cr": "\n", _W + "noBreakHyphen": "-"}
+_W_BR = _W + "br"
+# Elements whose direct w:p / w:tbl children are top-level blocks of a part
+_BLOCK_PARENTS = {W_BODY, _W + "hdr", _W + "ftr", _W + "footnote", _W + "endnote"}
+_EXTRA_PARTS = re.compile(r"word/(header\d*|footer\d*|footnotes|endnotes)\.xml$")
+
+def _run_text(run):
+    parts = []
+    for child in run:
+        tag = child.tag
+        if tag == W_T:
+            parts.append(child.text or "")
+        elif tag == _W_BR:
+            if child.get(W_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif tag in _RUN_CHARS:
+            parts.append(_RUN_CHARS[tag])
+    return "".join(parts)
+
+def paragraph_text(p):
+    parts = []
+    for child in p:
+        if child.tag == W_R:
+            parts.append(_run_text(child))
+        elif child.tag == W_HYPERLINK:
+            parts.extend(_run_text(run) for run in child.iterchildren(W_R))
+    return "".join(parts)
+
+def _cell_text(tc):
+    # Paragraphs of the cell, including those of nested tables
+    return "\n".join(text for text in map(paragraph_text, tc.iter(W_P)) if text.strip())
+
+def table_text(tbl):
+    rows = []
+    for tr in tbl.iterchildren(W_TR):
+        rows.append(CELL_SEPARATOR.join(map(_cell_text, tr.iterchildren(W_TC))) + ROW_SEPARATOR)
+    return ROW_SEPARATOR + "".join(rows)
+
+def _iter_part_blocks(stream, tables=True):
+    for _, elem in etree.iterparse(stream, events=("end",), tag=(W_P, W_TBL)):
+        parent = elem.getparent()
+        if parent is None or parent.tag not in _BLOCK_PARENTS:
+            continue  # part of an enclosing table, handled when the table ends
+        if elem.tag == W_P:
+            text = paragraph_text(elem)
+            if text.strip():
+                yield text
+        elif tables:
+            text = table_text(elem)
+            if text.strip(CELL_SEPARATOR + ROW_SEPARATOR).strip():
+                yield text
+        # Drop what has been handled so memory stays flat on long documents
+        elem.clear()
+        while elem.getprevious() is not None:
+            del parent[0]
+
+def iter_docx_blocks(file_path, tables=True, extras=False):
+    # Yields the text of each non-empty paragraph, and of each table, in document
+    # order. With extras, headers, footers, footnotes and endnotes follow the body.
+    with zipfile.ZipFile(file_path) as archive:
+        names = ["word/document.xml"]
+        if extras:
+            names += sorted(name for name in archive.namelist() if _EXTRA_PARTS.match(name))
+        for name in names:
+            with archive.open(name) as stream:
+                yield from _iter_part_blocks(stream, tables)
+
+def extract_from_docx(file_path, tables=True, extras=False):
+    parts = []
+    after_paragraph = False
+    for block in iter_docx_blocks(file_path, tables, extras):
+        is_table = block.startswith(ROW_SEPARATOR)
+        if after_paragraph and not is_table:
+            parts.append("\n")
+        parts.append(block)
+        after_paragraph = not is_table
+    return "".join(parts)
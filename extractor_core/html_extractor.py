@@ -0,0 +1,218 @@
+import re
+import codecs
+from lxml import etree
+from .segment import CELL_SEPARATOR, ROW_SEPARATOR
+
+# --- HTML extraction ---
+# Pages are parsed with a tree-less lxml parser target: bytes are fed in chunks and the
+# parser calls start / end / data as it goes, so no document tree is built and memory
+# stays close to the size of the extracted text however large the page is.
+# Subtrees that are not content (scripts, styles, navigation, footers, cookie banners,
+# hidden elements, ...) are skipped as soon as they open. Block-level elements end a
+# paragraph ("\n\n") and <br> ends a line, so paragraph mode works on web pages.
+# Tables are written like spreadsheet rows: cells joined by CELL_SEPARATOR, rows ended
+# by ROW_SEPARATOR, and one ROW_SEPARATOR in front.
+HTML_CHUNK_BYTES = 256 * 1024
+SNIFF_BYTES = 4096      # the start of the page searched for a <meta charset>
+SKIPPED_TAGS = frozenset({
+    "script", "style", "noscript", "template", "svg", "math", "canvas", "iframe", "object",
+    "video", "audio", "map", "nav", "aside", "footer", "button", "select", "textarea", "dialog",
+})
+# Elements without an end tag never start a skipped subtree: libxml2 leaves some of them
+# (embed, wbr, source, track) open until their parent closes, so the text after them
+# would be skipped too. They hold no text of their own.
+VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "meta", "param",
+    "source", "track", "wbr",
+})
+# Page headers are skipped, but not the header of an article or of the main content
+CONTENT_TAGS = frozenset({"main", "article"})
+BLOCK_TAGS = frozenset({
+    "address", "article", "blockquote", "body", "caption", "center", "dd", "details", "div", "dl",
+    "dt", "fieldset", "figcaption", "figure", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header",
+    "hgroup", "hr", "html", "legend", "li", "main", "ol", "p", "pre", "section", "summary", "title",
+    "ul",
+})
+BOILERPLATE_ROLES = frozenset({
+    "navigation", "banner", "contentinfo", "complementary", "search", "menu", "menubar", "toolbar",
+    "dialog", "alertdialog",
+})
+# class / id words that mark an element as page furniture rather than content
+BOILERPLATE_NAMES = re.compile(
+    r"(?:^|[\s_-])(?:nav|navbar|navigation|menu|footer|sidebar|breadcrumbs?|cookies?|consent|gdpr|"
+    r"banner|advert|advertisement|ads?|sponsored|promo|newsletter|subscribe|share|sharing|social|"
+    r"popup|modal|related)(?:$|[\s_-])", re.IGNORECASE)
+_HIDDEN_STYLE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden", re.IGNORECASE)
+_META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.IGNORECASE)
+_BOMS = ((codecs.BOM_UTF8, "utf-8"), (codecs.BOM_UTF16_LE, "utf-16-le"), (codecs.BOM_UTF16_BE, "utf-16-be"))
+# Breaks between pieces of text, weakest first; the strongest one seen between two
+# pieces is written
+_BREAK_RANK = {"": 0, " ": 1, "\n": 2, "\n\n": 3, CELL_SEPARATOR: 4, ROW_SEPARATOR: 5}
+
+class _TextTarget:
+    def __init__(self):
+        self.parts = []         # finished text
+        self.line = []          # text since the last break, whitespace not yet collapsed
+        self.pending = ""       # break to write before the next text
+        self.skip = 0           # depth inside a skipped subtree
+        self.stack = []         # is_content of each open element outside skipped subtrees
+        self.content = 0        # open <main> / <article> elements
+        self.tables = 0
+        self.pre = 0
+
+    def _is_boilerplate(self, tag, attrib):
+        if tag in SKIPPED_TAGS:
+            return True
+        if tag == "header" and not self.content:
+            return True
+        if "hidden" in attrib or attrib.get("aria-hidden", "").lower() == "true":
+            return True
+        if _HIDDEN_STYLE.search(attrib.get("style", "")):
+            return True
+        role = attrib.get("role", "").lower()
+        if role in BOILERPLATE_ROLES:
+            return True
+        if tag in CONTENT_TAGS or tag in ("html", "body") or role == "main":
+            return False
+        return bool(BOILERPLATE_NAMES.search(attrib.get("class", "")) or BOILERPLATE_NAMES.search(attrib.get("id", "")))
+
+    def _flush(self):
+        if not self.line:
+            return
+        text = "".join(self.line)
+        self.line = []
+        if self.pre:
+            text = text.strip("\r\n")
+            if not text.strip():
+                return
+        else:
+            text = " ".join(text.split())
+            if not text:
+                return
+        if self.parts:
+            self.parts.append(self.pending)
+        self.parts.append(text)
+        self.pending = ""
+
+    def _break(self, kind):
+        self._flush()
+        if _BREAK_RANK[kind] > _BREAK_RANK[self.pending]:
+            self.pending = kind
+
+    def _block(self):
+        # Inside a table a block only starts a new line of the cell
+        self._break("\n" if self.tables else "\n\n")
+
+    def start(self, tag, attrib):
+        if self.skip:
+            self.skip += 1
+            return
+        if tag not in VOID_TAGS and self._is_boilerplate(tag, attrib):
+            self.skip = 1
+            return
+        is_content = tag in CONTENT_TAGS or attrib.get("role", "").lower() == "main"
+        self.stack.append(is_content)
+        self.content += is_content
+        if tag == "table":
+            self.tables += 1
+            self._break(ROW_SEPARATOR)
+        elif tag == "br":
+            self._break("\n")
+        elif tag in BLOCK_TAGS:
+            self._block()
+            if tag == "pre":
+                self.pre += 1
+
+    def end(self, tag):
+        if self.skip:
+            self.skip -= 1
+            return
+        if self.stack:
+            self.content -= self.stack.pop()
+        if tag == "table":
+            self.tables = max(0, self.tables - 1)
+            self._break(ROW_SEPARATOR)
+        elif tag in ("td", "th"):
+            self._break(CELL_SEPARATOR)
+        elif tag == "tr":
+            self._break(ROW_SEPARATOR)
+        elif tag in BLOCK_TAGS:
+            self._block()
+            if tag == "pre":
+                self.pre = max(0, self.pre - 1)
+        elif tag in ("img", "input"):
+            # Inline elements that stand between words ("a<img>b" is two words)
+            self._break(" ")
+
+    def data(self, text):
+        if not self.skip:
+            self.line.append(text)
+
+    def close(self):
+        self._flush()
+        return "".join(self.parts)
+
+def sniff_encoding(head):
+    # Encoding of a page from its first bytes: a byte order mark, else a <meta charset>,
+    # else UTF-8 unless those bytes are not valid UTF-8, in which case windows-1252 (as
+    # browsers do). Returns (encoding, bom_length).
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding, len(bom)
+    match = _META_CHARSET.search(head[:SNIFF_BYTES])
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode("ascii")).name, 0
+        except (LookupError, UnicodeDecodeError):
+            pass
+    try:
+        # final=False: a character cut off at the end of the chunk is not an error
+        codecs.getincrementaldecoder("utf-8")().decode(head)
+    except UnicodeDecodeError:
+        return "cp1252", 0
+    return "utf-8", 0
+
+def _make_parser(target, encoding):
+    # Returns (parser, decoder). Encodings libxml2 does not know by their Python name
+    # are decoded here, incrementally, and the parser is fed text.
+    options = dict(target=target, remove_comments=True, no_network=True, huge_tree=True)
+    try:
+        return etree.HTMLParser(encoding=encoding, **options), None
+    except LookupError:
+        return etree.HTMLParser(**options), codecs.getincrementaldecoder(encoding)(errors="replace")
+
+def parse_html(chunks, encoding=None):
+    # chunks: iterable of bytes (or str) pieces of one page. encoding overrides the
+    # sniffed one, e.g. the charset of a Content-Type header.
+    target = _TextTarget()
+    parser = decoder = None
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if parser is None:
+            if isinstance(chunk, bytes):
+                sniffed, bom = sniff_encoding(chunk)
+                chunk = chunk[bom:]
+                parser, decoder = _make_parser(target, encoding or sniffed)
+            else:
+                parser, decoder = _make_parser(target, None)
+        parser.feed(decoder.decode(chunk) if decoder else chunk)
+    if parser is None:
+        return ""
+    if decoder:
+        parser.feed(decoder.decode(b"", final=True))
+    return parser.close()
+
+def html_to_text(html, encoding=None):
+    return parse_html([html], encoding)
+
+def iter_html_chunks(file_path, chunk_bytes=HTML_CHUNK_BYTES):
+    with open(file_path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_bytes)
+            if not chunk:
+                return
+            yield chunk
+
+def extract_from_html(file_path):
+    return parse_html(iter_html_chunks(file_path))
@@ -0,0 +1,293 @@
+import os
+import json
+import time
+import threading
+from .cache import EXTRACTOR_VERSION, ExtractionCache, file_sha256, write_atomic
+from .metrics import NO_METRICS
+from .registry import is_supported
+
+# --- Incremental batch mode ---
+# A manifest in the output folder remembers, for every source that has been extracted,
+# its size, mtime, content hash, the extractor version and settings used, and the names
+# of its output files. A run then only stats the input folder:
+#   unchanged size + mtime             -> skipped without reading the file
+#   changed stat, same content hash    -> skipped, manifest updated (e.g. a touched file)
+#   new, changed, or different settings -> extracted again; outputs keep a stable name
+#   no longer in the input folder      -> its outputs are deleted
+# One manifest per extraction type, so word/sentence/paragraph runs can share a folder.
+MANIFEST_VERSION = 1
+WATCH_SETTLE_SECONDS = 1.0    # a file must be quiet this long before it is extracted
+WATCH_POLL_SECONDS = 2.0      # rescan interval when watchdog is not installed
+MANIFEST_SAVE_SECONDS = 30    # how often a long run writes its progress to the manifest
+
+def manifest_path(out_folder, extract_type):
+    return os.path.join(out_folder, f".extractor_manifest_{extract_type}.json")
+
+def manifest_settings(args):
+    # Everything that changes the output besides the file itself
+    return {
+        "extractor_version": EXTRACTOR_VERSION,
+        "type": args.type,
+        "formats": args.formats,
+        "offsets": args.offsets,
+        "pdf_pages": args.pages,
+        "docx_extras": args.docx_extras,
+        "encoding_errors": args.encoding_errors,
+        "stream": args.stream,
+        "provenance": args.provenance,
+        "index": args.index,
+    }
+
+class Manifest:
+    # files: absolute source path -> {size, mtime_ns, sha256, extractor_version, type,
+    # settings, outputs (file names in the manifest's folder), items, extracted_at}
+    def __init__(self, path, settings):
+        self.path = path
+        self.folder = os.path.dirname(path) or "."
+        self.settings = settings
+        self.files = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.files = data["files"]
+        except (OSError, ValueError, KeyError):
+            pass  # missing or unreadable: everything counts as new
+
+    def save(self):
+        data = {"version": MANIFEST_VERSION, "files": self.files}
+        write_atomic(self.path, json.dumps(data, ensure_ascii=False, indent=0).encode("utf-8"))
+
+    def is_current(self, path, st, existing):
+        # `existing` is the set of file names in the output folder, listed once per run
+        entry = self.files.get(path)
+        return (entry is not None and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns
+                and self.same_settings(entry) and all(name in existing for name in entry["outputs"]))
+
+    def same_settings(self, entry):
+        return entry["settings"] == self.settings
+
+    def record(self, path, st, sha256, outputs, items):
+        old = self.files.get(path)
+        if old is not None:
+            self.remove_outputs(set(old["outputs"]) - set(outputs))
+        self.files[path] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": sha256,
+            "extractor_version": EXTRACTOR_VERSION,
+            "type": self.settings["type"],
+            "settings": self.settings,
+            "outputs": outputs,
+            "items": items,
+            "extracted_at": time.time(),
+        }
+
+    def forget(self, path):
+        # Drops a source and deletes its outputs; returns the number of files removed
+        entry = self.files.pop(path, None)
+        return self.remove_outputs(entry["outputs"]) if entry else 0
+
+    def remove_outputs(self, names):
+        removed = 0
+        for name in names:
+            try:
+                os.remove(os.path.join(self.folder, name))
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+def scan_input(input_folder):
+    # Absolute path -> os.stat_result for every supported file (one scandir pass)
+    found = {}
+    with os.scandir(input_folder) as entries:
+        for entry in entries:
+            if is_supported(entry.name) and entry.is_file():
+                found[os.path.abspath(entry.path)] = entry.stat()
+    return found
+
+def stat_paths(paths):
+    # Like scan_input for just these paths; None for paths that are gone
+    found = {}
+    for path in paths:
+        try:
+            found[path] = os.stat(path) if os.path.isfile(path) else None
+        except OSError:
+            found[path] = None
+    return found
+
+def same_stat(path, st):
+    # True if the file still has the size and mtime it had when it was scanned
+    try:
+        now = os.stat(path)
+    except OSError:
+        return False
+    return (now.st_size, now.st_mtime_ns) == (st.st_size, st.st_mtime_ns)
+
+def sync(args, manifest, found, full, metrics=NO_METRICS, settle=0.0):
+    # Brings the outputs in line with `found` (path -> stat, or None if deleted). With
+    # full, manifest entries missing from `found` are deleted sources too. Files modified
+    # less than `settle` seconds ago are left for the next pass (they may still be copied).
+    # Returns (processed, failed, deferred paths).
+    existing = set(os.listdir(manifest.folder))
+    cache = ExtractionCache(args.cache_dir, int(args.cache_size * 1024 * 1024)) if not args.no_cache else None
+    hash_file = cache.content_hash if cache is not None else file_sha256
+
+    gone = [path for path, st in found.items() if st is None]
+    if full:
+        gone += [path for path in manifest.files if path not in found]
+    gone = [path for path in gone if path in manifest.files]
+    removed = sum(manifest.forget(path) for path in gone)
+
+    changed, deferred, touched = [], [], 0
+    now = time.time()
+    for path, st in found.items():
+        if st is None or manifest.is_current(path, st, existing):
+            continue
+        if settle and now - st.st_mtime < settle:
+            deferred.append(path)
+            continue
+        entry = manifest.files.get(path)
+        if (entry is not None and manifest.same_settings(entry)
+                and all(name in existing for name in entry["outputs"]) and hash_file(path) == entry["sha256"]):
+            entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns)  # same bytes, new mtime
+            touched += 1
+            continue
+        changed.append(path)
+
+    index = None
+    if args.index and (gone or changed):
+        from .index import WordIndex
+        index = WordIndex(args.index)
+        for path in gone:
+            index.remove(path)
+    if gone:
+        print(f"✅ {len(gone)} source(s) removed: deleted {removed} output file(s)")
+    if not changed:
+        if index is not None:
+            index.close()
+        if gone or touched:
+            manifest.save()
+        return 0, 0, deferred
+
+    from .batch import batch_options, process_batch, save_batch_summary
+
+    changed.sort(key=lambda path: found[path].st_size, reverse=True)
+    workers, options = batch_options(args, len(changed), metrics)
+    options["stable_names"] = True
+    print(f"==== Incremental extraction: {len(changed)} new or changed file(s), type={args.type}, "
+          f"workers={workers} ====")
+    started = time.perf_counter()
+    last_save = time.monotonic()
+
+    def on_result(path, summary):
+        nonlocal last_save
+        if summary["Status"] == "ok":
+            outputs = [os.path.basename(out) for out in summary["Output"].split("; ")]
+            try:
+                digest = hash_file(path)
+            except OSError as e:
+                summary["Status"], summary["Error"] = "error", str(e)  # vanished since extraction
+            else:
+                # The hash must be of the bytes that were extracted: if the file changed since
+                # it was scanned, it is not recorded and the next pass extracts it again
+                if same_stat(path, found[path]):
+                    manifest.record(path, found[path], digest, outputs, summary["Items"])
+                else:
+                    print(f"⚠️ {os.path.basename(path)}: changed during extraction; it will be extracted again")
+        else:
+            manifest.forget(path)  # outputs of the previous version would be stale
+            if index is not None:
+                index.remove(path)
+        # Save now and then, so an interrupted run keeps most of its progress
+        if time.monotonic() - last_save > MANIFEST_SAVE_SECONDS:
+            manifest.save()
+            last_save = time.monotonic()
+
+    try:
+        results = process_batch(changed, args.type, manifest.folder, options, workers, metrics, on_result, index)
+    finally:
+        manifest.save()
+        if index is not None:
+            index.close()
+    failed = save_batch_summary([summary for _, summary in results], manifest.folder, started,
+                                options["cache"] is not None)
+    return len(results), failed, deferred
+
+def run_incremental(args, metrics=NO_METRICS):
+    if not os.path.isdir(args.input):
+        print(f"❌ Input folder not found: {args.input}")
+        return 1
+    os.makedirs(args.out, exist_ok=True)
+    manifest = Manifest(manifest_path(args.out, args.type), manifest_settings(args))
+    started = time.perf_counter()
+    found = scan_input(args.input)
+    processed, failed, _ = sync(args, manifest, found, full=True, metrics=metrics)
+    if not processed:
+        print(f"✅ Up to date: {len(found)} file(s) unchanged ({time.perf_counter() - started:.2f}s)")
+    if args.watch:
+        return watch(args, manifest, metrics)
+    return 1 if failed else 0
+
+# --- Watch mode ---
+def watch(args, manifest, metrics=NO_METRICS):
+    input_folder = os.path.abspath(args.input)
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        print(f"⚠️ watchdog is not installed (pip install watchdog); rescanning every {WATCH_POLL_SECONDS:g}s instead")
+        return _poll(args, manifest, metrics)
+
+    pending = {}    # path -> time of its last event
+    lock = threading.Lock()
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if event.is_directory:
+                return
+            for path in (event.src_path, getattr(event, "dest_path", "")):
+                path = os.path.abspath(os.fsdecode(path)) if path else ""
+                if path and os.path.dirname(path) == input_folder and is_supported(path):
+                    with lock:
+                        pending[path] = time.monotonic()
+
+    observer = Observer()
+    observer.schedule(Handler(), input_folder, recursive=False)
+    observer.start()
+    print(f"✅ Watching {args.input}/ for changes (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(0.2)
+            # Wait until a file's events stop, so a file being copied is extracted once
+            with lock:
+                now = time.monotonic()
+                ready = [path for path, last in pending.items() if now - last >= WATCH_SETTLE_SECONDS]
+                for path in ready:
+                    del pending[path]
+            if ready:
+                _, _, deferred = sync(args, manifest, stat_paths(ready), full=False, metrics=metrics,
+                                      settle=WATCH_SETTLE_SECONDS)
+                with lock:
+                    for path in deferred:
+                        pending.setdefault(path, time.monotonic())
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching.")
+    finally:
+        observer.stop()
+        observer.join()
+        manifest.save()
+    return 0
+
+def _poll(args, manifest, metrics):
+    print(f"✅ Watching {args.input}/ for changes (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(WATCH_POLL_SECONDS)
+            sync(args, manifest, scan_input(args.input), full=True, metrics=metrics, settle=WATCH_SETTLE_SECONDS)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching.")
+    finally:
+        manifest.save()
+    return 0
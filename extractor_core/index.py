@@ -0,0 +1,237 @@
+import os
+import time
+import sqlite3
+import itertools
+import numpy as np
+from .paths import INDEX_FILE
+from .segment import EDGE_PUNCTUATION
+
+# --- Word index ---
+# A persistent inverted index over extracted words, kept in one SQLite file:
+#   sources(id, source, words, indexed_at)
+#   postings(term, source_id, count, data)   -- clustered by (term, source_id)
+# `data` holds a term's occurrences in one source as LEB128 varints, alternating
+# (position delta, sentence delta). Positions and sentence indices are the Position and
+# Sentence Index columns of word mode (both 1-based), so a hit points at the same rows
+# a word-mode result file has. Terms are words lowercased with surrounding punctuation
+# stripped. A lookup reads only the rows of the terms asked for; adding a source
+# replaces its previous postings, so the index is updated one source at a time.
+
+def normalize_term(word):
+    return word.strip(EDGE_PUNCTUATION).lower()
+
+def query_terms(query):
+    return [term for term in map(normalize_term, query.split()) if term]
+
+# --- Varint coding (vectorized) ---
+def encode_varints(values):
+    # Returns (bytes, byte length of each value) for an array of non-negative integers
+    values = np.asarray(values, dtype=np.uint64)
+    lengths = np.ones(len(values), dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        lengths += rest > 0
+        rest >>= np.uint64(7)
+    out = np.empty(int(lengths.sum()), dtype=np.uint8)
+    starts = np.cumsum(lengths) - lengths
+    rest = values.copy()
+    for k in range(int(lengths.max(initial=0))):
+        active = np.flatnonzero(lengths > k)
+        more = (lengths[active] > k + 1).astype(np.uint8) << 7
+        out[starts[active] + k] = (rest[active] & np.uint64(0x7f)).astype(np.uint8) | more
+        rest[active] >>= np.uint64(7)
+    return out.tobytes(), lengths
+
+def decode_varints(data):
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if not len(raw):
+        return np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero(raw < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    shifts = (np.arange(len(raw)) - np.repeat(starts, ends - starts + 1)) * 7
+    parts = (raw & 0x7f).astype(np.int64) << shifts
+    return np.add.reduceat(parts, starts)
+
+def decode_postings(data):
+    # -> (positions, sentences), both ascending
+    deltas = decode_varints(data)
+    return np.cumsum(deltas[0::2]), np.cumsum(deltas[1::2])
+
+# --- Building postings ---
+def build_postings(words, word_sentence):
+    # words: the source's words in order (Segments.texts("word")); word_sentence: their
+    # sentence indices. Returns [(term, count, data)] sorted by term.
+    # Normalize each distinct word once: number the words by first occurrence (in C, via
+    # dict.setdefault), then map those numbers to term ids
+    distinct = {}
+    first_seen = np.fromiter(map(distinct.setdefault, words, itertools.count()), dtype=np.int64,
+                             count=len(words))
+    _, word_ids = np.unique(first_seen, return_inverse=True)
+    vocabulary = {}
+    word_terms = np.array([vocabulary.setdefault(term, len(vocabulary)) if term else -1
+                           for term in map(normalize_term, distinct)], dtype=np.int64)
+    term_ids = word_terms[word_ids] if len(words) else word_terms
+    kept = np.flatnonzero(term_ids >= 0)
+    if not len(kept):
+        return []
+    order = kept[np.argsort(term_ids[kept], kind="stable")]     # grouped by term, positions ascending
+    term_ids = term_ids[order]
+    positions = order + 1
+    sentences = np.asarray(word_sentence, dtype=np.int64)[order]
+
+    group_starts = np.flatnonzero(np.r_[True, term_ids[1:] != term_ids[:-1]])
+    position_deltas = np.diff(positions, prepend=0)
+    sentence_deltas = np.diff(sentences, prepend=0)
+    position_deltas[group_starts] = positions[group_starts]
+    sentence_deltas[group_starts] = sentences[group_starts]
+    values = np.empty(2 * len(positions), dtype=np.int64)
+    values[0::2] = position_deltas
+    values[1::2] = sentence_deltas
+    data, lengths = encode_varints(values)
+
+    byte_ends = np.cumsum(lengths)
+    bounds = np.r_[0, byte_ends[2 * np.r_[group_starts[1:], len(positions)] - 1]].tolist()
+    counts = np.diff(np.r_[group_starts, len(positions)]).tolist()
+    terms = list(vocabulary)
+    group_terms = term_ids[group_starts].tolist()
+    postings = [(terms[tid], count, data[bounds[i]:bounds[i + 1]])
+                for i, (tid, count) in enumerate(zip(group_terms, counts))]
+    postings.sort()
+    return postings
+
+def segment_postings(segments):
+    return build_postings(segments.texts("word"), segments.word_sentence)
+
+# --- Index file ---
+class WordIndex:
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=60)
+        self.db.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS sources (
+                id INTEGER PRIMARY KEY,
+                source TEXT NOT NULL UNIQUE,
+                words INTEGER NOT NULL,
+                indexed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                source_id INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                PRIMARY KEY (term, source_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_by_source ON postings (source_id);
+        """)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Updating ---
+    def add(self, source, postings, words):
+        # Replaces everything indexed for `source` in one transaction
+        with self.db:
+            self._delete(source)
+            source_id = self.db.execute("INSERT INTO sources (source, words, indexed_at) VALUES (?, ?, ?)",
+                                        (source, words, time.time())).lastrowid
+            self.db.executemany("INSERT INTO postings VALUES (?, ?, ?, ?)",
+                                ((term, source_id, count, data) for term, count, data in postings))
+
+    def add_segments(self, source, segments):
+        self.add(source, segment_postings(segments), len(segments.words))
+
+    def remove(self, source):
+        with self.db:
+            return self._delete(source)
+
+    def _delete(self, source):
+        row = self.db.execute("SELECT id FROM sources WHERE source = ?", (source,)).fetchone()
+        if row is None:
+            return False
+        self.db.execute("DELETE FROM postings WHERE source_id = ?", row)
+        self.db.execute("DELETE FROM sources WHERE id = ?", row)
+        return True
+
+    # --- Reading ---
+    def sources(self):
+        return [row[0] for row in self.db.execute("SELECT source FROM sources ORDER BY source")]
+
+    def stats(self):
+        sources, words = self.db.execute("SELECT COUNT(*), COALESCE(SUM(words), 0) FROM sources").fetchone()
+        terms = self.db.execute("SELECT COUNT(DISTINCT term) FROM postings").fetchone()[0]
+        return {"sources": sources, "words": words, "terms": terms, "bytes": os.path.getsize(self.path)}
+
+    def _postings(self, term):
+        return self.db.execute("SELECT s.source, p.data FROM postings p JOIN sources s ON s.id = p.source_id "
+                               "WHERE p.term = ?", (term,)).fetchall()
+
+    def lookup(self, term):
+        # {source: (positions, sentences)} for one word
+        return {source: decode_postings(data) for source, data in self._postings(normalize_term(term))}
+
+    def phrase(self, words):
+        # {source: (positions, sentences)} of each place the words occur one after another;
+        # positions and sentences are those of the phrase's first word
+        terms = [normalize_term(word) for word in words]
+        if not terms or not all(terms):
+            return {}
+        found = self.lookup(terms[0])
+        for offset, term in enumerate(terms[1:], 1):
+            if not found:
+                break
+            following = self.lookup(term)
+            narrowed = {}
+            for source, (positions, sentences) in found.items():
+                if source not in following:
+                    continue
+                keep = np.isin(positions + offset, following[source][0], assume_unique=True)
+                if keep.any():
+                    narrowed[source] = (positions[keep], sentences[keep])
+            found = narrowed
+        return found
+
+    def search(self, query):
+        # One word -> lookup, several -> phrase. Returns [{source, count, sentences,
+        # positions}], most matches first.
+        terms = query_terms(query)
+        found = self.lookup(terms[0]) if len(terms) == 1 else self.phrase(terms)
+        hits = [{"source": source, "count": len(positions), "sentences": np.unique(sentences).tolist(),
+                 "positions": positions.tolist()}
+                for source, (positions, sentences) in found.items()]
+        hits.sort(key=lambda hit: (-hit["count"], hit["source"]))
+        return hits
+
+# --- Command line: query ---
+def run_query(args):
+    if not os.path.isfile(args.index):
+        print(f"❌ Index not found: {args.index} (build it with: batch --index)")
+        return 1
+    if not query_terms(args.query):
+        print("❌ The query has no words to look up.")
+        return 1
+    with WordIndex(args.index) as index:
+        started = time.perf_counter()
+        hits = index.search(args.query)
+        elapsed = (time.perf_counter() - started) * 1000
+        total = sum(hit["count"] for hit in hits)
+        print(f"✅ \"{args.query}\": {total} match(es) in {len(hits)} source(s) ({elapsed:.1f} ms)")
+        for hit in hits[:args.limit]:
+            sentences = ", ".join(map(str, hit["sentences"][:args.max_sentences]))
+            more = len(hit["sentences"]) - args.max_sentences
+            if more > 0:
+                sentences += f", ... (+{more})"
+            print(f"  {hit['source']}: {hit['count']} match(es) in sentence(s) {sentences}")
+            if args.positions:
+                print(f"    positions: {', '.join(map(str, hit['positions']))}")
+        if len(hits) > args.limit:
+            print(f"  ... {len(hits) - args.limit} more source(s)")
+    return 0
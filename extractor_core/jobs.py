@@ -0,0 +1,355 @@
+import os
+import re
+import json
+import time
+import sys
+import signal
+import multiprocessing
+from multiprocessing.connection import wait
+import pandas as pd
+from .batch import batch_options, batch_worker, collect_batch_files, save_batch_summary, stable_output_name
+from .incremental import manifest_settings
+from .index import WordIndex
+from .metrics import NO_METRICS
+from .writers import format_extension
+
+# --- Resumable batch jobs ---
+# `batch --job NAME` runs every file in a process of its own and records each outcome in
+# a journal, .extractor_job_<name>.jsonl in the output folder: one JSON line per event,
+# flushed and fsync'd before the next file is reported, so a crash, a kill or a power
+# cut loses at most the files that were being extracted at that moment.
+#   {"event": "job", ...}          a run started (settings, file counts)
+#   {"event": "done", ...}         a file's results are complete (path, size, mtime_ns, outputs)
+#   {"event": "quarantined", ...}  a file failed, timed out, crashed its worker or went
+#                                  over the memory cap (path, reason)
+# Running the same command again skips files that are done (and unchanged) and files in
+# quarantine (unless --retry-quarantined), and carries on with the rest. Results have
+# stable names, so a file that was cut off half way is simply written again.
+JOURNAL_VERSION = 1
+POLL_SECONDS = 0.1          # how often running workers are checked against the limits
+KILL_WAIT_SECONDS = 5       # time a killed worker gets to disappear before it is left alone
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+MEMORY_CAP_SUPPORTED = os.path.exists("/proc/self/statm")   # RSS is read from /proc (Linux)
+PR_SET_PDEATHSIG = 1
+
+def journal_path(out_folder, name):
+    return os.path.join(out_folder, f".extractor_job_{safe_name(name)}.jsonl")
+
+def quarantine_path(out_folder, name):
+    return os.path.join(out_folder, f"job_{safe_name(name)}_quarantine.csv")
+
+def safe_name(name):
+    # A job, queue or worker name as a file name part
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("._") or "job"
+
+def job_settings(args):
+    # Everything a resumed run must share with the run it continues
+    return dict(manifest_settings(args), version=JOURNAL_VERSION, input=os.path.abspath(args.input))
+
+class Journal:
+    # done / quarantined: absolute source path -> its latest journal entry
+    def __init__(self, path):
+        self.path = path
+        self.settings = None
+        self.done = {}
+        self.quarantined = {}
+        self._file = None
+        self._torn = False
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        self._torn = bool(data) and not data.endswith(b"\n")
+        for line in data.splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # the last line of a journal cut off mid-write
+            event = entry.get("event")
+            if event == "job":
+                self.settings = entry["settings"]
+            elif event == "done":
+                self.done[entry["path"]] = entry
+                self.quarantined.pop(entry["path"], None)
+            elif event == "quarantined":
+                self.quarantined[entry["path"]] = entry
+                self.done.pop(entry["path"], None)
+
+    def append(self, event, **fields):
+        if self._file is None:
+            self._file = open(self.path, "ab")
+            if self._torn:
+                self._file.write(b"\n")  # don't glue the first new entry onto a torn line
+        entry = dict(event=event, time=round(time.time(), 3), **fields)
+        self._file.write(json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        if event == "done":
+            self.done[entry["path"]] = entry
+            self.quarantined.pop(entry["path"], None)
+        elif event == "quarantined":
+            self.quarantined[entry["path"]] = entry
+            self.done.pop(entry["path"], None)
+
+    def reset(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self.settings, self.done, self.quarantined, self._torn = None, {}, {}, False
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def is_done(self, path, st, existing):
+        # `existing` is the set of file names in the output folder
+        entry = self.done.get(path)
+        return (entry is not None and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns
+                and all(name in existing for name in entry["outputs"]))
+
+# --- Isolated workers ---
+class FileRun:
+    __slots__ = ("path", "process", "started", "peak")
+
+    def __init__(self, path, process):
+        self.path = path
+        self.process = process
+        self.started = time.monotonic()
+        self.peak = 0
+
+def _file_worker(conn, parent_pid, file_path, extract_type, out_folder, options):
+    # Entry point of a file's process. It gets a process group of its own, so killing
+    # the group also stops its PDF page workers, volunteers to be the first victim of the
+    # kernel's OOM killer rather than the job runner, and (on Linux) dies with the runner,
+    # so a killed job leaves no worker behind to race the resumed one.
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+    try:
+        with open("/proc/self/oom_score_adj", "w") as f:
+            f.write("1000")
+    except OSError:
+        pass
+    if sys.platform.startswith("linux"):
+        import ctypes
+        try:
+            ctypes.CDLL(None, use_errno=True).prctl(PR_SET_PDEATHSIG, signal.SIGKILL)
+        except (OSError, AttributeError):
+            pass
+        if os.getppid() != parent_pid:
+            os._exit(1)  # the runner died before prctl took effect
+    conn.send(batch_worker(file_path, extract_type, out_folder, options))
+    conn.close()
+
+def tree_rss(pid):
+    # Resident memory of a process and all its descendants in bytes (Linux /proc)
+    total, stack = 0, [pid]
+    while stack:
+        pid = stack.pop()
+        try:
+            with open(f"/proc/{pid}/statm", "rb") as f:
+                total += int(f.read().split()[1]) * PAGE_SIZE
+            with open(f"/proc/{pid}/task/{pid}/children", "rb") as f:
+                stack.extend(map(int, f.read().split()))
+        except (OSError, ValueError, IndexError):
+            continue  # exited in the meantime
+    return total
+
+def kill_worker(process):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, OSError):
+        process.kill()  # no process groups, or killed before setpgrp ran
+    process.join(KILL_WAIT_SECONDS)
+
+def exit_reason(exitcode):
+    if exitcode is not None and exitcode < 0:
+        try:
+            name = signal.Signals(-exitcode).name
+        except ValueError:
+            name = f"signal {-exitcode}"
+        hint = " (out of memory?)" if name == "SIGKILL" else ""
+        return f"worker crashed: {name}{hint}"
+    return f"worker exited with code {exitcode} without a result"
+
+def failed_summary(path, seconds, reason):
+    return {"Source": os.path.basename(path), "Status": "error", "Items": 0, "Output": "",
+            "Seconds": round(seconds, 3), "Cache": "", "Error": reason}
+
+def run_isolated(files, extract_type, out_folder, options, workers, timeout=None, max_bytes=None,
+                 on_result=None):
+    # Like batch.process_batch, but each file gets a fresh process that is killed when it
+    # runs longer than `timeout` seconds or its process tree holds more than `max_bytes`
+    # of memory. on_result(path, summary, records, slowest, postings) is called as each
+    # file finishes; killed and crashed files get an "error" summary and no records.
+    # `files` may be a lazy iterable: the next path is only asked for once a slot is free.
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+    files = iter(files)
+    exhausted = False
+    running = {}  # result connection -> FileRun
+    try:
+        while running or not exhausted:
+            while not exhausted and len(running) < workers:
+                path = next(files, None)
+                if path is None:
+                    exhausted = True
+                    break
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(target=_file_worker,
+                                          args=(sender, os.getpid(), path, extract_type, out_folder, options))
+                process.start()
+                sender.close()  # so the receiver sees EOF if the worker dies
+                running[receiver] = FileRun(path, process)
+            for conn in wait(list(running), timeout=POLL_SECONDS):
+                run = running.pop(conn)
+                try:
+                    summary, records, slowest, postings, _ = conn.recv()
+                except (EOFError, OSError):
+                    summary, records, slowest, postings = None, [], None, []
+                conn.close()
+                run.process.join()
+                if summary is None:
+                    summary = failed_summary(run.path, time.monotonic() - run.started,
+                                             exit_reason(run.process.exitcode))
+                on_result(run.path, summary, records, slowest, postings)
+            now = time.monotonic()
+            for conn, run in list(running.items()):
+                reason = None
+                if timeout and now - run.started > timeout:
+                    reason = f"timed out after {timeout:g}s"
+                elif max_bytes:
+                    run.peak = max(run.peak, tree_rss(run.process.pid))
+                    if run.peak > max_bytes:
+                        reason = f"went over the memory cap ({run.peak / 2 ** 20:.0f} MB > {max_bytes / 2 ** 20:.0f} MB)"
+                if reason is None:
+                    continue
+                del running[conn]
+                kill_worker(run.process)
+                conn.close()
+                on_result(run.path, failed_summary(run.path, now - run.started, reason), [], None, [])
+    finally:
+        for run in running.values():
+            kill_worker(run.process)
+
+# --- Job runner ---
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+def remove_outputs(out_folder, names):
+    for name in names:
+        try:
+            os.remove(os.path.join(out_folder, name))
+        except OSError:
+            pass
+
+def save_quarantine(journal, files, out_path):
+    # Rewrites the list of quarantined files that are still in the input folder (or
+    # removes it once there are none); returns its length
+    entries = sorted((journal.quarantined[path] for path in files if path in journal.quarantined),
+                     key=lambda entry: entry["path"])
+    if not entries:
+        remove_outputs(os.path.dirname(out_path), [os.path.basename(out_path)])
+        return 0
+    pd.DataFrame({
+        "Source": [os.path.basename(entry["path"]) for entry in entries],
+        "Path": [entry["path"] for entry in entries],
+        "Reason": [entry["reason"] for entry in entries],
+        "Quarantined At": [time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["time"])) for entry in entries],
+    }).to_csv(out_path, index=False)
+    return len(entries)
+
+def run_job(args, metrics=NO_METRICS):
+    if not os.path.isdir(args.input):
+        print(f"❌ Input folder not found: {args.input}")
+        return 1
+    os.makedirs(args.out, exist_ok=True)
+    if args.max_memory and not MEMORY_CAP_SUPPORTED:
+        print("⚠️ --max-memory needs /proc (Linux); files will run without a memory cap")
+    journal = Journal(journal_path(args.out, args.job))
+    settings = job_settings(args)
+    if args.restart:
+        journal.reset()
+    elif journal.settings is not None and journal.settings != settings:
+        changed = sorted(key for key in settings if journal.settings.get(key) != settings[key])
+        print(f"❌ Job '{args.job}' was started with different options ({', '.join(changed)}). "
+              f"Run it with the same options, or start over with --restart.")
+        return 1
+
+    files = [os.path.abspath(path) for path in collect_batch_files(args.input)]
+    existing = set(os.listdir(args.out))
+    stats = {path: os.stat(path) for path in files}
+    done = [path for path in files if journal.is_done(path, stats[path], existing)]
+    held = [path for path in files if path in journal.quarantined and not args.retry_quarantined]
+    skipped = set(done) | set(held)
+    pending = [path for path in files if path not in skipped]
+    journal.append("job", settings=settings, files=len(files), pending=len(pending))
+    print(f"==== Job '{args.job}': {len(files)} file(s), {len(done)} already done, {len(held)} in quarantine, "
+          f"{len(pending)} to extract, type={args.type} ====")
+
+    started = time.perf_counter()
+    results = []
+    index = None
+    if pending:
+        workers, options = batch_options(args, len(pending), metrics)
+        options["stable_names"] = True
+        limits = []
+        if args.file_timeout:
+            limits.append(f"timeout {args.file_timeout:g}s")
+        if args.max_memory and MEMORY_CAP_SUPPORTED:
+            limits.append(f"memory cap {args.max_memory:g} MB")
+        print(f"Workers: {workers}, one process per file" + (f", {', '.join(limits)}" if limits else ""))
+        names = {path: [stable_output_name(path, args.type, format_extension(fmt)) for fmt in args.formats]
+                 for path in pending}
+        index = WordIndex(args.index) if args.index else None
+
+        def on_result(path, summary, records, slowest, postings):
+            results.append((path, summary))
+            number = len(done) + len(results)
+            if summary["Status"] == "ok":
+                if index is not None and postings:
+                    index.add(path, *postings[0])
+                journal.append("done", path=path, size=stats[path].st_size, mtime_ns=stats[path].st_mtime_ns,
+                               outputs=names[path], items=summary["Items"], seconds=summary["Seconds"])
+                print(f"✅ [{number}/{len(files)}] {summary['Source']}: {summary['Items']} item(s) "
+                      f"→ {summary['Output']}")
+            else:
+                remove_outputs(args.out, names[path])  # whatever the worker got to write is incomplete
+                if index is not None:
+                    index.remove(path)
+                journal.append("quarantined", path=path, reason=summary["Error"] or "failed",
+                               seconds=summary["Seconds"])
+                print(f"⚠️ [{number}/{len(files)}] {summary['Source']}: quarantined, {summary['Error']}")
+            for record in records:
+                metrics.add(dict(record, run=metrics.run_id))
+            if slowest is not None:
+                metrics.add_profile(*slowest)
+
+        previous = signal.signal(signal.SIGTERM, _interrupt)
+        try:
+            max_bytes = int(args.max_memory * 2 ** 20) if args.max_memory and MEMORY_CAP_SUPPORTED else None
+            run_isolated(pending, args.type, args.out, options, workers, args.file_timeout, max_bytes, on_result)
+        except KeyboardInterrupt:
+            print(f"\n👋 Job '{args.job}' interrupted after {len(results)} file(s). "
+                  f"Run the same command again to resume.")
+            return 130
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+            journal.close()
+            if index is not None:
+                index.close()
+        if index is not None:
+            print(f"✅ Word index updated: {args.index}")
+        save_batch_summary([summary for _, summary in results], args.out, started, options["cache"] is not None)
+    else:
+        journal.close()
+        print(f"✅ Nothing left to extract ({time.perf_counter() - started:.2f}s)")
+
+    quarantined = save_quarantine(journal, files, quarantine_path(args.out, args.job))
+    if quarantined:
+        print(f"⚠️ {quarantined} file(s) in quarantine, listed in {quarantine_path(args.out, args.job)}. "
+              f"Rerun with --retry-quarantined to try them again.")
+    return 1 if quarantined else 0
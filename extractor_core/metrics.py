@@ -0,0 +1,241 @@
+import os
+import sys
+import json
+import argparse
+import time
+import marshal
+import threading
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# --- Run metrics ---
+# Each pipeline stage (extract, segment, rows, display, save, ...) is timed as
+#
+#     with metrics.stage("segment", source) as stage:
+#         segments = segment_text(text)
+#         stage.items = len(segments.sentences)
+#
+# and appended to a JSONL file as one record: wall and CPU seconds, peak RSS during the
+# stage, bytes in/out, characters and items. Instrumentation is off unless a front end
+# is started with --metrics or --profile; NO_METRICS then hands out one shared no-op
+# stage, so the disabled path costs an attribute lookup and a method call per stage.
+METRICS_FILE = os.path.join("output", "metrics.jsonl")
+PROFILE_TOP = 40          # functions listed in the profile's text summary
+
+class Stage:
+    __slots__ = ("name", "source", "bytes_in", "bytes_out", "chars", "items", "info")
+
+    def __init__(self, name, source=None, bytes_in=None):
+        self.name = name
+        self.source = source
+        self.bytes_in = bytes_in
+        self.bytes_out = None
+        self.chars = None
+        self.items = None
+        self.info = {}      # extra fields for the record, e.g. {"cache": "hit"}
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+    @property
+    def info(self):
+        return {}
+
+class NullMetrics:
+    enabled = False
+
+    def stage(self, name, source=None, bytes_in=None):
+        return _NULL_STAGE
+
+    def add(self, record):
+        pass
+
+    def close(self):
+        pass
+
+_NULL_STAGE = _NullStage()
+NO_METRICS = NullMetrics()
+
+# --- Memory ---
+# On Linux the peak (VmHWM) can be reset, so each stage reports its own peak; elsewhere
+# the process-lifetime peak from getrusage is reported.
+_STATUS = "/proc/self/status"
+_CLEAR_REFS = "/proc/self/clear_refs"
+
+def reset_peak_rss():
+    try:
+        with open(_CLEAR_REFS, "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def peak_rss():
+    # Peak resident set size in bytes, or None where it can't be read
+    try:
+        with open(_STATUS) as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+# --- Recorder ---
+class RunMetrics:
+    enabled = True
+
+    def __init__(self, path=None, profile=False, front_end="cli"):
+        # path: JSONL file the records are appended to (None keeps them in .records only,
+        # e.g. in batch workers that send them back to the parent process).
+        # profile: run each stage under cProfile and keep the slowest stage's profile.
+        self.path = path
+        self.profile = profile
+        self.front_end = front_end
+        self.run_id = f"{datetime.now():%Y%m%d_%H%M%S}_{os.getpid()}"
+        self.records = []
+        self.slowest = None     # (wall seconds, record, cProfile stats) of the slowest profiled stage
+        self._lock = threading.Lock()
+        self._profiling = False
+        self._out = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._out = open(path, "a", encoding="utf-8")
+
+    def stage(self, name, source=None, bytes_in=None):
+        return _StageTimer(self, Stage(name, source, bytes_in))
+
+    def add(self, record):
+        record.setdefault("run", self.run_id)
+        record.setdefault("front_end", self.front_end)
+        with self._lock:
+            self.records.append(record)
+            if self._out is not None:
+                self._out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                self._out.flush()
+
+    def add_profile(self, wall, record, stats):
+        with self._lock:
+            if self.slowest is None or wall > self.slowest[0]:
+                self.slowest = (wall, record, stats)
+
+    def write_profile(self, folder):
+        # Writes the slowest stage's profile as <run>.prof (for pstats / snakeviz) plus a
+        # text summary sorted by cumulative time; returns the .prof path or None
+        if self.slowest is None:
+            return None
+        import pstats
+        _, record, stats = self.slowest
+        os.makedirs(folder, exist_ok=True)
+        label = "".join(c if c.isalnum() else "_" for c in f"{record['stage']}_{record.get('source') or ''}")
+        path = os.path.join(folder, f"profile_{self.run_id}_{label.strip('_')}.prof")
+        with open(path, "wb") as f:
+            marshal.dump(stats, f)
+        with open(os.path.splitext(path)[0] + ".txt", "w", encoding="utf-8") as f:
+            f.write(f"Slowest stage: {record['stage']} ({record.get('source') or '-'}), "
+                    f"{record['wall_s']:.3f}s wall\n\n")
+            pstats.Stats(path, stream=f).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        return path
+
+    def close(self):
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+
+class _StageTimer:
+    __slots__ = ("metrics", "stage", "profiler", "wall", "cpu")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+        self.profiler = None
+
+    def __enter__(self):
+        metrics = self.metrics
+        # One profiler at a time: a stage nested in a profiled stage is only timed
+        if metrics.profile and not metrics._profiling:
+            import cProfile
+            metrics._profiling = True
+            self.profiler = cProfile.Profile()
+        reset_peak_rss()
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.enable()
+        return self.stage
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.profiler is not None:
+            self.profiler.disable()
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        peak = peak_rss()
+        stage = self.stage
+        record = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "stage": stage.name,
+            "source": stage.source,
+            "status": "ok" if exc_type is None else "error",
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "peak_rss_mb": None if peak is None else round(peak / (1024 * 1024), 2),
+            "bytes_in": stage.bytes_in,
+            "bytes_out": stage.bytes_out,
+            "chars": stage.chars,
+            "items": stage.items,
+        }
+        record.update(stage.info)
+        if exc_type is not None:
+            record["error"] = str(exc) or exc_type.__name__
+        self.metrics.add(record)
+        if self.profiler is not None:
+            self.profiler.create_stats()
+            self.metrics._profiling = False
+            self.metrics.add_profile(wall, record, self.profiler.stats)
+        return False
+
+def file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+def add_metrics_arguments(parser, subcommand=False):
+    # Subcommands repeat the options with SUPPRESS defaults, so they may be given before
+    # or after the subcommand name without one overwriting the other
+    default = argparse.SUPPRESS if subcommand else None
+    parser.add_argument("--metrics", nargs="?", const=METRICS_FILE, default=default, metavar="FILE",
+                        help=f"Append per-stage timing and memory records to a JSONL file (default: {METRICS_FILE})")
+    parser.add_argument("--profile", action="store_true", default=default if subcommand else False,
+                        help="Profile every stage with cProfile and save the slowest one's profile next to the metrics file")
+
+def metrics_from_args(args, front_end):
+    # --profile alone still writes metrics, to the default file
+    path = getattr(args, "metrics", None)
+    profile = getattr(args, "profile", False)
+    if path is None and not profile:
+        return NO_METRICS
+    return RunMetrics(path or METRICS_FILE, profile, front_end)
+
+def finish_metrics(metrics):
+    # Closes the metrics file and writes the profile next to it; returns the profile path or None
+    if not metrics.enabled:
+        return None
+    metrics.close()
+    return metrics.write_profile(os.path.dirname(metrics.path) or ".") if metrics.profile else None
@@ -0,0 +1,202 @@
+import re
+import numpy as np
+from .results import build_segment_frame
+
+# --- Paged terminal display ---
+# Results are shown a page at a time and only the rows on the page are built and
+# formatted, so a word-mode result of millions of rows opens as fast as a small one.
+# A page source has len(), frame(start, stop), find(pattern, row) and summary():
+#   SegmentPages - rows built on demand from a Segments (word/sentence/paragraph)
+#   FramePages   - an already built, small table (e.g. word statistics)
+PAGE_ROWS = 20
+CELL_CHARS = 120            # longer cells are cut on screen (saved files keep everything)
+SUMMARY_ROWS = 10_000       # results larger than this open with the summary view
+HISTOGRAM_WIDTH = 40
+
+PAGER_HELP = ("Enter/n next, p previous, f first, l last, <number> go to row, /text search "
+              "(/ again for the next match), s summary, q quit")
+
+def _shorten(value):
+    if isinstance(value, str) and len(value) > CELL_CHARS:
+        return value[:CELL_CHARS - 1] + "…"
+    return value
+
+class SegmentPages:
+    def __init__(self, segments, extract_type, source):
+        self.segments = segments
+        self.extract_type = extract_type
+        self.source = source
+        self.spans = segments.spans(extract_type)
+
+    def __len__(self):
+        return len(self.spans)
+
+    def frame(self, start, stop):
+        return build_segment_frame(self.segments, self.extract_type, self.source, rows=slice(start, stop))
+
+    def find(self, pattern, row):
+        # First row at or after `row` whose text contains a match (a match that starts
+        # between two rows counts for the next one); None if there is none
+        if row >= len(self.spans):
+            return None
+        match = pattern.search(self.segments.text, int(self.spans[row, 0]))
+        if match is None:
+            return None
+        found = int(np.searchsorted(self.spans[:, 1], match.start(), side="right"))
+        return found if found < len(self.spans) else None
+
+    def summary(self):
+        spans = self.spans
+        lengths = spans[:, 1] - spans[:, 0]
+        lines = [f"Source: {self.source}",
+                 f"Type: {self.extract_type}",
+                 f"Rows: {len(spans):,}",
+                 f"Characters in text: {len(self.segments.text):,}",
+                 f"Words: {len(self.segments.words):,}",
+                 f"Sentences: {len(self.segments.sentences):,}",
+                 f"Paragraphs: {len(self.segments.paragraphs):,}"]
+        if not len(spans):
+            return lines
+        lines += ["", "Character Length:"] + describe(lengths)
+        if self.extract_type != "word":
+            word_starts = self.segments.words[:, 0]
+            word_counts = np.searchsorted(word_starts, spans[:, 1]) - np.searchsorted(word_starts, spans[:, 0])
+            lines += ["", "Word Count:"] + describe(word_counts)
+        longest = np.argsort(-lengths, kind="stable")[:3]
+        lines += ["", "Longest rows:"]
+        for row in longest.tolist():
+            a, b = spans[row].tolist()
+            lines.append(f"  row {row + 1:,}: {b - a:,} characters  {_shorten(' '.join(self.segments.text[a:b].split()))}")
+        return lines
+
+class FramePages:
+    def __init__(self, df, search_column=None, describe_columns=None, group_column=None):
+        # describe_columns: columns the summary describes (default: the integer columns
+        # other than Index / Rank), separately for each value of group_column if given
+        self.df = df
+        self.search_column = search_column or df.columns[0]
+        self.describe_columns = describe_columns or [name for name in df.columns if df[name].dtype.kind in "iu"
+                                                     and name not in ("Index", "Rank")]
+        self.group_column = group_column
+
+    def __len__(self):
+        return len(self.df)
+
+    def frame(self, start, stop):
+        return self.df.iloc[start:stop]
+
+    def find(self, pattern, row):
+        column = self.df[self.search_column].iloc[row:].astype(str)
+        hits = np.flatnonzero(column.str.contains(pattern).to_numpy())
+        return row + int(hits[0]) if len(hits) else None
+
+    def summary(self):
+        lines = [f"Rows: {len(self.df):,}"]
+        groups = self.df.groupby(self.group_column, sort=True) if self.group_column else [(None, self.df)]
+        for key, part in groups:
+            for name in self.describe_columns:
+                title = name if key is None else f"{name}, {self.group_column} = {key} ({len(part):,} rows)"
+                lines += ["", f"{title}:"] + describe(part[name].to_numpy())
+        return lines
+
+def describe(values):
+    # Spread and a log2-bucket histogram of non-negative integers, as lines of text
+    values = np.asarray(values)
+    p50, p90, p99 = np.percentile(values, [50, 90, 99]).tolist()
+    lines = [f"  min {values.min():,}  median {p50:,.0f}  mean {values.mean():,.1f}  "
+             f"p90 {p90:,.0f}  p99 {p99:,.0f}  max {values.max():,}"]
+    # Buckets 0, 1, 2-3, 4-7, 8-15, ...
+    buckets = np.zeros(len(values), dtype=np.int64)
+    positive = values > 0
+    buckets[positive] = np.floor(np.log2(values[positive])).astype(np.int64) + 1
+    counts = np.bincount(buckets)
+    widest = counts.max()
+    for bucket, count in enumerate(counts.tolist()):
+        if not count:
+            continue
+        low, high = (0, 0) if bucket == 0 else (2 ** (bucket - 1), 2 ** bucket - 1)
+        label = f"{low:,}" if low == high else f"{low:,}-{high:,}"
+        bar = "█" * max(1, round(HISTOGRAM_WIDTH * count / widest))
+        lines.append(f"  {label:>15} | {bar} {count:,}")
+    return lines
+
+def render_page(pages, start, page_rows=PAGE_ROWS):
+    from tabulate import tabulate
+    df = pages.frame(start, start + page_rows)
+    shown = df.apply(lambda column: column.map(_shorten)) if len(df) else df
+    return tabulate(shown, headers="keys", tablefmt="grid", showindex=False), len(df)
+
+def print_summary(pages):
+    print("\n".join(pages.summary()))
+
+def run_pager(pages, page_rows=PAGE_ROWS, ask=input):
+    # Interactive loop; returns the number of rows rendered
+    total = len(pages)
+    if total == 0:
+        print("(no rows)")
+        return 0
+    start, shown, pattern, query = 0, 0, None, ""
+    if total > SUMMARY_ROWS:
+        print_summary(pages)
+        print(f"\n{total:,} rows: showing them a page at a time.")
+    print(PAGER_HELP)
+    while True:
+        table, rows = render_page(pages, start, page_rows)
+        shown += rows
+        print(table)
+        print(f"Rows {start + 1:,}-{start + rows:,} of {total:,} (page {start // page_rows + 1:,} "
+              f"of {(total - 1) // page_rows + 1:,})")
+        while True:
+            command = ask("Page (n/p/f/l/<row>//text/s/q/?): ").strip()
+            lowered = command.lower()
+            if lowered in ("", "n"):
+                if start + page_rows >= total:
+                    print("(last page)")
+                    continue
+                start += page_rows
+            elif lowered == "p":
+                if start == 0:
+                    print("(first page)")
+                    continue
+                start = max(0, start - page_rows)
+            elif lowered == "f":
+                start = 0
+            elif lowered == "l":
+                start = (total - 1) // page_rows * page_rows
+            elif lowered.isdigit():
+                row = int(lowered)
+                if not 1 <= row <= total:
+                    print(f"❌ Row must be between 1 and {total:,}.")
+                    continue
+                start = row - 1
+            elif command.startswith("/"):
+                if len(command) > 1:
+                    query = command[1:]
+                    pattern = re.compile(re.escape(query), re.IGNORECASE)
+                    first = start
+                elif pattern is None:
+                    print("❌ Type /text to search.")
+                    continue
+                else:
+                    first = start + 1
+                found = pages.find(pattern, first)
+                if found is None and first:
+                    found = pages.find(pattern, 0)
+                    if found is not None:
+                        print("(search continued from the top)")
+                if found is None:
+                    print(f"❌ No match for '{query}'.")
+                    continue
+                start = found
+            elif lowered == "s":
+                print_summary(pages)
+                continue
+            elif lowered == "q":
+                return shown
+            elif lowered == "?":
+                print(PAGER_HELP)
+                continue
+            else:
+                print(f"❌ Unknown command. {PAGER_HELP}")
+                continue
+            break
@@ -0,0 +1,17 @@
+import os
+from datetime import datetime
+
+# --- Input/output folders ---
+INPUT_FOLDER = "input"
+OUTPUT_FOLDER = "output"
+INDEX_FILE = ".extractor_index.sqlite"    # word index written by batch/urls --index
+
+def ensure_folders():
+    os.makedirs(INPUT_FOLDER, exist_ok=True)
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+
+# --- Helper: generate timestamped filename ---
+def timestamped_filename(input_file_name, extension):
+    base_name = os.path.splitext(os.path.basename(input_file_name))[0]
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"{base_name}_results_{timestamp}{extension}"
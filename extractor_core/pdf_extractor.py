@@ -0,0 +1,92 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pdfplumber
+
+# --- PDF page engine ---
+PDF_PAGES_PER_TASK = 16       # pages handed to one worker at a time
+PDF_PARALLEL_MIN_PAGES = 64   # below this, process startup costs more than it saves
+
+def parse_page_range(spec, page_count):
+    # "1-50,60,75-" -> [1, 2, ..., 50, 60, 75, ..., page_count] (1-based, in order, no duplicates)
+    if spec is None or str(spec).strip() == "":
+        return list(range(1, page_count + 1))
+    selected = set()
+    for part in str(spec).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if "-" in part:
+                start, end = part.split("-", 1)
+                start = int(start) if start.strip() else 1
+                end = int(end) if end.strip() else page_count
+            else:
+                start = end = int(part)
+        except ValueError:
+            raise ValueError(f"Invalid page range: {part!r}")
+        if start < 1 or end < start:
+            raise ValueError(f"Invalid page range: {part!r}")
+        selected.update(range(start, min(end, page_count) + 1))
+    return sorted(selected)
+
+def pdf_page_count(file_path):
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+def extract_pdf_pages(file_path, page_numbers):
+    # Opens only the requested pages and releases each page's cached objects once read
+    texts = []
+    with pdfplumber.open(file_path, pages=page_numbers) as pdf:
+        for page in pdf.pages:
+            texts.append(page.extract_text() or "")
+            page.close()
+    return texts
+
+def iter_pdf_pages(file_path, pages=None, workers=None, progress=None):
+    # progress(done, total) is called after each page; it may raise to stop early
+    page_numbers = parse_page_range(pages, pdf_page_count(file_path))
+    texts = _iter_page_texts(file_path, page_numbers, workers)
+    if progress is None:
+        yield from texts
+        return
+    for done, text in enumerate(texts, 1):
+        progress(done, len(page_numbers))
+        yield text
+
+def _iter_page_texts(file_path, page_numbers, workers):
+    tasks = [page_numbers[i:i + PDF_PAGES_PER_TASK] for i in range(0, len(page_numbers), PDF_PAGES_PER_TASK)]
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(page_numbers) >= PDF_PARALLEL_MIN_PAGES else 1
+    workers = max(1, min(workers, len(tasks)))
+
+    if workers == 1:
+        for task in tasks:
+            yield from extract_pdf_pages(file_path, task)
+        return
+
+    # Keep a bounded window of tasks in flight and yield them in page order,
+    # so memory stays proportional to workers * PDF_PAGES_PER_TASK pages.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        task_iter = iter(tasks)
+        for task in task_iter:
+            pending.append(pool.submit(extract_pdf_pages, file_path, task))
+            if len(pending) >= workers * 2:
+                break
+        try:
+            while pending:
+                texts = pending.popleft().result()
+                next_task = next(task_iter, None)
+                if next_task is not None:
+                    pending.append(pool.submit(extract_pdf_pages, file_path, next_task))
+                yield from texts
+        finally:
+            # Stopped early (e.g. cancelled): don't wait for tasks that haven't started
+            for future in pending:
+                future.cancel()
+
+# --- PDF extraction ---
+def extract_from_pdf(file_path, pages=None, workers=None, progress=None):
+    return "".join(page_text + "\n" for page_text in iter_pdf_pages(file_path, pages, workers, progress)
+                   if page_text)
@@ -0,0 +1,66 @@
+import os
+from importlib import import_module
+from .text_extractor import DEFAULT_ENCODING_ERRORS
+
+# --- Extractor registry ---
+# Extension -> (module, function). A backend module (and its heavy imports such as
+# pdfplumber or pandas) is only loaded the first time a file of that type is extracted.
+EXTRACTORS = {
+    ".pdf": ("extractor_core.pdf_extractor", "extract_from_pdf"),
+    ".docx": ("extractor_core.docx_extractor", "extract_from_docx"),
+    ".csv": ("extractor_core.spreadsheet_extractor", "extract_from_csv"),
+    ".xls": ("extractor_core.spreadsheet_extractor", "extract_from_excel"),
+    ".xlsx": ("extractor_core.spreadsheet_extractor", "extract_from_excel"),
+    ".txt": ("extractor_core.text_extractor", "extract_from_txt"),
+    ".html": ("extractor_core.html_extractor", "extract_from_html"),
+    ".htm": ("extractor_core.html_extractor", "extract_from_html"),
+}
+URL_EXTRACTOR = ("extractor_core.url_extractor", "extract_from_url")
+
+def register_extractor(extension, module, function):
+    EXTRACTORS[extension.lower()] = (module, function)
+
+def supported_extensions():
+    return list(EXTRACTORS)
+
+def is_supported(file_path):
+    return os.path.splitext(file_path)[-1].lower() in EXTRACTORS
+
+def load_extractor(entry):
+    module, function = entry
+    return getattr(import_module(module), function)
+
+def get_extractor(extension):
+    entry = EXTRACTORS.get(extension.lower())
+    if entry is None:
+        raise ValueError(f"Unsupported file type: {extension}")
+    return load_extractor(entry)
+
+def extract_file(file_path, pdf_pages=None, pdf_workers=None, cache=None, docx_extras=False, progress=None,
+                 encoding_errors=DEFAULT_ENCODING_ERRORS):
+    # progress(done, total) is reported per page for PDFs; it may raise to cancel.
+    # encoding_errors is the decode error policy for .txt files (strict, replace or ignore).
+    ext = os.path.splitext(file_path)[-1].lower()
+    if ext not in EXTRACTORS:
+        raise ValueError(f"Unsupported file type: {ext or file_path}")
+    name = EXTRACTORS[ext][1]
+    if ext == ".pdf":
+        extract = lambda: get_extractor(ext)(file_path, pdf_pages, pdf_workers, progress)
+        options = {"pages": pdf_pages}
+    elif ext == ".docx" and docx_extras:
+        extract = lambda: get_extractor(ext)(file_path, extras=True)
+        options = {"extras": True}
+    elif ext == ".txt" and encoding_errors != DEFAULT_ENCODING_ERRORS:
+        extract = lambda: get_extractor(ext)(file_path, errors=encoding_errors)
+        options = {"errors": encoding_errors}
+    else:
+        extract = lambda: get_extractor(ext)(file_path)
+        options = None
+    if cache is None:
+        return extract()
+    # A cache hit never imports the backend at all
+    return cache.get_or_extract(file_path, name, extract, options)
+
+def extract_url(url, cache=None):
+    # The URL backend keeps its own cache entries (text plus ETag / Last-Modified)
+    return load_extractor(URL_EXTRACTOR)(url, cache)
@@ -0,0 +1,119 @@
+import os
+import numpy as np
+import pandas as pd
+from .segment import segment_text, stream_pieces
+from .text_extractor import DEFAULT_ENCODING_ERRORS, STREAM_BUFFER_CHARS, iter_txt_chunks
+from .writers import RESULT_BATCH_ROWS, write_frames
+
+# --- Columnar result builder ---
+PREVIEW_WORDS = 10
+PREVIEW_CHARS = 50
+
+def constant_category(value, length):
+    return pd.Categorical.from_codes(np.zeros(length, dtype=np.int8), categories=[value])
+
+def build_segment_frame(segments, extract_type, source, offsets=False, rows=None):
+    # Result table for one source (or, with rows=slice(start, stop), for that range of
+    # its units). Counts and lengths come straight from the span arrays; only Content
+    # and Preview cut substrings out of the text.
+    text = segments.text
+    spans = segments.spans(extract_type)
+    first_row = 0
+    if rows is not None:
+        spans = spans[rows]
+        first_row = rows.start or 0
+    starts, ends = spans[:, 0], spans[:, 1]
+    content = segments.texts(extract_type, rows)
+    n = len(content)
+    if extract_type == "word":
+        word_count = np.ones(n, dtype=np.int64)
+        preview = pd.Series(content, dtype=object)
+    else:
+        word_starts, word_ends = segments.words[:, 0], segments.words[:, 1]
+        first = np.searchsorted(word_starts, starts)
+        word_count = np.searchsorted(word_starts, ends) - first
+        if len(word_starts):
+            # Preview = the text from the span's first word to its PREVIEW_WORDS-th word
+            first_word = np.minimum(first, len(word_starts) - 1)
+            last_word = np.maximum(first + np.minimum(word_count, PREVIEW_WORDS) - 1, 0)
+            bounds = zip(word_starts[first_word].tolist(), word_ends[last_word].tolist(), word_count.tolist())
+            preview = [" ".join(text[a:b].split()) if count else "" for a, b, count in bounds]
+        else:
+            preview = [""] * n
+        preview = pd.Series(preview, dtype=object)
+    columns = {
+        "Source": constant_category(source, n),
+        "Type": constant_category(extract_type, n),
+        "Index": np.arange(first_row + 1, first_row + n + 1, dtype=np.int64),
+        "Content": pd.Series(content, dtype=object),
+        "Word Count": word_count,
+        "Character Length": ends - starts,
+        "Preview": preview,
+    }
+    if extract_type == "word":
+        columns["Position"] = np.arange(first_row + 1, first_row + n + 1, dtype=np.int64)
+        columns["Sentence Index"] = segments.word_sentence if rows is None else segments.word_sentence[rows]
+    if offsets:
+        columns["Start Offset"] = starts
+        columns["End Offset"] = ends
+    return pd.DataFrame(columns)
+
+def iter_segment_frames(segments, extract_type, source, offsets=False, batch_rows=RESULT_BATCH_ROWS):
+    # The same table as build_segment_frame, in batches of batch_rows rows
+    total = len(segments.spans(extract_type))
+    if not total:
+        yield build_segment_frame(segments, extract_type, source, offsets)
+    for start in range(0, total, batch_rows):
+        yield build_segment_frame(segments, extract_type, source, offsets, slice(start, start + batch_rows))
+
+def build_preview_frame(items, extract_type):
+    # Layout used by the GUI table: ID / Extracted Data / Type / Length / Preview
+    n = len(items)
+    length = np.fromiter(map(len, items), dtype=np.int64, count=n)
+    preview = pd.Series([item[:PREVIEW_CHARS] for item in items], dtype=object)
+    return pd.DataFrame({
+        "ID": np.arange(1, n + 1, dtype=np.int64),
+        "Extracted Data": pd.Series(list(map(str.strip, items)), dtype=object),
+        "Type": constant_category(extract_type, n),
+        "Length": length,
+        "Preview": preview + np.where(length > PREVIEW_CHARS, "...", ""),
+    })
+
+# --- Streaming frames (memory bounded by the buffer, not the input) ---
+class FrameNumbering:
+    # Keeps Index, Position, Sentence Index and offsets running across consecutive
+    # frames built from consecutive pieces of one text.
+    def __init__(self, extract_type, offsets=False):
+        self.extract_type = extract_type
+        self.offsets = offsets
+        self.rows = 0
+        self.sentences = 0
+
+    def apply(self, df, segments, text_offset):
+        df["Index"] += self.rows
+        if self.extract_type == "word":
+            df["Position"] += self.rows
+            df["Sentence Index"] += self.sentences
+            self.sentences += segments.completed_sentences()
+        if self.offsets:
+            df["Start Offset"] += text_offset
+            df["End Offset"] += text_offset
+        self.rows += len(df)
+        return df
+
+def iter_stream_frames(chunks, extract_type, source, offsets=False, max_carry=STREAM_BUFFER_CHARS):
+    numbering = FrameNumbering(extract_type, offsets)
+    yielded = False
+    for text, text_offset, is_last in stream_pieces(chunks, extract_type, max_carry, source):
+        segments = segment_text(text)
+        df = numbering.apply(build_segment_frame(segments, extract_type, source, offsets), segments, text_offset)
+        # The tail of the file is also yielded when nothing else was, so the columns are always written
+        if len(df) or (is_last and not yielded):
+            yielded = True
+            yield df
+
+def stream_txt(file_path, extract_type, out_paths, chunk_chars=STREAM_BUFFER_CHARS, offsets=False,
+               errors=DEFAULT_ENCODING_ERRORS):
+    frames = iter_stream_frames(iter_txt_chunks(file_path, chunk_chars, errors=errors), extract_type,
+                                os.path.basename(file_path), offsets, chunk_chars)
+    return write_frames(frames, out_paths)
@@ -0,0 +1,203 @@
+import numpy as np
+
+# --- Span-based segmentation ---
+# One scan over the text finds every word, sentence break and paragraph break as
+# (start, end) character offsets; substrings are only cut out when a column needs them.
+# Rules (shared by the terminal and GUI versions):
+#   word      = run of non-whitespace characters (same as str.split())
+#   sentence  = text between runs of spaces that follow . ! or ?
+#   paragraph = text between "\n\n" breaks, skipping blank paragraphs
+# The ASCII separator characters \x1c-\x1f (used between spreadsheet and table cells
+# and rows) end sentences and paragraphs too, and empty units next to them are dropped.
+CELL_SEPARATOR = "\x1f"
+ROW_SEPARATOR = "\x1e"
+# Punctuation stripped from the ends of a word to get its term (word index, word statistics)
+EDGE_PUNCTUATION = "".join(chr(c) for c in range(0x21, 0x7f) if not chr(c).isalnum()) + "“”‘’«»„‚—–…·•"
+_WHITESPACE_TABLE = np.array([chr(c).isspace() for c in range(0x3001)] + [False])
+_SENTENCE_END_CODES = np.array([ord("."), ord("!"), ord("?")])
+
+def _runs(mask):
+    # (starts, ends) of every run of True values; run edges alternate start, end, start, ...
+    padded = np.zeros(len(mask) + 2, dtype=np.bool_)
+    padded[1:-1] = mask
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[0::2], edges[1::2]
+
+def _gaps(break_starts, break_ends, length):
+    # Spans between consecutive breaks, covering the whole text
+    starts = np.concatenate(([0], break_ends)).astype(np.int64)
+    ends = np.concatenate((break_starts, [length])).astype(np.int64)
+    return np.column_stack((starts, ends))
+
+def _merge_breaks(starts_a, ends_a, starts_b, ends_b):
+    starts = np.concatenate((starts_a, starts_b))
+    order = np.argsort(starts, kind="stable")
+    return starts[order], np.concatenate((ends_a, ends_b))[order]
+
+class Segments:
+    def __init__(self, text, words, word_sentence, sentences, paragraphs):
+        self.text = text
+        self.words = words                  # (n, 2) offsets
+        self.word_sentence = word_sentence  # 1-based sentence index of each word
+        self.sentences = sentences          # (n, 2) offsets
+        self.paragraphs = paragraphs        # (n, 2) offsets
+
+    def completed_sentences(self):
+        # Sentences that cannot continue into text appended after this one
+        if self.text and 0x1c <= ord(self.text[-1]) <= 0x1f:
+            return len(self.sentences)
+        return len(self.sentences) - 1
+
+    def spans(self, extract_type):
+        if extract_type == "word":
+            return self.words
+        elif extract_type == "sentence":
+            return self.sentences
+        elif extract_type == "paragraph":
+            return self.paragraphs
+        return np.array([[0, len(self.text)]], dtype=np.int64)
+
+    def texts(self, extract_type, rows=None):
+        # rows: optional slice of units, e.g. slice(0, 50000)
+        if extract_type == "word" and rows is None:
+            # The word spans are exactly str.split()'s pieces, which C can cut faster
+            return self.text.split()
+        spans = self.spans(extract_type)
+        if rows is not None:
+            spans = spans[rows]
+        return list(map(self.text.__getitem__, map(slice, spans[:, 0].tolist(), spans[:, 1].tolist())))
+
+def segment_text(text):
+    length = len(text)
+    if text.isascii():
+        # One byte per character: offsets into the bytes are offsets into the str
+        codes = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+        is_space = _WHITESPACE_TABLE[codes]
+    else:
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        is_space = _WHITESPACE_TABLE[np.minimum(codes, len(_WHITESPACE_TABLE) - 1)]
+
+    word_starts, word_ends = _runs(~is_space)
+    words = np.column_stack((word_starts, word_ends)).astype(np.int64)
+    is_separator = (codes >= 0x1c) & (codes <= 0x1f)
+    separators = np.flatnonzero(is_separator)
+
+    # Sentence breaks: maximal runs of " " directly after . ! or ?
+    run_starts, run_ends = _runs(codes == ord(" "))
+    follows_end = run_starts > 0
+    follows_end[follows_end] = np.isin(codes[run_starts[follows_end] - 1], _SENTENCE_END_CODES)
+    break_starts, break_ends = run_starts[follows_end], run_ends[follows_end]
+    if len(separators):
+        break_starts, break_ends = _merge_breaks(break_starts, break_ends, separators, separators + 1)
+    sentences = _gaps(break_starts, break_ends, length)
+    if len(separators):
+        empty = sentences[:, 0] == sentences[:, 1]
+        at = sentences[empty, 0]
+        touches = (at > 0) & is_separator[np.maximum(at - 1, 0)]
+        touches |= (at < length) & is_separator[np.minimum(at, length - 1)]
+        keep = np.ones(len(sentences), dtype=np.bool_)
+        keep[np.flatnonzero(empty)[touches]] = False
+        sentences = sentences[keep]
+    word_sentence = np.searchsorted(sentences[:, 0], word_starts, side="right")
+
+    # Paragraph breaks: "\n\n" pairs, taken left to right inside each run of newlines
+    nl_starts, nl_ends = _runs(codes == ord("\n"))
+    pairs = (nl_ends - nl_starts) // 2
+    pair_offsets = np.arange(pairs.sum()) - np.repeat(np.cumsum(pairs) - pairs, pairs)
+    break_starts = np.repeat(nl_starts, pairs) + 2 * pair_offsets
+    break_ends = break_starts + 2
+    if len(separators):
+        break_starts, break_ends = _merge_breaks(break_starts, break_ends, separators, separators + 1)
+    paragraphs = _gaps(break_starts, break_ends, length)
+    has_words = (np.searchsorted(word_starts, paragraphs[:, 0])
+                 < np.searchsorted(word_starts, paragraphs[:, 1]))
+    paragraphs = paragraphs[has_words]
+
+    return Segments(text, words, word_sentence.astype(np.int64), sentences, paragraphs)
+
+# --- Process text based on extraction type ---
+def process_text(text, extract_type):
+    segments = segment_text(text)
+    if extract_type == "word":
+        return segments.texts("word"), segments.word_sentence.tolist()
+    elif extract_type in ["sentence", "paragraph"]:
+        return segments.texts(extract_type), None
+    return [text], None
+
+# --- Stream cut points ---
+def stream_cut(buffer, extract_type, start=0):
+    # Returns (prefix_end, carry_start): everything before prefix_end segments exactly as
+    # it would inside the whole file; buffer[carry_start:] is kept for the next chunk.
+    # Only cut points from `start` on are looked for; (0, 0) means none was found.
+    if extract_type == "word":
+        # Keep the last word and anything after it: the word may continue in the next
+        # chunk, and the whitespace after it may still grow into a sentence break
+        cut = len(buffer)
+        while cut > start and buffer[cut - 1].isspace():
+            cut -= 1
+        while cut > start and not buffer[cut - 1].isspace():
+            cut -= 1
+        if cut == start and start and not buffer[start - 1].isspace():
+            return 0, 0     # the word starts before `start`
+        return cut, cut
+    if extract_type == "sentence":
+        # Last sentence break whose run of spaces is known to have ended
+        end = len(buffer)
+        while True:
+            mark = max(buffer.rfind(". ", start, end), buffer.rfind("! ", start, end), buffer.rfind("? ", start, end))
+            if mark < 0:
+                return 0, 0
+            run_end = mark + 1
+            while run_end < len(buffer) and buffer[run_end] == " ":
+                run_end += 1
+            if run_end < len(buffer):
+                return mark + 1, run_end
+            end = mark + 1
+    if extract_type == "paragraph":
+        # Last "\n\n" pair, counting pairs from the start of its run of newlines
+        mark = buffer.rfind("\n\n", start)
+        if mark < 0:
+            return 0, 0
+        run_start = mark
+        while run_start and buffer[run_start - 1] == "\n":
+            run_start -= 1
+        pair_start = run_start + 2 * ((mark + 2 - run_start) // 2 - 1)
+        return pair_start, pair_start + 2
+    return 0, 0
+
+def forced_cut(buffer, max_carry):
+    # Cut point that leaves at most max_carry characters to carry: after the last line
+    # break, else after the last space or tab, else nothing is carried
+    window = max(0, len(buffer) - max_carry)
+    for mark in ("\n", " ", "\t"):
+        found = buffer.rfind(mark, window)
+        if found >= 0:
+            return found + 1
+    return len(buffer)
+
+def stream_pieces(chunks, extract_type, max_carry, source="text"):
+    # Joins chunks into pieces that segment exactly as the whole text would, and yields
+    # (piece, offset of the piece in the whole text, is_last); the last piece may be "".
+    # Text with no break of this type (e.g. a log without blank lines in paragraph mode)
+    # is not carried past max_carry characters: it is cut at a line break (or space)
+    # instead, with a warning, so memory stays bounded.
+    carry = ""
+    offset = 0          # character offset of carry[0] in the whole text
+    warned = False
+    for chunk in chunks:
+        # Cut points inside the carry were looked for already; only the end of its last
+        # sentence break (trailing spaces) and a break straddling the join can be new
+        start = max(0, len(carry.rstrip()) - 1)
+        buffer = carry + chunk
+        prefix_end, carry_start = stream_cut(buffer, extract_type, start)
+        if len(buffer) - carry_start > max_carry:
+            prefix_end = carry_start = forced_cut(buffer, max_carry)
+            if not warned:
+                warned = True
+                print(f"⚠️ {source}: no {extract_type} break within {max_carry:,} characters; "
+                      f"cutting at line breaks instead")
+        if prefix_end:
+            yield buffer[:prefix_end], offset, False
+        carry = buffer[carry_start:]
+        offset += carry_start
+    yield carry, offset, True
@@ -0,0 +1,618 @@
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import signal
+import socket
+import threading
+import socketserver
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib import import_module
+from urllib.parse import parse_qs, urlsplit
+from .cache import ExtractionCache
+from .metrics import NO_METRICS, RunMetrics
+from .registry import EXTRACTORS, URL_EXTRACTOR, is_supported
+from .text_extractor import DEFAULT_ENCODING_ERRORS, STREAM_BUFFER_CHARS
+
+# --- Extraction server ---
+# Keeps the extractors resident: a pool of worker processes that have already imported
+# pandas, NumPy and every parser backend, behind a small local HTTP API.
+#
+#   POST   /jobs                  submit: a raw file upload (?name=report.pdf), or JSON
+#                                 {"text": ...} / {"url": ...} / {"path": ...}
+#                                 -> 202 {"id", "status", ...}; 503 + Retry-After when the queue is full
+#   GET    /jobs/<id>[?wait=S]    status (optionally waiting up to S seconds for the job to finish)
+#   GET    /jobs/<id>/result      the result file, streamed (?format= picks one of several)
+#   DELETE /jobs/<id>             forget a job and delete its files
+#   GET    /health                pool, queue and throughput counters
+#
+# Options (query string, or fields of the JSON body): type, format, offsets, pages,
+# docx_extras, ngrams, casefold, stopwords, top. Jobs wait in a bounded queue in this
+# process and are handed to the pool only when a worker is free, so a full server
+# answers 503 straight away instead of buffering work without limit.
+SERVER_PORT = 8750
+SERVER_QUEUE = 64             # jobs waiting for a worker before submissions get 503
+JOB_TTL_SECONDS = 3600        # finished jobs (and their files) are dropped after this long
+MAX_UPLOAD_MB = 512
+MAX_WAIT_SECONDS = 300        # longest ?wait= a status request may block
+COPY_CHUNK = 1024 * 1024
+EXTRACT_TYPES = ("word", "sentence", "paragraph", "wordfreq")
+FINISHED = ("done", "error")
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "csv.gz": "application/gzip",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+class RequestError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+# --- Worker side ---
+def warm_worker():
+    # Pool initializer: import everything a job can need once, before the first job
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    for module in ["extractor_core.batch", "extractor_core.wordfreq"] + sorted(
+            {entry[0] for entry in EXTRACTORS.values()} | {URL_EXTRACTOR[0]}):
+        try:
+            import_module(module)
+        except ImportError:
+            pass  # an optional backend that is not installed
+
+def _ping():
+    return os.getpid()
+
+def run_file_job(file_path, extract_type, folder, options):
+    from .batch import batch_worker
+    from .wordfreq import write_wordfreq
+    summary, records, slowest, _, counters = batch_worker(file_path, extract_type, folder, options)
+    if counters and summary["Status"] == "ok":
+        summary["Items"], out_paths = write_wordfreq(counters[0], folder, options["formats"], options["top"])
+        summary["Output"] = "; ".join(out_paths)
+    return summary, records, slowest
+
+def run_url_job(url, extract_type, folder, options):
+    from .batch import write_url_result
+    from .url_extractor import get_page
+    from .wordfreq import TermCounter, write_wordfreq
+    metrics = RunMetrics(profile=options["profile"], front_end="server") if options["metrics"] else NO_METRICS
+    summary = {"Source": url, "Status": "ok", "HTTP": "", "Items": 0, "Output": "", "Cache": "", "Error": ""}
+    started = time.perf_counter()
+    try:
+        cache = ExtractionCache(**options["cache"]) if options["cache"] is not None else None
+        with metrics.stage("fetch", url) as stage:
+            page = get_page(url, cache)
+            stage.chars = len(page["text"] or "")
+            stage.info.update(http=page["status"], cache=page["cache"])
+        summary["HTTP"], summary["Cache"] = page["status"], page["cache"] or ""
+        if page["status"] != 200:
+            raise ValueError(f"HTTP {page['status']}")
+        if extract_type == "wordfreq":
+            counter = TermCounter(**options["wordfreq"])
+            counter.add_text(page["text"])
+            summary["Items"], out_paths = write_wordfreq(counter, folder, options["formats"], options["top"])
+            summary["Output"] = "; ".join(out_paths)
+        else:
+            summary["Items"], summary["Output"] = write_url_result(url, page, extract_type, folder, options["offsets"],
+                                                                   options["formats"], metrics)
+    except Exception as e:
+        summary["Status"] = "error"
+        summary["Error"] = str(e)
+    summary["Seconds"] = round(time.perf_counter() - started, 3)
+    return summary, getattr(metrics, "records", []), getattr(metrics, "slowest", None)
+
+# --- Jobs ---
+class Job:
+    __slots__ = ("id", "kind", "source", "type", "formats", "folder", "status", "created", "started",
+                 "finished", "items", "outputs", "error")
+
+    def __init__(self, kind, source, extract_type, formats, folder):
+        self.id = uuid.uuid4().hex[:16]
+        self.kind = kind            # file, text or url
+        self.source = source
+        self.type = extract_type
+        self.formats = formats
+        self.folder = folder
+        self.status = "queued"
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.items = None
+        self.outputs = []
+        self.error = None
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "kind": self.kind,
+            "source": self.source,
+            "type": self.type,
+            "formats": self.formats,
+            "items": self.items,
+            "error": self.error,
+            "queued_s": round((self.started or time.time()) - self.created, 3),
+            "seconds": round(self.finished - self.started, 3) if self.finished and self.started else None,
+            "status_url": f"/jobs/{self.id}",
+            "result_url": f"/jobs/{self.id}/result",
+        }
+
+class ExtractionService:
+    def __init__(self, jobs_dir, workers=None, queue_size=SERVER_QUEUE, cache_options=None, job_ttl=JOB_TTL_SECONDS,
+                 allow_paths=False, metrics=NO_METRICS):
+        self.jobs_dir = os.path.abspath(jobs_dir)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.queue_size = queue_size
+        self.cache_options = cache_options
+        self.job_ttl = job_ttl
+        self.allow_paths = allow_paths
+        self.metrics = metrics
+        self.jobs = {}
+        self.queue = deque()
+        self.running = 0
+        self.counters = {"submitted": 0, "done": 0, "failed": 0, "rejected": 0}
+        self.started = time.time()
+        self.cond = threading.Condition()
+        self.pool = None
+        self._stop = threading.Event()
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        if cache_options is not None:
+            ExtractionCache(**cache_options)  # create the folders once before workers race for them
+
+    # --- Pool ---
+    def start(self):
+        # This process only parses options and streams files; import what that needs up front
+        import_module("extractor_core.wordfreq")
+        import_module("extractor_core.writers")
+        self.pool = self._new_pool()
+        threading.Thread(target=self._expire_loop, name="job-expiry", daemon=True).start()
+
+    def _new_pool(self):
+        # Starts every worker now (one ping each) so the first jobs don't pay for imports
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_worker)
+        for future in [pool.submit(_ping) for _ in range(self.workers)]:
+            future.result()
+        return pool
+
+    def close(self):
+        self._stop.set()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    # --- Submitting ---
+    def job_options(self, params):
+        from .wordfreq import MAX_TERMS, load_stopwords, parse_ngram_sizes
+        from .writers import parse_formats
+        try:
+            formats = parse_formats(params.get("format") or "csv")
+            ngrams = parse_ngram_sizes(params.get("ngrams") or "1")
+            top = int(params["top"]) if params.get("top") else None
+        except ValueError as e:
+            raise RequestError(HTTPStatus.BAD_REQUEST, str(e))
+        stopwords = params.get("stopwords")
+        if stopwords not in (None, "", "english"):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "stopwords: only 'english' is available on the server")
+        return {
+            "pdf_pages": params.get("pages") or None,
+            "pdf_workers": 1,
+            "docx_extras": _flag(params.get("docx_extras")),
+            "encoding_errors": DEFAULT_ENCODING_ERRORS,
+            "cache": self.cache_options,
+            "offsets": _flag(params.get("offsets")),
+            "stream_chars": STREAM_BUFFER_CHARS,
+            "provenance": False,
+            "formats": formats,
+            "metrics": self.metrics.enabled,
+            "profile": self.metrics.enabled and self.metrics.profile,
+            "stable_names": True,
+            "index": False,
+            "wordfreq": {"sizes": ngrams, "casefold": _flag(params.get("casefold")),
+                         "stopwords": load_stopwords(stopwords), "max_terms": MAX_TERMS},
+            "top": top,
+            "dedup": None,
+        }
+
+    def new_job(self, kind, source, params):
+        extract_type = (params.get("type") or "sentence").lower()
+        if extract_type not in EXTRACT_TYPES:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"type must be one of: {', '.join(EXTRACT_TYPES)}")
+        options = self.job_options(params)
+        self.check_capacity()
+        job = Job(kind, source, extract_type, options["formats"], None)
+        job.folder = os.path.join(self.jobs_dir, job.id)
+        os.makedirs(os.path.join(job.folder, "in"))
+        return job, options
+
+    def check_capacity(self):
+        with self.cond:
+            if len(self.queue) >= self.queue_size:
+                self.counters["rejected"] += 1
+                # A rough guess at when a slot frees up: one queue's worth of the average job
+                retry = max(1, round(self.average_seconds() * len(self.queue) / self.workers))
+                raise RequestError(HTTPStatus.SERVICE_UNAVAILABLE, "The job queue is full, try again later",
+                                   {"Retry-After": str(retry)})
+
+    def submit(self, job, func, args):
+        with self.cond:
+            if len(self.queue) >= self.queue_size:  # filled up while the upload was read
+                self.counters["rejected"] += 1
+                shutil.rmtree(job.folder, ignore_errors=True)
+                raise RequestError(HTTPStatus.SERVICE_UNAVAILABLE, "The job queue is full, try again later",
+                                   {"Retry-After": "1"})
+            self.jobs[job.id] = job
+            self.queue.append((job, func, args))
+            self.counters["submitted"] += 1
+            self._dispatch()
+        return job
+
+    def _dispatch(self):
+        # Called with the lock held: hands queued jobs to free workers
+        while self.queue and self.running < self.workers:
+            job, func, args = self.queue.popleft()
+            job.status = "running"
+            job.started = time.time()
+            self.running += 1
+            try:
+                future = self.pool.submit(func, *args)
+            except BrokenProcessPool:
+                broken, self.pool = self.pool, self._new_pool()
+                broken.shutdown(wait=False)
+                future = self.pool.submit(func, *args)
+            future.add_done_callback(lambda future, job=job, pool=self.pool: self._finish(job, future, pool))
+
+    def _finish(self, job, future, pool):
+        records, slowest = [], None
+        try:
+            summary, records, slowest = future.result()
+            if summary["Status"] == "ok":
+                job.status, job.items = "done", summary["Items"]
+                job.outputs = [path for path in summary["Output"].split("; ") if path]
+            else:
+                job.status, job.error = "error", summary["Error"]
+        except BrokenProcessPool:
+            job.status, job.error = "error", "The worker process died (out of memory or killed)"
+        except Exception as e:
+            job.status, job.error = "error", str(e) or type(e).__name__
+        for record in records:
+            self.metrics.add(dict(record, run=self.metrics.run_id, front_end=self.metrics.front_end, job=job.id))
+        if slowest is not None:
+            self.metrics.add_profile(*slowest)
+        with self.cond:
+            job.finished = time.time()
+            self.running -= 1
+            self.counters["done" if job.status == "done" else "failed"] += 1
+            # Every job of a broken pool fails; the first to report replaces the pool
+            if isinstance(future.exception(), BrokenProcessPool) and self.pool is pool and not self._stop.is_set():
+                self.pool = self._new_pool()
+                pool.shutdown(wait=False)
+            self._dispatch()
+            self.cond.notify_all()
+
+    # --- Reading ---
+    def get(self, job_id):
+        with self.cond:
+            job = self.jobs.get(job_id)
+        if job is None:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No job {job_id}")
+        return job
+
+    def wait(self, job, seconds):
+        with self.cond:
+            self.cond.wait_for(lambda: job.status in FINISHED, timeout=min(seconds, MAX_WAIT_SECONDS))
+        return job
+
+    def remove(self, job_id):
+        job = self.get(job_id)
+        with self.cond:
+            if job.status not in FINISHED:
+                raise RequestError(HTTPStatus.CONFLICT, f"Job {job_id} is still {job.status}")
+            self.jobs.pop(job_id, None)
+        shutil.rmtree(job.folder, ignore_errors=True)
+
+    def average_seconds(self):
+        with self.cond:
+            finished = [job.finished - job.started for job in self.jobs.values() if job.finished and job.started]
+        return sum(finished) / len(finished) if finished else 1.0
+
+    def health(self):
+        with self.cond:
+            uptime = time.time() - self.started
+            finished = self.counters["done"] + self.counters["failed"]
+            return {
+                "status": "ok",
+                "workers": self.workers,
+                "running": self.running,
+                "queued": len(self.queue),
+                "queue_size": self.queue_size,
+                "jobs": len(self.jobs),
+                **self.counters,
+                "uptime_s": round(uptime, 1),
+                "jobs_per_s": round(finished / uptime, 3) if uptime else 0.0,
+            }
+
+    def _expire_loop(self):
+        while not self._stop.wait(min(60, self.job_ttl)):
+            cutoff = time.time() - self.job_ttl
+            with self.cond:
+                expired = [job for job in self.jobs.values() if job.finished and job.finished < cutoff]
+                for job in expired:
+                    del self.jobs[job.id]
+            for job in expired:
+                shutil.rmtree(job.folder, ignore_errors=True)
+
+def _flag(value):
+    return value is True or str(value).lower() in ("1", "true", "yes", "on")
+
+def _seconds(name, value):
+    # A non-negative number of seconds from a query parameter
+    try:
+        seconds = float(value)
+    except ValueError:
+        seconds = None
+    if seconds is None or not seconds >= 0:     # also rejects nan
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"{name} must be a number of seconds, not {value!r}")
+    return seconds
+
+def _safe_name(name):
+    name = os.path.basename(name.replace("\\", "/"))
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", name).lstrip(".") or "upload"
+
+# --- HTTP ---
+class ExtractionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"     # keep-alive, so a client reuses its connection
+    disable_nagle_algorithm = True    # headers and body are separate writes; don't wait for delayed ACKs
+    server_version = "DataExtractionServer/1.0"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self._handle(self._get)
+
+    def do_POST(self):
+        self._handle(self._post)
+
+    def do_DELETE(self):
+        self._handle(self._delete)
+
+    def _handle(self, route):
+        url = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+        try:
+            route(parts, params)
+        except RequestError as e:
+            self._error_close()
+            self._send_json(e.status, {"error": str(e)}, e.headers)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+        except Exception as e:
+            self._error_close()
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e) or type(e).__name__})
+
+    # --- Routes ---
+    def _get(self, parts, params):
+        if parts == ["health"]:
+            return self._send_json(HTTPStatus.OK, self.service.health())
+        if parts == ["jobs"]:
+            with self.service.cond:
+                jobs = [job.to_dict() for job in self.service.jobs.values()]
+            return self._send_json(HTTPStatus.OK, {"jobs": jobs})
+        if len(parts) == 2 and parts[0] == "jobs":
+            job = self.service.get(parts[1])
+            if params.get("wait"):
+                job = self.service.wait(job, _seconds("wait", params["wait"]))
+            return self._send_json(HTTPStatus.OK, job.to_dict())
+        if len(parts) == 3 and parts[0] == "jobs" and parts[2] == "result":
+            return self._send_result(self.service.get(parts[1]), params.get("format"))
+        raise RequestError(HTTPStatus.NOT_FOUND, f"No route for GET {self.path}")
+
+    def _post(self, parts, params):
+        if parts != ["jobs"]:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No route for POST {self.path}")
+        length = self._content_length()
+        if length > self.server.max_upload:
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                               f"Request bodies are limited to {self.server.max_upload // (1024 * 1024)} MB")
+        if self.headers.get("Content-Type", "").split(";")[0].strip() == "application/json":
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                raise RequestError(HTTPStatus.BAD_REQUEST, "The body is not valid JSON")
+            if not isinstance(body, dict):
+                raise RequestError(HTTPStatus.BAD_REQUEST, "The JSON body must be an object")
+            params.update({key: value for key, value in body.items() if key not in ("text", "url", "path")})
+            job = self._json_job(body, params)
+        else:
+            job = self._upload_job(length, params)
+        self._send_json(HTTPStatus.ACCEPTED, job.to_dict(), {"Location": f"/jobs/{job.id}"})
+
+    def _json_job(self, body, params):
+        service = self.service
+        if "text" in body:
+            job, options = service.new_job("text", params.get("name") or "text", params)
+            path = os.path.join(job.folder, "in", _safe_name(os.path.splitext(job.source)[0]) + ".txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(str(body["text"]))
+            return service.submit(job, run_file_job, (path, job.type, job.folder, options))
+        if "url" in body:
+            url = str(body["url"])
+            if not url.lower().startswith(("http://", "https://")):
+                raise RequestError(HTTPStatus.BAD_REQUEST, "url must start with http:// or https://")
+            job, options = service.new_job("url", url, params)
+            return service.submit(job, run_url_job, (url, job.type, job.folder, options))
+        if "path" in body:
+            if not service.allow_paths:
+                raise RequestError(HTTPStatus.FORBIDDEN, "Reading server-side paths is off (start with --allow-paths)")
+            path = os.path.abspath(str(body["path"]))
+            if not os.path.isfile(path):
+                raise RequestError(HTTPStatus.NOT_FOUND, f"File not found: {path}")
+            if not is_supported(path):
+                raise RequestError(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, f"Unsupported file type: {path}")
+            job, options = service.new_job("file", path, params)
+            return service.submit(job, run_file_job, (path, job.type, job.folder, options))
+        raise RequestError(HTTPStatus.BAD_REQUEST, "The JSON body needs one of: text, url, path")
+
+    def _upload_job(self, length, params):
+        name = _safe_name(params.get("name") or self.headers.get("X-File-Name") or "")
+        if not is_supported(name):
+            raise RequestError(HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+                               "Name the upload with ?name=<file name> and a supported extension")
+        job, options = self.service.new_job("file", name, params)
+        path = os.path.join(job.folder, "in", name)
+        # Streamed to disk, never held in memory
+        with open(path, "wb") as f:
+            remaining = length
+            while remaining:
+                chunk = self.rfile.read(min(COPY_CHUNK, remaining))
+                if not chunk:
+                    shutil.rmtree(job.folder, ignore_errors=True)
+                    raise RequestError(HTTPStatus.BAD_REQUEST, "The upload ended early")
+                f.write(chunk)
+                remaining -= len(chunk)
+        return self.service.submit(job, run_file_job, (path, job.type, job.folder, options))
+
+    def _delete(self, parts, params):
+        if len(parts) != 2 or parts[0] != "jobs":
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No route for DELETE {self.path}")
+        self.service.remove(parts[1])
+        self._send_json(HTTPStatus.OK, {"id": parts[1], "deleted": True})
+
+    # --- Responses ---
+    def _send_result(self, job, fmt):
+        if job.status == "error":
+            raise RequestError(HTTPStatus.UNPROCESSABLE_ENTITY, f"Job {job.id} failed: {job.error}")
+        if job.status != "done":
+            raise RequestError(HTTPStatus.CONFLICT, f"Job {job.id} is still {job.status}",
+                               {"Retry-After": str(max(1, round(self.service.average_seconds())))})
+        from .writers import format_for_path
+        outputs = [(format_for_path(path), path) for path in job.outputs]
+        chosen = [item for item in outputs if fmt is None or item[0] == fmt.lower().lstrip(".")]
+        if not chosen:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"Job {job.id} has no {fmt} result "
+                                                     f"(available: {', '.join(f for f, _ in outputs)})")
+        fmt, path = chosen[0]
+        size = os.path.getsize(path)
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", CONTENT_TYPES.get(fmt, "application/octet-stream"))
+        self.send_header("Content-Length", str(size))
+        self.send_header("Content-Disposition", f'attachment; filename="{os.path.basename(path)}"')
+        self.end_headers()
+        with open(path, "rb") as f:
+            shutil.copyfileobj(f, self.wfile, COPY_CHUNK)
+
+    def _send_json(self, status, data, headers=None):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _content_length(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            raise RequestError(HTTPStatus.LENGTH_REQUIRED, "Send a Content-Length; chunked uploads are not supported")
+        try:
+            return int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+
+    def _error_close(self):
+        # A POST refused before its body was read would leave the body in the connection
+        if self.command == "POST":
+            self.close_connection = True
+
+class UnixExtractionHandler(ExtractionHandler):
+    disable_nagle_algorithm = False   # not a TCP socket
+
+class ExtractionHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+class UnixExtractionServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("unix", 0)     # the handler logs client_address[0]
+
+def make_server(service, host="127.0.0.1", port=SERVER_PORT, unix_socket=None, max_upload=MAX_UPLOAD_MB * 1024 * 1024,
+                verbose=False):
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        server = UnixExtractionServer(unix_socket, UnixExtractionHandler)
+    else:
+        server = ExtractionHTTPServer((host, port), ExtractionHandler)
+    server.service = service
+    server.max_upload = max_upload
+    server.verbose = verbose
+    return server
+
+# --- Command line: serve ---
+def run_server(args, metrics=NO_METRICS):
+    cache_options = None
+    if not args.no_cache:
+        cache_options = {"folder": args.cache_dir, "max_bytes": int(args.cache_size * 1024 * 1024)}
+    service = ExtractionService(args.jobs_dir, args.workers, args.queue_size, cache_options, args.job_ttl,
+                                args.allow_paths, metrics)
+    started = time.perf_counter()
+    service.start()
+    try:
+        server = make_server(service, args.host, args.port, args.socket, int(args.max_upload * 1024 * 1024),
+                             args.verbose)
+    except OSError as e:
+        service.close()
+        print(f"❌ Could not listen on {args.socket or f'{args.host}:{args.port}'}: {e}")
+        return 1
+    where = f"unix:{args.socket}" if args.socket else f"http://{args.host}:{server.server_address[1]}"
+    print(f"✅ {service.workers} warm worker(s) ready in {time.perf_counter() - started:.1f}s; "
+          f"queue holds {service.queue_size} job(s)")
+    print(f"✅ Serving on {where} (Ctrl+C to stop)")
+    # SIGTERM stops the server like Ctrl+C, so the worker processes are shut down too
+    signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        server.serve_forever(poll_interval=0.5)
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped.")
+    finally:
+        server.server_close()
+        service.close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+    return 0
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+def unix_connection(path, timeout=None):
+    # An http.client connection over a Unix socket, for clients of --socket servers
+    import http.client
+
+    class UnixHTTPConnection(http.client.HTTPConnection):
+        def connect(self):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            if self.timeout is not None:
+                self.sock.settimeout(self.timeout)
+            self.sock.connect(path)
+
+    return UnixHTTPConnection("localhost", timeout=timeout)
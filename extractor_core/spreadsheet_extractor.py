@@ -0,0 +1,97 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from .segment import CELL_SEPARATOR, ROW_SEPARATOR, segment_text
+from .results import FrameNumbering, build_segment_frame, constant_category
+
+# --- Spreadsheet rows ---
+# Rows are streamed (chunked read_csv, openpyxl read-only mode) and written as cell text
+# joined by ASCII separators, which segmentation treats as hard boundaries, so no unit
+# ever spans two cells. Every chunk ends at a row boundary.
+SPREADSHEET_CHUNK_ROWS = 5000
+SPREADSHEET_EXTENSIONS = [".csv", ".xls", ".xlsx"]
+_SEPARATOR_CLEANUP = str.maketrans({"\x1c": " ", "\x1d": " ", "\x1e": " ", "\x1f": " "})
+
+def _cell_text(value):
+    if value is None:
+        return ""
+    return str(value).translate(_SEPARATOR_CLEANUP)
+
+def _rows_text(rows):
+    return "".join(CELL_SEPARATOR.join(map(_cell_text, row)) + ROW_SEPARATOR for row in rows)
+
+def _chunked_rows(rows, chunk_rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == chunk_rows:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def iter_spreadsheet_chunks(file_path, chunk_rows=SPREADSHEET_CHUNK_ROWS):
+    # Yields (sheet name, first row number, text of up to chunk_rows rows); rows are
+    # numbered from 1 as a spreadsheet program shows them, header row included.
+    ext = os.path.splitext(file_path)[-1].lower()
+    if ext == ".csv":
+        first_row = 1
+        reader = pd.read_csv(file_path, header=None, dtype=str, keep_default_na=False, chunksize=chunk_rows)
+        with reader:
+            for chunk in reader:
+                rows = chunk.to_numpy().tolist()
+                yield "", first_row, _rows_text(rows)
+                first_row += len(rows)
+    elif ext == ".xlsx":
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            for sheet in workbook.worksheets:
+                first_row = 1
+                for rows in _chunked_rows(sheet.iter_rows(values_only=True), chunk_rows):
+                    yield sheet.title, first_row, _rows_text(rows)
+                    first_row += len(rows)
+        finally:
+            workbook.close()
+    else:
+        # Legacy .xls has no streaming reader; parse one sheet at a time and drop it
+        # before the next, so only the largest sheet is held as a frame
+        with pd.ExcelFile(file_path) as xls:
+            for name in xls.sheet_names:
+                rows = xls.parse(name, header=None, dtype=str).fillna("").to_numpy().tolist()
+                for start in range(0, len(rows), chunk_rows):
+                    yield name, start + 1, _rows_text(rows[start:start + chunk_rows])
+                del rows
+
+# --- Spreadsheet extraction ---
+def extract_from_csv(file_path):
+    return "".join(text for _, _, text in iter_spreadsheet_chunks(file_path))
+
+def extract_from_excel(file_path):
+    return "".join(text for _, _, text in iter_spreadsheet_chunks(file_path))
+
+def iter_spreadsheet_frames(file_path, extract_type, provenance=False, offsets=False,
+                            chunk_rows=SPREADSHEET_CHUNK_ROWS):
+    # Same rows as segmenting extract_from_csv/extract_from_excel's text, produced one
+    # chunk of spreadsheet rows at a time; provenance adds Sheet / Row / Column.
+    source = os.path.basename(file_path)
+    numbering = FrameNumbering(extract_type, offsets)
+    text_offset = 0
+    yielded = False
+    for sheet, first_row, text in iter_spreadsheet_chunks(file_path, chunk_rows):
+        segments = segment_text(text)
+        df = numbering.apply(build_segment_frame(segments, extract_type, source, offsets), segments, text_offset)
+        if provenance:
+            starts = segments.spans(extract_type)[:, 0]
+            row_ends = np.array([m.start() for m in re.finditer(ROW_SEPARATOR, text)], dtype=np.int64)
+            cell_ends = np.array([m.start() for m in re.finditer(CELL_SEPARATOR, text)], dtype=np.int64)
+            row = np.searchsorted(row_ends, starts)
+            row_starts = np.concatenate(([0], row_ends + 1))[row]
+            df["Sheet"] = constant_category(sheet, len(df))
+            df["Row"] = first_row + row
+            df["Column"] = np.searchsorted(cell_ends, starts) - np.searchsorted(cell_ends, row_starts) + 1
+        text_offset += len(text)
+        if len(df) or not yielded:
+            yielded = True
+            yield df
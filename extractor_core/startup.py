@@ -0,0 +1,78 @@
+"""Startup import check.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter for each
+front end (data_extractor and data_extractor_gui) and reports the slowest imports.
+With ``--budget`` it exits non-zero when the total import time of either exceeds the
+budget or when a heavy dependency is imported eagerly:
+
+    python -m extractor_core.startup --budget 300
+"""
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+# Modules that must only be loaded once a file is actually extracted or displayed
+HEAVY_MODULES = ("pandas", "numpy", "pdfplumber", "docx", "lxml", "requests", "openpyxl", "tabulate")
+STARTUP_BUDGET_MS = 300
+FRONT_ENDS = ("data_extractor", "data_extractor_gui")
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def measure_imports(module="data_extractor"):
+    """Return [(name, self_us, cumulative_us, depth)] for importing `module`."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=root, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr}")
+    imports = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            depth = (len(indent) - 1) // 2
+            if depth == 0 and name != module:
+                imports = []  # interpreter startup (site and friends), not ours
+                continue
+            imports.append((name, int(self_us), int(cumulative_us), depth))
+            if depth == 0:
+                break
+    return imports
+
+def check_startup(imports, module="data_extractor", budget_ms=STARTUP_BUDGET_MS):
+    """Return (total_ms, problems) for the output of measure_imports(module)."""
+    total_ms = sum(cumulative for name, _, cumulative, depth in imports
+                   if depth == 0 and name == module) / 1000
+    problems = [f"{name} is imported at startup" for name, _, _, _ in imports
+                if name in HEAVY_MODULES]
+    if budget_ms is not None and total_ms > budget_ms:
+        problems.append(f"startup imports took {total_ms:.0f} ms (budget {budget_ms} ms)")
+    return total_ms, problems
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the startup imports of the front ends")
+    parser.add_argument("--budget", type=float, nargs="?", const=STARTUP_BUDGET_MS, default=None,
+                        help=f"Fail above this many milliseconds (default when given: {STARTUP_BUDGET_MS})")
+    parser.add_argument("--module", default=None,
+                        help=f"Module to import (default: each of {', '.join(FRONT_ENDS)})")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to list (default: 10)")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in [args.module] if args.module else FRONT_ENDS:
+        print(f"==== import {module} ====")
+        imports = measure_imports(module)
+        for name, _, cumulative, _ in sorted(imports, key=lambda item: item[2], reverse=True)[:args.top]:
+            print(f"{cumulative / 1000:8.1f} ms  {name}")
+
+        total_ms, problems = check_startup(imports, module, args.budget)
+        print(f"Total: {total_ms:.1f} ms")
+        for problem in problems:
+            print(f"❌ {module}: {problem}")
+        failed = failed or bool(problems)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
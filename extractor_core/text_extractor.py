@@ -0,0 +1,115 @@
+import io
+import os
+import mmap
+import codecs
+
+# --- TXT extraction ---
+# Files are memory-mapped and decoded straight out of the mapping, so the bytes are
+# never read into a buffer first. The encoding comes from a byte order mark, else
+# from a sample of the file (its start plus blocks spread over the rest): UTF-16
+# without a BOM shows as NUL bytes in every other position, valid UTF-8 is UTF-8,
+# and anything else is a legacy 8-bit file (windows-1252, or Latin-1 when a byte is
+# undefined in windows-1252). ASCII is read as UTF-8: CPython's UTF-8 decoder copies
+# ASCII runs a machine word at a time into a one-byte-per-character string, as fast as
+# the ASCII codec. Newlines are translated like text mode ("\r\n" and "\r" -> "\n").
+STREAM_BUFFER_CHARS = 8 * 1024 * 1024
+ENCODING_ERRORS = ("strict", "replace", "ignore")
+DEFAULT_ENCODING_ERRORS = "replace"    # undecodable bytes become U+FFFD instead of failing the file
+CAN_RELEASE_PAGES = hasattr(mmap, "MADV_DONTNEED")
+SAMPLE_BLOCKS = 16
+SAMPLE_BLOCK_BYTES = 64 * 1024
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"), (codecs.BOM_UTF32_BE, "utf-32-be"),   # before UTF-16: same first bytes
+    (codecs.BOM_UTF8, "utf-8"), (codecs.BOM_UTF16_LE, "utf-16-le"), (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+def _sample(data):
+    # The start of the file plus SAMPLE_BLOCKS - 1 blocks spread evenly over the rest
+    size = len(data)
+    if size <= SAMPLE_BLOCKS * SAMPLE_BLOCK_BYTES:
+        return [data[:]]
+    step = (size - SAMPLE_BLOCK_BYTES) // (SAMPLE_BLOCKS - 1)
+    return [data[i * step:i * step + SAMPLE_BLOCK_BYTES] for i in range(SAMPLE_BLOCKS)]
+
+def _is_utf8(block, first):
+    # A block cut out of the middle of the file may start and end inside a character
+    if not first:
+        block = block[next((i for i, b in enumerate(block[:4]) if b & 0xC0 != 0x80), 0):]
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(block)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+def sniff_text_encoding(data):
+    # Returns (encoding, bom_length) for the bytes of a whole file
+    for bom, encoding in _BOMS:
+        if data[:len(bom)] == bom:
+            return encoding, len(bom)
+    blocks = _sample(data)
+    # Before the ASCII check: UTF-16 of Latin text is all ASCII bytes, NULs included
+    head = blocks[0][:4096]
+    if len(head) >= 2:
+        even, odd = head[0::2].count(0), head[1::2].count(0)
+        if odd > len(head) // 4 and even < odd // 8:
+            return "utf-16-le", 0
+        if even > len(head) // 4 and odd < even // 8:
+            return "utf-16-be", 0
+    if all(map(bytes.isascii, blocks)):
+        return "utf-8", 0
+    if all(_is_utf8(block, i == 0) for i, block in enumerate(blocks)):
+        return "utf-8", 0
+    try:
+        for block in blocks:
+            block.decode("cp1252")
+        return "cp1252", 0
+    except UnicodeDecodeError:
+        return "latin-1", 0
+
+def _translate_newlines(text):
+    if "\r" in text:
+        text = text.replace("\r\n", "\n")
+        if "\r" in text:
+            text = text.replace("\r", "\n")
+    return text
+
+def read_txt(file_path, encoding=None, errors=DEFAULT_ENCODING_ERRORS):
+    # Returns (text, encoding used)
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return "", encoding or "utf-8"
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            bom = 0
+            if encoding is None:
+                encoding, bom = sniff_text_encoding(data)
+            # Decoded from the mapping through a buffer view: no bytes copy of the file
+            with memoryview(data) as view, view[bom:] as body:
+                text = str(body, encoding, errors)
+    return _translate_newlines(text), encoding
+
+def iter_txt_chunks(file_path, chunk_chars=STREAM_BUFFER_CHARS, encoding=None, errors=DEFAULT_ENCODING_ERRORS):
+    # Decodes chunk_chars bytes of the mapping at a time (so at most chunk_chars
+    # characters); characters and "\r\n" split between chunks are joined by the decoders.
+    # Pages already decoded are dropped from the mapping, so resident memory stays at
+    # about one chunk instead of growing to the size of the file.
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            bom = 0
+            if encoding is None:
+                encoding, bom = sniff_text_encoding(data)
+            decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(errors), translate=True)
+            for start in range(bom, len(data), chunk_chars):
+                chunk = decoder.decode(data[start:start + chunk_chars])
+                if CAN_RELEASE_PAGES:
+                    done = min(start + chunk_chars, len(data))
+                    data.madvise(mmap.MADV_DONTNEED, 0, done - done % mmap.PAGESIZE)
+                if chunk:
+                    yield chunk
+            chunk = decoder.decode(b"", final=True)
+            if chunk:
+                yield chunk
+
+def extract_from_txt(file_path, errors=DEFAULT_ENCODING_ERRORS):
+    return read_txt(file_path, errors=errors)[0]
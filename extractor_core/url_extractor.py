@@ -0,0 +1,160 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from .html_extractor import HTML_CHUNK_BYTES, parse_html
+
+# --- URL extraction ---
+URL_TIMEOUT = (5, 30)     # seconds to connect, seconds between bytes of the response
+URL_WORKERS = 16          # pages fetched at the same time
+URL_PER_HOST = 4          # ...of which at most this many from one host
+USER_AGENT = "DataExtractionTool/1.0"
+
+def make_session(pool_size=URL_WORKERS):
+    # One session for the whole run: keep-alive connections are reused per host
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+def declared_encoding(response):
+    # requests assumes ISO-8859-1 for any text/* response without a charset; only a
+    # charset the server actually sent overrides the one sniffed from the page
+    if "charset" in response.headers.get("Content-Type", "").lower():
+        return response.encoding
+    return None
+
+def fetch_page(url, session=None, cached=None, timeout=URL_TIMEOUT):
+    # Fetches and parses `url` once. `cached` is a previous result for the same URL;
+    # its ETag / Last-Modified are sent so an unchanged page comes back as 304 and
+    # is not downloaded or parsed again. The body is parsed while it downloads, so
+    # the page itself is never held in memory.
+    # Returns a dict: url, status, text, etag, last_modified, fetched_at and cache
+    # ("miss" for a full download, "revalidated" for a 304, "hit" when served from cache).
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    with (session or requests).get(url, headers=headers, timeout=timeout, stream=True) as response:
+        page = {
+            "url": url,
+            "status": response.status_code,
+            "text": None,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+            "cache": "miss",
+        }
+        if response.status_code == 304 and cached:
+            page.update(status=200, text=cached["text"], cache="revalidated",
+                        etag=page["etag"] or cached.get("etag"),
+                        last_modified=page["last_modified"] or cached.get("last_modified"))
+        elif response.status_code == 200:
+            page["text"] = parse_html(response.iter_content(HTML_CHUNK_BYTES), declared_encoding(response))
+    return page
+
+# --- Cached fetching ---
+# The cache stores each page as JSON (text plus validators) under a key that does not
+# change with time; freshness is decided from fetched_at, and stale pages are
+# revalidated with a conditional request instead of being fetched from scratch.
+def cached_page(cache, url):
+    if cache is None:
+        return None
+    raw = cache.get(cache.key_for(url, "fetch_page"))
+    if raw is None:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
+
+def store_page(cache, page):
+    if cache is not None and page["status"] == 200:
+        cache.put(cache.key_for(page["url"], "fetch_page"), json.dumps(page))
+
+def is_fresh(cache, page):
+    return page is not None and time.time() - page["fetched_at"] < cache.url_ttl
+
+def get_page(url, cache=None, session=None, timeout=URL_TIMEOUT):
+    cached = cached_page(cache, url)
+    if is_fresh(cache, cached):
+        return dict(cached, cache="hit")
+    page = fetch_page(url, session, cached, timeout)
+    store_page(cache, page)
+    return page
+
+def extract_from_url(url, cache=None, session=None):
+    page = get_page(url, cache, session)
+    if page["status"] != 200:
+        raise requests.HTTPError(f"HTTP {page['status']} for {url}")
+    return page["text"]
+
+class HostLimiter:
+    # Caps the number of simultaneous requests to each host
+    def __init__(self, per_host=URL_PER_HOST):
+        self.per_host = per_host
+        self._lock = threading.Lock()
+        self._slots = {}
+
+    def slot(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._slots:
+                self._slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._slots[host]
+
+def interleave_hosts(urls):
+    # Round-robin over hosts so pool threads are not all parked on one host's limit
+    by_host = {}
+    for url, cached in urls:
+        by_host.setdefault(urlsplit(url).netloc.lower(), []).append((url, cached))
+    queues = list(by_host.values())
+    ordered = []
+    for i in range(max(map(len, queues), default=0)):
+        ordered.extend(queue[i] for queue in queues if i < len(queue))
+    return ordered
+
+def fetch_pages(urls, cache=None, workers=URL_WORKERS, per_host=URL_PER_HOST, timeout=URL_TIMEOUT):
+    # Fetches every distinct URL once on a bounded thread pool sharing one session and
+    # yields (url, page, error) as pages complete. Fresh cache entries are yielded
+    # without a request; the cache is only touched from this (the calling) thread.
+    pending = []
+    for url in dict.fromkeys(urls):
+        cached = cached_page(cache, url)
+        if is_fresh(cache, cached):
+            yield url, dict(cached, cache="hit"), None
+        else:
+            pending.append((url, cached))
+    if not pending:
+        return
+
+    limiter = HostLimiter(per_host)
+
+    def fetch(url, cached):
+        with limiter.slot(url):
+            return fetch_page(url, session, cached, timeout)
+
+    workers = max(1, min(workers, len(pending)))
+    with make_session(workers) as session, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch, url, cached): url for url, cached in interleave_hosts(pending)}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                page = future.result()
+            except Exception as e:
+                yield url, None, e
+                continue
+            store_page(cache, page)
+            yield url, page, None
+
+def read_url_list(path):
+    # One URL per line; blank lines and lines starting with # are ignored
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
@@ -0,0 +1,183 @@
+import os
+import itertools
+from collections import Counter
+import numpy as np
+import pandas as pd
+from .paths import timestamped_filename
+from .segment import EDGE_PUNCTUATION, segment_text, stream_pieces
+from .text_extractor import DEFAULT_ENCODING_ERRORS, STREAM_BUFFER_CHARS, iter_txt_chunks
+from .writers import format_extension, iter_frame_batches, write_frames
+
+# --- Word statistics (the "wordfreq" extraction type) ---
+# Instead of one row per word, counts how often every term and n-gram occurs: one row per
+# distinct term. Text is read in sentence-aligned chunks (.txt files straight from disk),
+# so only the counts grow with the input (text with no sentence break is cut at line
+# breaks, see segment.stream_pieces). Terms are words with surrounding punctuation
+# stripped (optionally case folded); n-grams are consecutive terms within one sentence.
+# With stopwords, stopwords are not counted as unigrams and no n-gram starts or ends with
+# one ("bill of rights" is kept, "of the" is not). When more than max_terms distinct
+# terms are held, the rarest are dropped (lossy counting) and counts become lower bounds.
+WORDFREQ_TYPE = "wordfreq"
+MAX_TERMS = 2_000_000
+ENGLISH_STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most
+my myself no nor not now of off on once only or other our ours ourselves out over own same she
+should so some such than that the their theirs them themselves then there these they this those
+through to too under until up very was we were what when where which while who whom why will with
+would you your yours yourself yourselves
+""".split())
+
+def parse_ngram_sizes(spec):
+    # "1" -> [1], "1-3" -> [1, 2, 3], "1,3" -> [1, 3]; raises ValueError
+    sizes = set()
+    for part in str(spec).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        first, last = int(first), int(last or first)
+        if first < 1 or last < first:
+            raise ValueError(f"Invalid n-gram size(s): {part}")
+        sizes.update(range(first, last + 1))
+    if not sizes:
+        raise ValueError("No n-gram sizes given")
+    return sorted(sizes)
+
+def load_stopwords(spec):
+    # None -> no filtering, "english" -> the built-in list, otherwise a file with one
+    # word per line (# starts a comment)
+    if not spec:
+        return None
+    if spec == "english":
+        return ENGLISH_STOPWORDS
+    with open(spec, "r", encoding="utf-8") as f:
+        return frozenset(word.casefold() for line in f
+                         for word in line.split("#", 1)[0].split())
+
+class TermCounter:
+    def __init__(self, sizes=(1,), casefold=False, stopwords=None, max_terms=MAX_TERMS):
+        self.sizes = sorted(sizes)
+        self.casefold = casefold
+        self.stopwords = stopwords
+        self.max_terms = max_terms
+        self.counts = Counter()       # term or n-gram ("new york") -> occurrences
+        self.sources = Counter()      # term -> sources it occurs in (after merge())
+        self.totals = Counter()       # n -> n-grams counted
+        self.pruned_below = 0         # counts under this were dropped at least once
+
+    @property
+    def approximate(self):
+        return self.pruned_below > 0
+
+    def _term(self, word):
+        word = word.strip(EDGE_PUNCTUATION)
+        return word.casefold() if self.casefold else word
+
+    # --- Counting ---
+    def add_text(self, text, chunk_chars=STREAM_BUFFER_CHARS):
+        # Segments a text of any size a chunk at a time
+        self.add_chunks((text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)), chunk_chars)
+
+    def add_file(self, file_path, chunk_chars=STREAM_BUFFER_CHARS, errors=DEFAULT_ENCODING_ERRORS):
+        self.add_chunks(iter_txt_chunks(file_path, chunk_chars, errors=errors), chunk_chars,
+                        os.path.basename(file_path))
+
+    def add_chunks(self, chunks, max_carry=STREAM_BUFFER_CHARS, source="text"):
+        # Cuts at sentence breaks, so no n-gram is lost at a chunk boundary; text with no
+        # sentence break within max_carry characters is cut at a line break instead
+        for text, _, _ in stream_pieces(chunks, "sentence", max_carry, source):
+            self._count(text)
+
+    def _count(self, text):
+        segments = segment_text(text)
+        words = segments.texts("word")
+        if not words:
+            return
+        # Turn each distinct word into a term once (see index.build_postings)
+        distinct = {}
+        first_seen = np.fromiter(map(distinct.setdefault, words, itertools.count()), dtype=np.int64,
+                                 count=len(words))
+        _, word_ids = np.unique(first_seen, return_inverse=True)
+        terms = list(map(self._term, distinct))
+        kept = np.flatnonzero(np.array([bool(term) for term in terms])[word_ids])  # drop bare punctuation
+        word_ids = word_ids[kept]
+        sentences = segments.word_sentence[kept]
+        tokens = list(map(terms.__getitem__, word_ids.tolist()))
+        stop = None
+        if self.stopwords:
+            stop = np.array([term.casefold() in self.stopwords for term in terms])[word_ids]
+
+        for n in self.sizes:
+            m = len(tokens) - n + 1
+            if m < 1:
+                break
+            valid = sentences[:m] == sentences[n - 1:]      # sentence indices never decrease
+            if stop is not None:
+                valid &= ~stop[:m] & ~stop[n - 1:]
+            grams = tokens if n == 1 else map(" ".join, zip(*(tokens[k:k + m] for k in range(n))))
+            self.counts.update(itertools.compress(grams, valid.tolist()))
+            self.totals[n] += int(valid.sum())
+        if len(self.counts) > self.max_terms:
+            self.prune()
+
+    def prune(self):
+        # Keeps about half of max_terms: everything at or above the count of the
+        # (max_terms // 2)-th most frequent term
+        keep = self.max_terms // 2
+        values = np.fromiter(self.counts.values(), dtype=np.int64, count=len(self.counts))
+        threshold = int(np.partition(values, len(values) - keep)[len(values) - keep]) if keep else values.max() + 1
+        self.counts = Counter({term: count for term, count in self.counts.items() if count >= threshold})
+        if self.sources:
+            self.sources = Counter({term: self.sources[term] for term in self.counts})
+        self.pruned_below = max(self.pruned_below, threshold)
+
+    def merge(self, other):
+        # Adds another source's counts; sources counts the sources each term occurs in
+        self.counts.update(other.counts)
+        self.sources.update(other.counts.keys())
+        self.totals.update(other.totals)
+        self.pruned_below = max(self.pruned_below, other.pruned_below)
+        if len(self.counts) > self.max_terms:
+            self.prune()
+
+    # --- Results ---
+    def frame(self, top=None):
+        # One row per term: N, Term, Count, Share (of all n-grams of that size) and, once
+        # sources were merged, Sources. Sorted by N, then most frequent first; with top,
+        # only the top most frequent of each size.
+        terms = list(self.counts)
+        df = pd.DataFrame({
+            "N": np.fromiter((term.count(" ") + 1 for term in terms), dtype=np.int64, count=len(terms)),
+            "Term": pd.Series(terms, dtype=object),
+            "Count": np.fromiter(self.counts.values(), dtype=np.int64, count=len(terms)),
+        })
+        totals = df["N"].map(self.totals).astype("float64")
+        df["Share"] = (df["Count"] / totals.where(totals > 0)).round(8)
+        if self.sources:
+            df["Sources"] = np.fromiter(map(self.sources.__getitem__, terms), dtype=np.int64, count=len(terms))
+        df = df.sort_values(["N", "Count", "Term"], ascending=[True, False, True], kind="stable")
+        if top:
+            df = df.groupby("N", sort=False).head(top)
+        df.insert(0, "Rank", df.groupby("N").cumcount().to_numpy() + 1)
+        return df.reset_index(drop=True)
+
+def wordfreq_options(args):
+    # TermCounter arguments from the batch / urls command line options
+    return {"sizes": args.ngrams, "casefold": args.casefold, "stopwords": load_stopwords(args.stopwords),
+            "max_terms": args.max_terms}
+
+def write_wordfreq(counter, out_folder, formats, top=None):
+    # Writes the merged table as wordfreq_results_<timestamp>.<ext>; returns (rows, paths)
+    out_paths = [os.path.join(out_folder, timestamped_filename(WORDFREQ_TYPE, format_extension(fmt)))
+                 for fmt in formats]
+    rows = write_frames(iter_frame_batches(counter.frame(top)), out_paths)
+    return rows, out_paths
+
+def print_wordfreq_totals(counter, rows, out_paths):
+    sizes = ", ".join(f"{counter.totals[n]} {n}-gram(s)" for n in counter.sizes)
+    print(f"✅ Word statistics: {sizes}; {rows} row(s) saved to {'; '.join(out_paths)}")
+    if counter.approximate:
+        print(f"⚠️ More than {counter.max_terms} distinct terms: terms seen fewer than {counter.pruned_below} "
+              f"time(s) at some point were dropped, so counts are lower bounds")
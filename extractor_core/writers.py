@@ -0,0 +1,277 @@
+import gzip
+import os
+from abc import ABC, abstractmethod
+
+# --- Streaming output writers ---
+# Each writer takes result frames one batch at a time and appends them to its file,
+# so memory depends on the batch size, not on the size of the output. Pick a writer
+# by format name (or file extension) with open_writer().
+EXCEL_MAX_ROWS = 1048576          # rows per worksheet, header included
+RESULT_BATCH_ROWS = 50000         # rows handed to the writers at a time
+DEFAULT_FORMATS = ["csv"]
+
+class FrameWriter(ABC):
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+
+    @abstractmethod
+    def write(self, df):
+        ...
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class CsvWriter(FrameWriter):
+    def __init__(self, path, compress=False):
+        super().__init__(path)
+        if compress:
+            self._out = gzip.open(path, "wt", encoding="utf-8", newline="", compresslevel=6)
+        else:
+            self._out = open(path, "w", encoding="utf-8", newline="")
+        self._header = True
+
+    def write(self, df):
+        # Only the first frame writes the header; later empty frames add nothing
+        if df.empty and not self._header:
+            return
+        df.to_csv(self._out, index=False, header=self._header)
+        self._header = False
+        self.rows += len(df)
+
+    def close(self):
+        self._out.close()
+
+class JsonlWriter(FrameWriter):
+    def __init__(self, path):
+        super().__init__(path)
+        self._out = open(path, "w", encoding="utf-8", newline="\n")
+
+    def write(self, df):
+        if df.empty:
+            return
+        lines = df.to_json(orient="records", lines=True, force_ascii=False)
+        self._out.write(lines if lines.endswith("\n") else lines + "\n")
+        self.rows += len(df)
+
+    def close(self):
+        self._out.close()
+
+class ParquetWriter(FrameWriter):
+    # Source and Type arrive as pandas categoricals and are stored dictionary-encoded.
+    # The schema is fixed by the first non-empty frame; later frames are cast to it.
+    def __init__(self, path):
+        super().__init__(path)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet output needs pyarrow (pip install pyarrow)") from None
+        self._pa = pa
+        self._pq = pq
+        self._writer = None
+        self._empty = None
+
+    def write(self, df):
+        if df.empty:
+            if self._writer is None and self._empty is None:
+                self._empty = df
+            return
+        table = self._pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, table.schema, compression="snappy")
+        else:
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is None:
+            # Nothing but empty frames: still write a file with the columns
+            empty = self._empty
+            if empty is None:
+                import pandas as pd
+                empty = pd.DataFrame()
+            self._pq.write_table(self._pa.Table.from_pandas(empty, preserve_index=False), self.path)
+        else:
+            self._writer.close()
+
+class ExcelWriter(FrameWriter):
+    # openpyxl write-only mode streams rows to disk instead of keeping every cell in
+    # memory. A sheet that reaches Excel's row limit is continued on Sheet2, Sheet3, ...
+    def __init__(self, path, max_rows=EXCEL_MAX_ROWS):
+        super().__init__(path)
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+        from openpyxl.styles import Font
+        self._workbook = Workbook(write_only=True)
+        self._cell = WriteOnlyCell
+        self._illegal = ILLEGAL_CHARACTERS_RE
+        self._bold = Font(bold=True)
+        self.max_rows = max_rows
+        self._sheet = None
+        self._sheet_rows = 0
+        self._columns = None
+
+    def _new_sheet(self):
+        self._sheet = self._workbook.create_sheet(f"Sheet{len(self._workbook.worksheets) + 1}")
+        header = []
+        for col in self._columns:
+            cell = self._cell(self._sheet, value=col)
+            cell.font = self._bold
+            header.append(cell)
+        self._sheet.append(header)
+        self._sheet_rows = 1
+
+    def write(self, df):
+        if self._columns is None:
+            self._columns = [str(col) for col in df.columns]
+            self._new_sheet()
+        if df.empty:
+            return
+        # Characters Excel refuses (control characters) would abort the whole file. Text
+        # columns are object or, under pandas 3, the str dtype.
+        from pandas.api.types import is_string_dtype
+        for col in df.columns:
+            if is_string_dtype(df[col].dtype):
+                df = df.assign(**{col: df[col].str.replace(self._illegal, "", regex=True)})
+        for row in df.itertuples(index=False, name=None):
+            if self._sheet_rows >= self.max_rows:
+                self._new_sheet()
+            self._sheet.append(row)
+            self._sheet_rows += 1
+        self.rows += len(df)
+
+    def close(self):
+        if self._sheet is None:
+            self._workbook.create_sheet("Sheet1")
+        self._workbook.save(self.path)
+
+# Format name -> (file extension, writer factory)
+WRITERS = {
+    "csv": (".csv", CsvWriter),
+    "csv.gz": (".csv.gz", lambda path: CsvWriter(path, compress=True)),
+    "jsonl": (".jsonl", JsonlWriter),
+    "parquet": (".parquet", ParquetWriter),
+    "xlsx": (".xlsx", ExcelWriter),
+}
+
+def format_extension(fmt):
+    return WRITERS[fmt][0]
+
+def parse_formats(spec):
+    # "csv,parquet" -> ["csv", "parquet"]; raises ValueError on unknown names
+    formats = [name.strip().lower().lstrip(".") for name in spec.split(",") if name.strip()]
+    unknown = [name for name in formats if name not in WRITERS]
+    if unknown:
+        raise ValueError(f"Unknown output format(s): {', '.join(unknown)} (choose from {', '.join(WRITERS)})")
+    return list(dict.fromkeys(formats)) or list(DEFAULT_FORMATS)
+
+def format_for_path(path):
+    for fmt, (extension, _) in sorted(WRITERS.items(), key=lambda item: -len(item[1][0])):
+        if path.lower().endswith(extension):
+            return fmt
+    raise ValueError(f"No writer for {os.path.basename(path)}")
+
+def open_writer(path, fmt=None):
+    return WRITERS[fmt or format_for_path(path)][1](path)
+
+def write_frames(frames, paths):
+    # Writes every frame to all of `paths` (one per format) in a single pass over
+    # `frames`; returns the number of rows written
+    writers = []
+    try:
+        for path in paths:
+            writers.append(open_writer(path))
+        rows = 0
+        for df in frames:
+            for writer in writers:
+                writer.write(df)
+            rows += len(df)
+        return rows
+    finally:
+        for writer in writers:
+            writer.close()
+
+def iter_frame_batches(df, batch_rows=RESULT_BATCH_ROWS):
+    # An already built table, handed to write_frames() in slices
+    if df.empty:
+        yield df
+        return
+    for start in range(0, len(df), batch_rows):
+        yield df.iloc[start:start + batch_rows]
+
+# --- Joining result files ---
+# Result files of one format with the same columns (e.g. the per-file shards of a
+# distributed run) are joined without rebuilding rows where the format allows it:
+# CSV and JSONL bytes are copied (dropping repeated CSV headers), Parquet is copied
+# a record batch at a time, and only Excel is read back row by row.
+COPY_CHUNK = 1024 * 1024
+
+def concat_results(paths, out_path, fmt=None):
+    fmt = fmt or format_for_path(out_path)
+    if fmt in ("csv", "jsonl"):
+        with open(out_path, "wb") as out:
+            _copy_text_results(paths, out, skip_header=fmt == "csv")
+    elif fmt == "csv.gz":
+        with gzip.open(out_path, "wb", compresslevel=6) as out:
+            _copy_text_results(paths, out, skip_header=True, opener=gzip.open)
+    elif fmt == "parquet":
+        _concat_parquet(paths, out_path)
+    else:
+        _concat_excel(paths, out_path)
+
+def _copy_text_results(paths, out, skip_header, opener=open):
+    import shutil
+    for number, path in enumerate(paths):
+        with opener(path, "rb") as f:
+            if skip_header and number:
+                f.readline()  # a header is one line: column names hold no line breaks
+            shutil.copyfileobj(f, out, COPY_CHUNK)
+
+def _concat_parquet(paths, out_path):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet output needs pyarrow (pip install pyarrow)") from None
+    writer = None
+    try:
+        for path in paths:
+            source = pq.ParquetFile(path)
+            if writer is None:
+                writer = pq.ParquetWriter(out_path, source.schema_arrow, compression="snappy")
+            for batch in source.iter_batches(batch_size=RESULT_BATCH_ROWS):
+                writer.write_table(pa.Table.from_batches([batch]).cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+def _concat_excel(paths, out_path):
+    import pandas as pd
+    from openpyxl import load_workbook
+    with ExcelWriter(out_path) as writer:
+        for path in paths:
+            workbook = load_workbook(path, read_only=True)
+            try:
+                for sheet in workbook.worksheets:
+                    rows = sheet.iter_rows(values_only=True)
+                    columns = next(rows, None)
+                    if columns is None:
+                        continue
+                    batch = []
+                    for row in rows:
+                        batch.append(row)
+                        if len(batch) == RESULT_BATCH_ROWS:
+                            writer.write(pd.DataFrame(batch, columns=columns))
+                            batch = []
+                    writer.write(pd.DataFrame(batch, columns=columns))
+            finally:
+                workbook.close()